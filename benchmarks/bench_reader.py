@@ -0,0 +1,140 @@
+"""读取流程各阶段的耗时和内存基准。
+
+python -m benchmarks.bench_reader --rows 1000 5000 20000 --cols 20 --out bench.json
+python -m benchmarks.bench_reader --rows 1000 5000 20000 --compare bench.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from cmp_reader.reader import (ColHeader, ExcelCompxReader, SheetBorder,
+                               SheetMerged, SheetType)
+
+from .generate import BORDER_STYLES, make_workbook
+
+STAGES = ["open", "SheetMerged", "SheetBorder", "SheetType", "split", "ColHeader", "_get_col_data"]
+
+
+def run_pipeline(file_path: str) -> dict:
+    """按阶段执行一次read_excel的流程
+
+    Returns:
+        dict -- {stage: 秒}
+    """
+    timings = {}
+    reader = ExcelCompxReader(file_path)
+
+    def timed(stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    timed("open", reader._open_workbook)
+    reader.sheet = reader.workbook.sheet_by_index(0)
+    no_merge_rows = timed("SheetMerged", SheetMerged(reader.sheet).get_no_merge_rows)
+    border_rows = timed("SheetBorder",
+                        SheetBorder(reader.sheet, reader.workbook).get_each_cell_has_border_rows)
+    same_type_rows = timed("SheetType", SheetType(reader.sheet).search_max_same_type_rows)
+    data_rows, header_rows = timed("split", reader._split_col_header_and_data_row,
+                                   no_merge_rows, border_rows, same_type_rows)
+    col_headers = timed("ColHeader",
+                        ColHeader(reader.sheet, reader.workbook, header_rows).search_col_header)
+    timed("_get_col_data", reader._get_col_data, col_headers, data_rows)
+    return timings
+
+
+def peak_memory(file_path: str) -> int:
+    """read_excel的峰值内存(字节)
+    """
+    tracemalloc.start()
+    try:
+        ExcelCompxReader(file_path).read_excel()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_case(work_dir: str, repeat: int, **params) -> dict:
+    file_path = os.path.join(work_dir, "bench_{rows}x{cols}_d{header_depth}_{border}.xls".format(**params))
+    make_workbook(file_path, **params)
+    runs = [run_pipeline(file_path) for _ in range(repeat)]
+    # 每个阶段取最快的一次，减少噪声
+    timings = {stage: min(run[stage] for run in runs) for stage in STAGES}
+    return {
+        "params": params,
+        "file_size": os.path.getsize(file_path),
+        "timings": timings,
+        "total": sum(timings.values()),
+        "peak_memory": peak_memory(file_path),
+    }
+
+
+def case_key(result: dict) -> str:
+    return json.dumps(result["params"], sort_keys=True)
+
+
+def print_results(results: list, baseline: dict = None):
+    header = ["rows", "cols", "depth"] + STAGES + ["total", "peak MB"]
+    print("\t".join(header))
+    for result in results:
+        params = result["params"]
+        line = [str(params["rows"]), str(params["cols"]), str(params["header_depth"])]
+        line += [f"{result['timings'][stage] * 1000:.1f}ms" for stage in STAGES]
+        line += [f"{result['total'] * 1000:.1f}ms", f"{result['peak_memory'] / 2 ** 20:.1f}"]
+        base = baseline.get(case_key(result)) if baseline else None
+        if base:
+            line.append(f"x{result['total'] / base['total']:.2f} vs baseline")
+        print("\t".join(line))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark the cmp_reader pipeline")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--cols", type=int, nargs="+", default=[20])
+    parser.add_argument("--header-depth", type=int, nargs="+", default=[3])
+    parser.add_argument("--merge-density", type=float, default=0.5)
+    parser.add_argument("--t-headers", type=int, default=1)
+    parser.add_argument("--border", choices=BORDER_STYLES, default="full")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="write the results as json")
+    parser.add_argument("--compare", help="baseline json written by --out")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="exit with 1 when a case is slower than threshold x baseline")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for cols in args.cols:
+            for header_depth in args.header_depth:
+                for rows in args.rows:
+                    results.append(bench_case(
+                        work_dir, args.repeat, rows=rows, cols=cols,
+                        header_depth=header_depth, merge_density=args.merge_density,
+                        t_headers=args.t_headers, border=args.border))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = {case_key(result): result for result in json.load(f)["results"]}
+    print_results(results, baseline)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version, "results": results}, f, indent=2)
+
+    if baseline:
+        regressions = [result for result in results
+                       if case_key(result) in baseline and
+                       result["total"] > baseline[case_key(result)]["total"] * args.threshold]
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than {args.threshold}x baseline")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
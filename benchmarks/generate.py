@@ -0,0 +1,118 @@
+"""生成带有复杂表头的.xls测试文件。
+
+python -m benchmarks.generate out.xls --rows 10000 --cols 30 --header-depth 3
+"""
+import argparse
+import random
+
+import xlwt
+
+BORDER_STYLES = ["full", "data", "none"]
+
+
+def _style(top=1, bottom=1, left=1, right=1) -> "xlwt.XFStyle":
+    borders = xlwt.Borders()
+    borders.top, borders.bottom, borders.left, borders.right = top, bottom, left, right
+    style = xlwt.XFStyle()
+    style.borders = borders
+    return style
+
+
+def make_workbook(file_path: str, rows: int = 1000, cols: int = 20, header_depth: int = 2,
+                  merge_density: float = 0.5, t_headers: int = 0, border: str = "full",
+                  sheets: int = 1, seed: int = 0) -> dict:
+    """生成带有大标题、多层合并表头和数据块的workbook
+
+    Arguments:
+        file_path {str} -- 输出的.xls文件
+
+    Keyword Arguments:
+        rows {int} -- 数据行数 (default: {1000})
+        cols {int} -- 列数 (default: {20})
+        header_depth {int} -- 表头层数 (default: {2})
+        merge_density {float} -- 表头中横向合并的概率 (default: {0.5})
+        t_headers {int} -- T型表头的个数 (default: {0})
+        border {str} -- 边框: full所有单元格，data只有数据块，none没有边框 (default: {"full"})
+        sheets {int} -- sheet数 (default: {1})
+        seed {int} -- 随机种子 (default: {0})
+
+    Returns:
+        dict -- 生成参数以及表头行数
+    """
+    if border not in BORDER_STYLES:
+        raise ValueError(f"border must be one of {BORDER_STYLES}")
+    random.seed(seed)
+    full_style = _style()
+    plain_style = xlwt.XFStyle()
+    header_style = full_style if border == "full" else plain_style
+    data_style = plain_style if border == "none" else full_style
+    # T型表头：合并单元格没有右边框，右侧单元格没有左边框
+    t_left_style = _style(right=0) if border == "full" else plain_style
+    t_right_style = _style(left=0) if border == "full" else plain_style
+
+    workbook = xlwt.Workbook()
+    for sheet_index in range(sheets):
+        sheet = workbook.add_sheet(f"Sheet{sheet_index + 1}")
+        # 大标题
+        sheet.write_merge(0, 0, 0, cols - 1, f"Report {sheet_index + 1}", header_style)
+
+        # 第一列为纵向合并的索引表头
+        sheet.write_merge(1, header_depth, 0, 0, "key", header_style)
+        t_count = 0
+        for level in range(header_depth - 1):
+            row = level + 1
+            col = 1
+            while col < cols:
+                span = 1
+                if random.random() < merge_density:
+                    span = min(random.randint(2, 4), cols - col)
+                if span > 1 and level == 0 and t_count < t_headers and col + span < cols:
+                    sheet.write_merge(row, row, col, col + span - 1, f"T{col}", t_left_style)
+                    sheet.write(row, col + span, f"t{col + span}", t_right_style)
+                    t_count += 1
+                    col += span + 1
+                    continue
+                if span > 1:
+                    sheet.write_merge(row, row, col, col + span - 1, f"L{level}_{col}", header_style)
+                else:
+                    sheet.write(row, col, f"L{level}_{col}", header_style)
+                col += span
+        for col in range(1, cols):
+            sheet.write(header_depth, col, f"c{col}", header_style)
+
+        data_start_row = header_depth + 1
+        for row in range(data_start_row, data_start_row + rows):
+            sheet.write(row, 0, f"k{row}", data_style)
+            for col in range(1, cols):
+                if col % 3 == 0:
+                    value = random.randint(0, 10000)
+                else:
+                    value = round(random.random() * 1000, 2)
+                sheet.write(row, col, value, data_style)
+
+    workbook.save(file_path)
+    return {
+        "rows": rows, "cols": cols, "header_depth": header_depth,
+        "merge_density": merge_density, "t_headers": t_headers,
+        "border": border, "sheets": sheets, "data_start_row": header_depth + 1,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="generate a synthetic complex-header .xls")
+    parser.add_argument("file_path")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--cols", type=int, default=20)
+    parser.add_argument("--header-depth", type=int, default=2)
+    parser.add_argument("--merge-density", type=float, default=0.5)
+    parser.add_argument("--t-headers", type=int, default=0)
+    parser.add_argument("--border", choices=BORDER_STYLES, default="full")
+    parser.add_argument("--sheets", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    make_workbook(args.file_path, args.rows, args.cols, args.header_depth,
+                  args.merge_density, args.t_headers, args.border, args.sheets, args.seed)
+
+
+if __name__ == "__main__":
+    main()
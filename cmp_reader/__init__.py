@@ -1,2 +1,11 @@
 from .reader import ExcelCompxReader
-from .reader import read_excel
\ No newline at end of file
+from .reader import RowIndex
+from .reader import LazyColumns
+from .reader import read_excel
+from .reader import read_all_sheets
+from .reader import read_many
+from .aio import AsyncExcelReader, aread_excel, aread_all_sheets, aread_many, aiter_chunks
+from .cache import ResultCache
+from .columns import CategoricalColumn
+from .stats import ReadStats
+from .template import LayoutTemplate, ReadCheckpoint, TemplateRegistry
\ No newline at end of file
@@ -0,0 +1,289 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .reader import ExcelCompxReader, _add_cache_counts, _read_file_safely
+
+__all__ = ["AsyncExcelReader", "aread_excel", "aread_all_sheets", "aread_many", "aiter_chunks"]
+
+EXECUTOR_KINDS = ["thread", "process"]
+
+
+def _read_excel_job(file_path: str, sheet_name, typed: bool, options: dict) -> tuple:
+    data = ExcelCompxReader(file_path, **options).read_excel(sheet_name, typed)
+    cache = options.get("cache")
+    # 进程池中缓存的命中统计交回主进程
+    return data, cache.take_counts() if cache is not None else None
+
+
+def _take_job_data(result: tuple, options: dict) -> dict:
+    data, cache_counts = result
+    if options.get("cache") is not None:
+        options["cache"].add_counts(cache_counts)
+    return data
+
+
+def _next_chunk(chunks, lock: threading.Lock):
+    with lock:
+        return next(chunks, None)
+
+
+def _close_chunks(chunks, reader: ExcelCompxReader, lock: threading.Lock):
+    # 等待正在线程中执行的next结束，执行中的生成器不能close
+    with lock:
+        chunks.close()
+        reader.close()
+
+
+def _read_all_sheets_job(file_path: str, return_errors: bool, options: dict):
+    # 执行器已经限制了并发，sheet在同一个任务中顺序读取
+    return ExcelCompxReader(file_path, **options).read_all_sheets(1, return_errors)
+
+
+class AsyncExcelReader:
+    """在有界的线程池或进程池中读取excel，供asyncio服务使用，
+    解析和表头检测不会阻塞事件循环。
+
+    取消等待中的协程时，还没有开始的读取任务会被取消；已经在执行的任务会运行到结束，
+    结果被丢弃。read_many中超时的文件返回TimeoutError。
+    """
+
+    def __init__(self,
+                 executor="thread",
+                 max_workers: int = None,
+                 max_concurrency: int = None,
+                 **options):
+        """
+        Keyword Arguments:
+            executor {str|Executor} -- "thread"、"process"或者调用方管理的Executor (default: {"thread"})
+            max_workers {int} -- 线程数或进程数，None为concurrent.futures的默认值；
+                                 传入Executor时为它的worker数，None为cpu核数 (default: {None})
+            max_concurrency {int} -- 同时提交到执行器的读取数，None为不限制 (default: {None})
+            options -- ExcelCompxReader的其余参数，使用进程池时必须可以pickle
+        """
+        if max_workers is not None and max_workers < 1:
+            raise ValueError(f"max_workers must be positive, got {max_workers}")
+        cpu_count = os.cpu_count() or 1
+        if isinstance(executor, Executor):
+            self.executor = executor
+            self.kind = "process" if isinstance(executor, ProcessPoolExecutor) else "thread"
+            self._own_executor = False
+            self.max_workers = max_workers or cpu_count
+        elif executor in EXECUTOR_KINDS:
+            pool_class = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+            self.executor = pool_class(max_workers=max_workers)
+            self.kind = executor
+            self._own_executor = True
+            # 与concurrent.futures的默认值一致
+            default_workers = min(32, cpu_count + 4) if executor == "thread" else cpu_count
+            self.max_workers = max_workers or default_workers
+        else:
+            raise ValueError(f"executor must be one of {EXECUTOR_KINDS} or an Executor, got {executor!r}")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be positive, got {max_concurrency}")
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.options = options
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """关闭自己创建的执行器，调用方传入的Executor不会被关闭
+        """
+        if self._own_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None:
+            return await loop.run_in_executor(self.executor, func, *args)
+        async with self._semaphore:
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    async def read_excel(self, file_path: str, sheet_name=None, typed: bool = False) -> dict:
+        """读取一张sheet
+
+        Arguments:
+            file_path {str} -- excel file path
+
+        Keyword Arguments:
+            sheet_name {str} -- sheet name (default: {None})
+            typed {bool} -- 按列的主要单元格类型返回numpy列 (default: {False})
+
+        Returns:
+            dict -- {"col_header": value_list}
+        """
+        return _take_job_data(
+            await self._run(_read_excel_job, file_path, sheet_name, typed, self.options), self.options)
+
+    async def read_all_sheets(self, file_path: str, return_errors: bool = False):
+        """读取所有sheet，整个workbook作为执行器中的一个任务
+
+        Arguments:
+            file_path {str} -- excel file path
+
+        Keyword Arguments:
+            return_errors {bool} -- 返回(数据, {sheet_name: 异常}) (default: {False})
+
+        Returns:
+            dict -- {"sheet_name": {"col_header": value_list}}
+        """
+        return await self._run(_read_all_sheets_job, file_path, return_errors, self.options)
+
+    async def read_many(self, paths, sheet_name=None, timeout: float = None):
+        """批量读取excel文件，按完成的顺序逐个返回结果。
+        每个文件占用一个max_concurrency的名额，与同一个reader上的其他读取共享；
+        未设置max_concurrency时，同时等待的文件数不超过执行器worker数的两倍。
+        提前退出迭代时取消还没有开始的文件。
+
+        Arguments:
+            paths {iterable} -- excel file path列表
+
+        Keyword Arguments:
+            sheet_name {str} -- 每个文件读取的sheet name (default: {None})
+            timeout {float} -- 单个文件的超时时间(秒)，只能在进程池中使用 (default: {None})
+
+        Yields:
+            tuple -- (file_path, {"col_header": value_list}, error)，读取成功时error为None
+        """
+        # SIGALRM只能在主线程中使用，线程中的读取也不能被中断
+        if timeout is not None and self.kind != "process":
+            raise ValueError("timeout is only supported with a process executor")
+        # 每个文件通过信号量提交，等待提交的任务数也有上限，避免一次为所有文件创建任务
+        max_pending = self.max_concurrency or self.max_workers * 2
+        pending = set()
+        try:
+            for file_path in paths:
+                pending.add(asyncio.ensure_future(
+                    self._run(_read_file_safely, file_path, sheet_name, self.options, timeout)))
+                if len(pending) >= max_pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        yield _add_cache_counts(future.result(), self.options)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield _add_cache_counts(future.result(), self.options)
+        finally:
+            for future in pending:
+                future.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def iter_chunks(self, file_path: str, size: int, sheet_name=None):
+        """按块读取数据行，每块最多size行，每一块在执行器中读取。
+        生成器不能在进程之间传递，进程池时在事件循环默认的线程池中读取。
+
+        Arguments:
+            file_path {str} -- excel file path
+            size {int} -- 每块的行数
+
+        Keyword Arguments:
+            sheet_name {str} -- sheet name (default: {None})
+
+        Yields:
+            dict -- {"col_name": col_value_list}
+        """
+        executor = self.executor if self.kind == "thread" else None
+        async for chunk in aiter_chunks(file_path, size, sheet_name, executor, **self.options):
+            yield chunk
+
+
+async def aread_excel(filename, sheet_name=None, cache=None, typed: bool = False,
+                      executor: Executor = None) -> dict:
+    """read_excel的异步版本
+
+    Arguments:
+        filename {str} -- excel file path
+
+    Keyword Arguments:
+        sheet_name {str} -- sheet name (default: {None})
+        cache {ResultCache} -- 结果的磁盘缓存 (default: {None})
+        typed {bool} -- 按列的主要单元格类型返回numpy列 (default: {False})
+        executor {Executor} -- 执行读取的线程池或进程池，None为事件循环默认的线程池 (default: {None})
+
+    Returns:
+        dict -- {"col_header": value_list}
+    """
+    loop = asyncio.get_running_loop()
+    options = {"cache": cache}
+    return _take_job_data(await loop.run_in_executor(
+        executor, _read_excel_job, filename, sheet_name, typed, options), options)
+
+
+async def aread_all_sheets(filename, return_errors: bool = False, executor: Executor = None):
+    """read_all_sheets的异步版本，所有sheet在执行器的一个任务中顺序读取
+
+    Arguments:
+        filename {str} -- excel file path
+
+    Keyword Arguments:
+        return_errors {bool} -- 返回(数据, {sheet_name: 异常}) (default: {False})
+        executor {Executor} -- 执行读取的线程池或进程池，None为事件循环默认的线程池 (default: {None})
+
+    Returns:
+        dict -- {"sheet_name": {"col_header": value_list}}
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _read_all_sheets_job, filename, return_errors, {})
+
+
+async def aread_many(paths, sheet_name=None, workers: int = None, timeout: float = None,
+                     max_concurrency: int = None, **options):
+    """read_many的异步版本，在进程池中批量读取，按完成的顺序逐个返回结果
+
+    Arguments:
+        paths {iterable} -- excel file path列表
+
+    Keyword Arguments:
+        sheet_name {str} -- 每个文件读取的sheet name (default: {None})
+        workers {int} -- 进程数，None为cpu核数 (default: {None})
+        timeout {float} -- 单个文件的超时时间(秒) (default: {None})
+        max_concurrency {int} -- 同时提交的文件数，None为进程数的两倍 (default: {None})
+        options -- ExcelCompxReader的其余参数
+
+    Yields:
+        tuple -- (file_path, {"col_header": value_list}, error)
+    """
+    max_concurrency = max_concurrency or (workers or os.cpu_count() or 1) * 2
+    async with AsyncExcelReader("process", workers, max_concurrency, **options) as reader:
+        async for result in reader.read_many(paths, sheet_name, timeout):
+            yield result
+
+
+async def aiter_chunks(filename, size: int, sheet_name=None, executor: Executor = None, **options):
+    """iter_chunks的异步版本，每一块在线程池中读取
+
+    Arguments:
+        filename {str} -- excel file path
+        size {int} -- 每块的行数
+
+    Keyword Arguments:
+        sheet_name {str} -- sheet name (default: {None})
+        executor {Executor} -- 线程池，None为事件循环默认的线程池 (default: {None})
+        options -- ExcelCompxReader的其余参数
+
+    Yields:
+        dict -- {"col_name": col_value_list}
+    """
+    loop = asyncio.get_running_loop()
+    reader = ExcelCompxReader(filename, **options)
+    chunks = reader.iter_chunks(size, sheet_name)
+    lock = threading.Lock()
+    try:
+        while True:
+            chunk = await loop.run_in_executor(executor, _next_chunk, chunks, lock)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        # 取消时线程中的next可能还在执行，close在同一个执行器中等它结束后执行
+        try:
+            await loop.run_in_executor(executor, _close_chunks, chunks, reader, lock)
+        except RuntimeError:
+            # 执行器已经关闭
+            _close_chunks(chunks, reader, lock)
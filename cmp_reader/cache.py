@@ -0,0 +1,298 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+__all__ = ["ResultCache"]
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "cmp_reader")
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+# 缓存文件格式版本，格式变化时旧的缓存自动失效
+CACHE_VERSION = 2
+ENTRY_SUFFIX = ".cmpc"
+# 每个excel文件的hash记录保存为一个json文件
+FILE_RECORD_DIR = "files"
+# 版本1中所有文件共用的hash索引
+LEGACY_INDEX_FILE = "index.json"
+# 文件头: 版本号、列信息json的长度
+HEADER_STRUCT = struct.Struct("<II")
+
+
+class ResultCache:
+    """read_excel结果的磁盘缓存。
+    缓存的key由文件内容的hash、sheet name和reader参数组成。
+    文件的mtime和大小没有变化时，直接使用上一次计算的hash，不再读取文件内容。
+    每个结果保存为一个二进制文件：数值列保存为连续的float64，其余列保存为json，
+    缓存目录可以在多个进程或用户之间共享，读取缓存不会执行任何代码。
+    缓存总大小超过max_size时，按最近访问时间淘汰。
+    """
+
+    def __init__(self, cache_dir: str = None, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Keyword Arguments:
+            cache_dir {str} -- 缓存目录，默认使用环境变量CMP_READER_CACHE_DIR或者~/.cache/cmp_reader
+            max_size {int} -- 缓存的最大字节数 (default: {DEFAULT_MAX_SIZE})
+        """
+        self.cache_dir = cache_dir or os.environ.get(
+            "CMP_READER_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._copied = False
+        # 缓存条目的总大小，第一次写入时统计一次，之后增量累加；
+        # 其他进程写入的条目在下一次淘汰时才计入
+        self._total_size = None
+        os.makedirs(os.path.join(self.cache_dir, FILE_RECORD_DIR), exist_ok=True)
+
+    def __getstate__(self):
+        # 子进程中的命中统计单独计算，由take_counts交回主进程
+        state = self.__dict__.copy()
+        state["hits"] = state["misses"] = 0
+        state["_copied"] = True
+        return state
+
+    def take_counts(self):
+        """取出子进程中的副本记录的命中统计，并清零
+
+        Returns:
+            tuple -- (hits, misses)，不是子进程中的副本时返回None
+        """
+        if not self._copied:
+            return None
+        counts = self.hits, self.misses
+        self.hits = self.misses = 0
+        return counts
+
+    def add_counts(self, counts):
+        """累加子进程中take_counts取出的命中统计
+
+        Arguments:
+            counts {tuple} -- (hits, misses)，None时不变
+        """
+        if counts is not None:
+            self.hits += counts[0]
+            self.misses += counts[1]
+
+    def _record_path(self, file_path: str) -> str:
+        name = hashlib.sha256(file_path.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, FILE_RECORD_DIR, name + ".json")
+
+    def _load_record(self, record_path: str) -> dict:
+        try:
+            with open(record_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _atomic_write(self, path: str, data: bytes):
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def file_hash(self, file_path: str) -> str:
+        """获取文件内容的hash，mtime和大小没有变化时使用上一次的结果。
+
+        Arguments:
+            file_path {str} -- excel file path
+
+        Returns:
+            str -- sha256
+        """
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        record_path = self._record_path(file_path)
+        record = self._load_record(record_path)
+        if (record and record.get("path") == file_path and
+                record["mtime_ns"] == stat.st_mtime_ns and record["size"] == stat.st_size):
+            return record["sha256"]
+
+        sha256 = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha256.update(block)
+        record = {
+            "path": file_path,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha256.hexdigest(),
+        }
+        # 每个文件一个记录，原子替换，并发的进程只会写入相同的内容
+        self._atomic_write(record_path, json.dumps(record).encode("utf-8"))
+        return record["sha256"]
+
+    def make_key(self, file_path: str, sheet_name, options: dict) -> str:
+        """缓存的key
+
+        Arguments:
+            file_path {str} -- excel file path
+            sheet_name {str} -- sheet name
+            options {dict} -- reader参数
+
+        Returns:
+            str -- key
+        """
+        key = json.dumps([CACHE_VERSION, self.file_hash(file_path), sheet_name, options],
+                         sort_keys=True, default=str)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ENTRY_SUFFIX)
+
+    def get(self, file_path: str, sheet_name, options: dict):
+        """从缓存中读取结果
+
+        Returns:
+            dict -- {"col_header": value_list}，没有缓存时返回None
+        """
+        entry_path = self._entry_path(self.make_key(file_path, sheet_name, options))
+        try:
+            data = self._read_entry(entry_path)
+        except (OSError, ValueError, struct.error):
+            self.misses += 1
+            return None
+        try:
+            # 更新访问时间，用于LRU淘汰；只读或者共享的缓存目录中更新失败不影响读取
+            os.utime(entry_path)
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, file_path: str, sheet_name, options: dict, data: dict):
+        """把结果写入缓存，缓存总大小超过max_size时淘汰
+        """
+        try:
+            entry = self._encode_entry(data)
+        except (TypeError, ValueError):
+            # 不能保存为json的值不缓存
+            return
+        entry_path = self._entry_path(self.make_key(file_path, sheet_name, options))
+        if self._total_size is None:
+            self._total_size = sum(size for _, size, _ in self._list_entries())
+        try:
+            self._total_size -= os.stat(entry_path).st_size
+        except OSError:
+            pass
+        self._atomic_write(entry_path, entry)
+        self._total_size += len(entry)
+        if self._total_size > self.max_size:
+            self.evict()
+
+    def _list_entries(self) -> list:
+        """缓存目录中的条目
+
+        Returns:
+            list -- [(mtime_ns, size, name)]
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(ENTRY_SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+        return entries
+
+    def evict(self):
+        """按最近访问时间淘汰缓存，直到缓存总大小不超过max_size。
+        同时删除excel文件已经不存在或者已经修改的hash记录
+        """
+        self._prune_records()
+        entries = self._list_entries()
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.unlink(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total_size -= size
+        self._total_size = total_size
+
+    def _prune_records(self):
+        record_dir = os.path.join(self.cache_dir, FILE_RECORD_DIR)
+        for name in os.listdir(record_dir):
+            record_path = os.path.join(record_dir, name)
+            record = self._load_record(record_path)
+            try:
+                stat = os.stat(record["path"])
+                if record["mtime_ns"] == stat.st_mtime_ns and record["size"] == stat.st_size:
+                    continue
+            except (OSError, TypeError, KeyError):
+                pass
+            try:
+                os.unlink(record_path)
+            except OSError:
+                pass
+
+    def clear(self):
+        """删除所有的缓存
+        """
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(ENTRY_SUFFIX) or name == LEGACY_INDEX_FILE:
+                os.unlink(os.path.join(self.cache_dir, name))
+        record_dir = os.path.join(self.cache_dir, FILE_RECORD_DIR)
+        for name in os.listdir(record_dir):
+            os.unlink(os.path.join(record_dir, name))
+        self._total_size = 0
+
+    def _encode_entry(self, data: dict) -> bytes:
+        """把{"col_header": value_list}编码为二进制。
+        float列保存为float64，其余列保存为json。
+        """
+        columns = []
+        blocks = []
+        offset = 0
+        for col_header, col_value in data.items():
+            if all(type(each) is float for each in col_value):
+                kind = "f8"
+                block = np.array(col_value, dtype=np.float64).tobytes()
+            else:
+                kind = "json"
+                block = json.dumps(col_value, ensure_ascii=False).encode("utf-8")
+            columns.append([col_header, kind, offset, len(block), len(col_value)])
+            blocks.append(block)
+            offset += len(block)
+
+        header = json.dumps(columns).encode("utf-8")
+        # 数据块按8字节对齐
+        padding = -(HEADER_STRUCT.size + len(header)) % 8
+        return b"".join([HEADER_STRUCT.pack(CACHE_VERSION, len(header) + padding),
+                         header, b" " * padding] + blocks)
+
+    def _read_entry(self, entry_path: str) -> dict:
+        with open(entry_path, "rb") as f:
+            buffer = f.read()
+        version, header_size = HEADER_STRUCT.unpack_from(buffer, 0)
+        if version != CACHE_VERSION:
+            raise ValueError(f"cache version {version} is not supported")
+        data_start = HEADER_STRUCT.size + header_size
+        columns = json.loads(buffer[HEADER_STRUCT.size:data_start])
+
+        data = {}
+        for col_header, kind, offset, size, count in columns:
+            start = data_start + offset
+            if kind == "f8":
+                col_value = np.frombuffer(
+                    buffer, dtype=np.float64, count=count, offset=start).tolist()
+            elif kind == "json":
+                col_value = json.loads(buffer[start:start + size])
+            else:
+                raise ValueError(f"unknown column kind {kind!r}")
+            # tuple表头在json中保存为list
+            if isinstance(col_header, list):
+                col_header = tuple(col_header)
+            data[col_header] = col_value
+        return data
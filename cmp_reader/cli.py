@@ -0,0 +1,285 @@
+"""cmp-reader命令行工具，把带有复杂表头的sheet转换为parquet、feather或csv。
+
+cmp-reader convert report.xls --sheet Sheet1 --out report.parquet
+cmp-reader convert "reports/*.xls" --out out_dir --format csv --jobs 4
+"""
+import argparse
+import csv
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import xlrd
+
+from .columns import build_column, get_cell_kind, get_dominant_type
+from .engines import ENGINES
+from .reader import READ_MODES, ExcelCompxReader
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+__all__ = ["convert_file", "main"]
+
+FORMATS = ["parquet", "feather", "csv"]
+CHUNK_SIZE = 10000
+
+
+class CsvWriter:
+    """按块写入csv，单元格的值与read_excel返回的一致
+    """
+
+    def __init__(self, file_path: str, headers: list):
+        self.file = open(file_path, "w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(headers)
+
+    def write(self, chunk: list):
+        """
+        Arguments:
+            chunk {list} -- 每一列的(col_types, col_values)
+        """
+        self.writer.writerows(zip(*[col_values for _, col_values in chunk]))
+
+    def close(self):
+        self.file.close()
+
+
+class ArrowWriter:
+    """按块写入parquet或feather(Arrow IPC文件)。
+    每一列的类型由第一块数据的主要单元格类型决定，规则与read_excel(typed=True)一样，
+    不符合列类型的单元格写为null。
+    """
+    ARROW_TYPES = {
+        xlrd.XL_CELL_NUMBER: "float64",
+        xlrd.XL_CELL_DATE: "timestamp[ms]",
+        xlrd.XL_CELL_BOOLEAN: "bool",
+    }
+
+    def __init__(self, file_path: str, headers: list, col_kinds: list, datemode: int,
+                 file_format: str = "parquet"):
+        if pa is None:
+            raise ImportError(f"pyarrow is required to write {file_format} files")
+        self.col_kinds = col_kinds
+        self.datemode = datemode
+        self.schema = pa.schema([
+            (str(header), pa.type_for_alias(self.ARROW_TYPES.get(col_kind, "string")))
+            for header, col_kind in zip(headers, col_kinds)])
+        if file_format == "parquet":
+            self.writer = pa.parquet.ParquetWriter(file_path, self.schema)
+        else:
+            self.writer = pa.ipc.new_file(file_path, self.schema)
+
+    def _to_array(self, col_kind: int, col_types: list, col_values: list) -> "pa.Array":
+        if col_kind not in self.ARROW_TYPES:
+            return pa.array([None if get_cell_kind(col_type, value) == xlrd.XL_CELL_EMPTY else str(value)
+                             for col_type, value in zip(col_types, col_values)],
+                            type=pa.string())
+        column = build_column(col_kind, col_types, col_values, self.datemode)
+        mask = np.ma.getmaskarray(column)
+        return pa.array(np.ma.getdata(column), mask=mask).cast(
+            pa.type_for_alias(self.ARROW_TYPES[col_kind]))
+
+    def write(self, chunk: list):
+        """
+        Arguments:
+            chunk {list} -- 每一列的(col_types, col_values)
+        """
+        arrays = [self._to_array(col_kind, col_types, col_values)
+                  for col_kind, (col_types, col_values) in zip(self.col_kinds, chunk)]
+        self.writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def make_writer(file_path: str, file_format: str, headers: list, col_kinds: list = None,
+                datemode: int = 0):
+    if file_format == "csv":
+        return CsvWriter(file_path, headers)
+    return ArrowWriter(file_path, headers, col_kinds, datemode, file_format)
+
+
+def convert_file(in_path: str, out_path: str, sheet_name=None, file_format: str = "csv",
+                 chunk_size: int = CHUNK_SIZE, **options) -> int:
+    """转换一个excel文件。
+    表头与数据只划分一次，数据行按块写入，不构建整张sheet的列数据。
+    parquet和feather的列类型由第一块数据决定，csv不需要列类型。
+
+    Arguments:
+        in_path {str} -- excel file path
+        out_path {str} -- 输出的文件
+
+    Keyword Arguments:
+        sheet_name {str} -- sheet name，None为第一张sheet (default: {None})
+        file_format {str} -- "parquet"、"feather"或"csv" (default: {"csv"})
+        chunk_size {int} -- 每块的行数 (default: {CHUNK_SIZE})
+        options -- ExcelCompxReader的其余参数
+
+    Returns:
+        int -- 写入的行数
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"file_format must be one of {FORMATS}, got {file_format!r}")
+    if chunk_size < 1:
+        raise ValueError(f"chunk size must be positive, got {chunk_size}")
+    reader = ExcelCompxReader(in_path, **options)
+    try:
+        data_cols = reader.open_sheet(sheet_name)
+        headers = [col_header for _, col_header in data_cols]
+        chunks = reader.read_chunks(chunk_size, with_types=True)
+        first_chunk = next(chunks, {})
+        col_kinds = None
+        if file_format != "csv":
+            # 只用第一块数据统计单元格类型，不再为了列类型多读一遍sheet
+            col_kinds = [get_dominant_type(col_types, col_values)
+                         for col_types, col_values in first_chunk.values()]
+            col_kinds += [xlrd.XL_CELL_EMPTY] * (len(headers) - len(col_kinds))
+
+        writer = make_writer(out_path, file_format, headers, col_kinds, reader.workbook.datemode)
+        try:
+            if first_chunk:
+                writer.write(list(first_chunk.values()))
+            for chunk in chunks:
+                writer.write(list(chunk.values()))
+        finally:
+            writer.close()
+    finally:
+        reader.close()
+    return len(reader.data_rows)
+
+
+def _convert_safely(in_path: str, out_path: str, sheet_name, file_format: str,
+                    chunk_size: int, options: dict) -> tuple:
+    try:
+        return in_path, out_path, convert_file(
+            in_path, out_path, sheet_name, file_format, chunk_size, **options), None
+    except Exception as e:
+        return in_path, out_path, None, e
+
+
+def expand_paths(patterns: list) -> list:
+    """展开glob，去掉重复的文件
+
+    Returns:
+        list -- excel file path
+    """
+    paths = []
+    for pattern in patterns:
+        matched = sorted(glob.glob(pattern))
+        if not matched:
+            raise FileNotFoundError(f"no file matches {pattern}")
+        paths.extend(path for path in matched if path not in paths)
+    return paths
+
+
+def get_out_paths(in_paths: list, out: str, file_format: str) -> list:
+    """输出的文件。
+    只有一个输入且out带有格式后缀时，out为输出文件；
+    否则out为输出目录(默认为输入文件所在的目录)，文件名与输入文件一致，
+    输入来自不同的目录时，在out中保留相对于共同上级目录的子目录。
+
+    Returns:
+        list -- 每个输入对应的输出文件
+
+    Raises:
+        ValueError -- 不同的输入对应同一个输出文件，例如同一目录中的a.xls和a.xlsx
+    """
+    if out and len(in_paths) == 1 and os.path.splitext(out)[1].lstrip(".") in FORMATS:
+        return [out]
+    in_dirs = [os.path.dirname(os.path.abspath(in_path)) for in_path in in_paths]
+    common_dir = os.path.commonpath(in_dirs) if in_dirs else ""
+    out_paths = []
+    for in_path, in_dir in zip(in_paths, in_dirs):
+        stem = os.path.splitext(os.path.basename(in_path))[0]
+        if out:
+            out_dir = os.path.normpath(os.path.join(out, os.path.relpath(in_dir, common_dir)))
+        else:
+            out_dir = os.path.dirname(in_path)
+        out_paths.append(os.path.join(out_dir, f"{stem}.{file_format}"))
+
+    seen = {}
+    for in_path, out_path in zip(in_paths, out_paths):
+        key = os.path.normcase(os.path.abspath(out_path))
+        if key in seen:
+            raise ValueError(f"{seen[key]} and {in_path} would both be written to {out_path}")
+        seen[key] = in_path
+    for out_path in out_paths:
+        if os.path.dirname(out_path):
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    return out_paths
+
+
+def parse_usecols(usecols: str) -> list:
+    """逗号分隔的表头或列号
+    """
+    return [int(item) if item.isdigit() else item for item in usecols.split(",")]
+
+
+def convert(args) -> int:
+    file_format = args.format
+    if file_format is None:
+        suffix = os.path.splitext(args.out or "")[1].lstrip(".")
+        file_format = suffix if suffix in FORMATS else "csv"
+
+    in_paths = expand_paths(args.inputs)
+    out_paths = get_out_paths(in_paths, args.out, file_format)
+    options = {"engine": args.engine, "mode": args.mode, "separator": args.separator}
+    if args.usecols:
+        options["usecols"] = parse_usecols(args.usecols)
+    tasks = [(in_path, out_path, args.sheet, file_format, args.chunk_size, options)
+             for in_path, out_path in zip(in_paths, out_paths)]
+
+    if args.jobs == 1 or len(tasks) == 1:
+        results = (_convert_safely(*task) for task in tasks)
+        return _report(results)
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        return _report(executor.map(_convert_safely, *zip(*tasks)))
+
+
+def _report(results) -> int:
+    failed = 0
+    for in_path, out_path, rows, error in results:
+        if error is not None:
+            failed += 1
+            print(f"{in_path}: {error}", file=sys.stderr)
+        else:
+            print(f"{in_path} -> {out_path} ({rows} rows)")
+    return 1 if failed else 0
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog="cmp-reader", description="read excel with complex headers")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser(
+        "convert", help="convert sheets to parquet, feather or csv")
+    convert_parser.add_argument("inputs", nargs="+", help="excel files or glob patterns")
+    convert_parser.add_argument("--sheet", help="sheet name, the first sheet by default")
+    convert_parser.add_argument("--out", help="output file for a single input, otherwise output directory")
+    convert_parser.add_argument("--format", choices=FORMATS,
+                                help="output format, taken from the --out suffix by default, else csv")
+    convert_parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                                help="data rows written per chunk")
+    convert_parser.add_argument("--jobs", type=int, default=1,
+                                help="files converted in parallel, 0 for the cpu count")
+    convert_parser.add_argument("--engine", choices=list(ENGINES))
+    convert_parser.add_argument("--mode", choices=READ_MODES, default="accurate")
+    convert_parser.add_argument("--separator", default="", help="separator between header levels")
+    convert_parser.add_argument("--usecols", help="comma separated headers, header prefixes or column numbers")
+    args = parser.parse_args(argv)
+    if args.jobs == 0:
+        args.jobs = None
+    try:
+        return convert(args)
+    except (FileNotFoundError, ValueError) as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+from collections import Counter
+
+import numpy as np
+import xlrd
+
+__all__ = ["CategoricalColumn", "build_typed_column", "build_column", "get_cell_kind",
+           "count_cell_kinds", "get_dominant_type"]
+
+# excel日期序列号的起始日期，对应workbook.datemode 0和1
+XL_EPOCHS = {
+    0: np.datetime64("1899-12-30", "ms"),
+    1: np.datetime64("1904-01-01", "ms"),
+}
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+
+class CategoricalColumn:
+    """字典编码的字符串列。
+    codes中保存每一行在categories中的序号，空值为-1。
+    """
+
+    def __init__(self, codes: "np.ndarray", categories: "np.ndarray"):
+        self.codes = codes
+        self.categories = categories
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        code = self.codes[index]
+        return None if code < 0 else self.categories[code]
+
+    def __repr__(self) -> str:
+        return f"CategoricalColumn(len={len(self)}, categories={len(self.categories)})"
+
+    def to_list(self) -> list:
+        return [None if code < 0 else self.categories[code] for code in self.codes.tolist()]
+
+
+def _is_null(col_type: int, value) -> bool:
+    return col_type in [xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK] or (
+        col_type == xlrd.XL_CELL_TEXT and not value.strip())
+
+
+def _text_to_number(value: str):
+    """把十进制数字组成的字符串转换为数值，不能转换时返回None。
+    str.isdigit()对"²"等上标数字也返回True，但int()不能转换，使用isdecimal()判断。
+    """
+    if not value.isdecimal():
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def get_cell_kind(col_type: int, value) -> int:
+    """单元格在列类型统计中的类型，与SheetType一致。
+    空单元格和只有空白的字符串为XL_CELL_EMPTY，可以转换为数值的十进制数字字符串为XL_CELL_NUMBER。
+
+    Arguments:
+        col_type {int} -- xlrd的单元格类型
+        value {object} -- 单元格的值
+
+    Returns:
+        int -- xlrd的单元格类型
+    """
+    if _is_null(col_type, value):
+        return xlrd.XL_CELL_EMPTY
+    if col_type == xlrd.XL_CELL_TEXT and _text_to_number(value) is not None:
+        return xlrd.XL_CELL_NUMBER
+    return col_type
+
+
+def count_cell_kinds(col_types: list, col_values: list, type_counter: Counter = None) -> Counter:
+    """统计一列中非空单元格的类型，可以传入type_counter分块累加
+
+    Arguments:
+        col_types {list} -- 一列的单元格类型
+        col_values {list} -- 一列的单元格值
+
+    Keyword Arguments:
+        type_counter {Counter} -- 累加到的计数，None时新建 (default: {None})
+
+    Returns:
+        Counter -- {单元格类型: 个数}
+    """
+    if type_counter is None:
+        type_counter = Counter()
+    for col_type, value in zip(col_types, col_values):
+        cell_kind = get_cell_kind(col_type, value)
+        if cell_kind != xlrd.XL_CELL_EMPTY:
+            type_counter[cell_kind] += 1
+    return type_counter
+
+
+def get_dominant_type(col_types: list, col_values: list, type_counter: Counter = None) -> int:
+    """获取一列中出现次数最多的非空单元格类型。
+    与SheetType一致，数字字符串看作数值，只计入可以转换为数值的十进制数字。
+
+    Keyword Arguments:
+        type_counter {Counter} -- count_cell_kinds分块累加的计数，设置时不再统计col_types (default: {None})
+
+    Returns:
+        int -- xlrd的单元格类型，全为空时返回XL_CELL_EMPTY
+    """
+    if type_counter is None:
+        type_counter = count_cell_kinds(col_types, col_values)
+    if not type_counter:
+        return xlrd.XL_CELL_EMPTY
+    return type_counter.most_common(1)[0][0]
+
+
+def _build_number_column(col_types: list, col_values: list) -> "np.ma.MaskedArray":
+    values = np.zeros(len(col_values), dtype=np.float64)
+    mask = np.ones(len(col_values), dtype=bool)
+    for index, (col_type, value) in enumerate(zip(col_types, col_values)):
+        if col_type == xlrd.XL_CELL_NUMBER:
+            values[index] = value
+            mask[index] = False
+        elif col_type == xlrd.XL_CELL_TEXT:
+            # 不能转换为数值的字符串被mask
+            number = _text_to_number(value)
+            if number is not None:
+                values[index] = number
+                mask[index] = False
+    valid = values[~mask]
+    # 所有的值都是整数时，使用int64
+    if len(valid) and np.all(np.mod(valid, 1) == 0) and np.all(np.abs(valid) < 2 ** 63):
+        values = values.astype(np.int64)
+    return np.ma.MaskedArray(values, mask=mask)
+
+
+def _build_date_column(col_types: list, col_values: list, datemode: int) -> "np.ma.MaskedArray":
+    serials = np.zeros(len(col_values), dtype=np.float64)
+    mask = np.ones(len(col_values), dtype=bool)
+    for index, (col_type, value) in enumerate(zip(col_types, col_values)):
+        if col_type in [xlrd.XL_CELL_DATE, xlrd.XL_CELL_NUMBER]:
+            serials[index] = value
+            mask[index] = False
+    offsets = np.round(serials * MS_PER_DAY).astype("timedelta64[ms]")
+    dates = XL_EPOCHS[datemode] + offsets
+    dates[mask] = np.datetime64("NaT")
+    return np.ma.MaskedArray(dates, mask=mask)
+
+
+def _build_boolean_column(col_types: list, col_values: list) -> "np.ma.MaskedArray":
+    values = np.zeros(len(col_values), dtype=bool)
+    mask = np.ones(len(col_values), dtype=bool)
+    for index, (col_type, value) in enumerate(zip(col_types, col_values)):
+        if col_type == xlrd.XL_CELL_BOOLEAN:
+            values[index] = bool(value)
+            mask[index] = False
+    return np.ma.MaskedArray(values, mask=mask)
+
+
+def _build_text_column(col_types: list, col_values: list):
+    codes = np.full(len(col_values), -1, dtype=np.int32)
+    category_codes = {}
+    for index, (col_type, value) in enumerate(zip(col_types, col_values)):
+        if _is_null(col_type, value):
+            continue
+        codes[index] = category_codes.setdefault(value, len(category_codes))
+    # 重复的字符串较多时使用字典编码
+    if len(category_codes) * 2 <= len(col_values):
+        categories = np.array(list(category_codes), dtype=object)
+        return CategoricalColumn(codes, categories)
+    return _build_object_column(col_types, col_values)
+
+
+def _build_object_column(col_types: list, col_values: list) -> "np.ndarray":
+    values = np.empty(len(col_values), dtype=object)
+    for index, (col_type, value) in enumerate(zip(col_types, col_values)):
+        values[index] = None if _is_null(col_type, value) else value
+    return values
+
+
+def build_column(col_kind: int, col_types: list, col_values: list, datemode: int = 0):
+    """按指定的列类型构建连续存储的列，不符合列类型的单元格被mask。
+        数值: int64/float64的MaskedArray，空值和非数值被mask。
+        日期: datetime64[ms]的MaskedArray。
+        boolean: bool的MaskedArray。
+        字符串: 重复较多时为CategoricalColumn，否则为object数组。
+        其余: object数组，空值为None。
+
+    Arguments:
+        col_kind {int} -- 列类型，get_dominant_type的结果
+        col_types {list} -- 一列的单元格类型
+        col_values {list} -- 一列的单元格值
+
+    Keyword Arguments:
+        datemode {int} -- workbook.datemode (default: {0})
+
+    Returns:
+        np.ma.MaskedArray|CategoricalColumn|np.ndarray -- 列数据
+    """
+    if col_kind == xlrd.XL_CELL_NUMBER:
+        return _build_number_column(col_types, col_values)
+    if col_kind == xlrd.XL_CELL_DATE:
+        return _build_date_column(col_types, col_values, datemode)
+    if col_kind == xlrd.XL_CELL_BOOLEAN:
+        return _build_boolean_column(col_types, col_values)
+    if col_kind == xlrd.XL_CELL_TEXT:
+        return _build_text_column(col_types, col_values)
+    return _build_object_column(col_types, col_values)
+
+
+def build_typed_column(col_types: list, col_values: list, datemode: int = 0):
+    """根据一列中的主要单元格类型构建连续存储的列，见build_column
+
+    Arguments:
+        col_types {list} -- 一列的单元格类型
+        col_values {list} -- 一列的单元格值
+
+    Keyword Arguments:
+        datemode {int} -- workbook.datemode (default: {0})
+
+    Returns:
+        np.ma.MaskedArray|CategoricalColumn|np.ndarray -- 列数据
+    """
+    return build_column(get_dominant_type(col_types, col_values), col_types, col_values, datemode)
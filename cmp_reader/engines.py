@@ -0,0 +1,563 @@
+import datetime
+import os
+import posixpath
+import re
+import sys
+import zipfile
+from collections import deque, namedtuple
+from xml.etree.ElementTree import iterparse
+
+import xlrd
+from xlrd.biffh import error_text_from_code
+from xlrd.formatting import FDT, is_date_format_string, std_format_code_types
+from xlrd.sheet import Cell
+from xlrd.xldate import xldate_from_datetime_tuple, xldate_from_time_tuple
+
+__all__ = ["XlrdEngine", "XlsxEngine", "ENGINES", "get_engine", "sheet_has_capability"]
+
+# 单个单元格访问时，一次加载的行数；xlsx sheet开头和末尾常驻内存的行数
+ROW_BLOCK = 1024
+
+# engine提供的可选能力，reader按能力选择读取方式
+#   xf_index_matrix: sheet.xf_index_matrix(nrows)一次返回前nrows行每个单元格的xf index
+#   last_value_row: sheet.last_value_row为最后一个有值的行号+1，不需要从后往前逐行查找
+#   merged_cells: 不解析格式(formatting_info=False)时sheet.merged_cells仍然可用
+XF_INDEX_MATRIX = "xf_index_matrix"
+LAST_VALUE_ROW = "last_value_row"
+MERGED_CELLS = "merged_cells"
+
+# xlsx边框线型对应的xlrd线型
+LINE_STYLES = {
+    "thin": 1, "medium": 2, "dashed": 3, "dotted": 4, "thick": 5,
+    "double": 6, "hair": 7, "mediumDashed": 8, "dashDot": 9,
+    "mediumDashDot": 10, "dashDotDot": 11, "mediumDashDotDot": 12,
+    "slantDashDot": 13,
+}
+ERROR_CODES = {text: code for code, text in error_text_from_code.items()}
+CELL_REF = re.compile(r"([A-Z]+)(\d+)")
+
+XlsxBorder = namedtuple(
+    "XlsxBorder",
+    ["top_line_style", "bottom_line_style", "left_line_style", "right_line_style"])
+XlsxXF = namedtuple("XlsxXF", ["border", "format_key"])
+EMPTY_BORDER = XlsxBorder(0, 0, 0, 0)
+
+
+class XlrdEngine:
+    """使用xlrd读取.xls文件
+    """
+    name = "xlrd"
+    extensions = (".xls",)
+    capabilities = frozenset()
+
+    def open_workbook(self, file_path: str, formatting_info: bool = True, on_demand: bool = False):
+        return xlrd.open_workbook(file_path, formatting_info=formatting_info,
+                                  on_demand=on_demand)
+
+
+class XlsxEngine:
+    """流式读取.xlsx文件。
+    sheet的xml通过iterparse增量解析，只在内存中保留当前读取的行。
+    """
+    name = "xlsx"
+    extensions = (".xlsx", ".xlsm")
+    capabilities = frozenset([XF_INDEX_MATRIX, LAST_VALUE_ROW, MERGED_CELLS])
+
+    def open_workbook(self, file_path: str, formatting_info: bool = True, on_demand: bool = False):
+        # sheet总是在访问时才解析，合并单元格总是可用
+        return XlsxBook(file_path, formatting_info)
+
+
+ENGINES = {
+    XlrdEngine.name: XlrdEngine,
+    XlsxEngine.name: XlsxEngine,
+}
+
+
+def get_engine(file_path: str, engine: str = None):
+    """获取读取文件的engine
+
+    Arguments:
+        file_path {str} -- excel file path
+
+    Keyword Arguments:
+        engine {str} -- engine名，None时根据文件后缀选择 (default: {None})
+
+    Returns:
+        engine -- XlrdEngine或XlsxEngine
+    """
+    if engine is not None:
+        try:
+            return ENGINES[engine]()
+        except KeyError:
+            raise ValueError(f"unknown engine {engine!r}, choose from {list(ENGINES)}")
+    extension = os.path.splitext(str(file_path))[1].lower()
+    for engine_class in ENGINES.values():
+        if extension in engine_class.extensions:
+            return engine_class()
+    return XlrdEngine()
+
+
+def sheet_has_capability(sheet, capability: str) -> bool:
+    """读取sheet的engine是否提供capability
+
+    Arguments:
+        sheet {xlrd.sheet|XlsxSheet} -- excel sheet
+        capability {str} -- XF_INDEX_MATRIX、LAST_VALUE_ROW或MERGED_CELLS
+
+    Returns:
+        bool -- 是否提供
+    """
+    engine_class = XlsxEngine if isinstance(sheet, XlsxSheet) else XlrdEngine
+    return capability in engine_class.capabilities
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _col_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def _parse_cell_ref(ref: str) -> tuple:
+    """把"B3"转换为(2, 1)
+    """
+    match = CELL_REF.match(ref)
+    return int(match.group(2)) - 1, _col_index(match.group(1))
+
+
+def _element_text(elem) -> str:
+    """获取<si>或者<is>中所有<t>的文本，忽略注音
+    """
+    texts = []
+    for child in elem:
+        name = _local_name(child.tag)
+        if name == "t":
+            texts.append(child.text or "")
+        elif name == "r":
+            texts.extend(each.text or "" for each in child
+                         if _local_name(each.tag) == "t")
+    return "".join(texts)
+
+
+def _iso_to_xldate(text: str, datemode: int) -> float:
+    """把t="d"单元格的ISO 8601日期或时间转换为excel的日期序号
+
+    Returns:
+        float -- 与数值日期单元格一样的日期序号
+    """
+    text = text[:-1] if text.endswith("Z") else text
+    try:
+        value = datetime.datetime.fromisoformat(text)
+    except ValueError:
+        # 只有时间的单元格
+        value = datetime.time.fromisoformat(text)
+        return xldate_from_time_tuple((value.hour, value.minute, value.second))
+    return xldate_from_datetime_tuple(
+        (value.year, value.month, value.day, value.hour, value.minute, value.second), datemode)
+
+
+class XlsxBook:
+    """与xlrd.Book接口一致的xlsx workbook。
+    打开时只解析workbook、共享字符串和样式，sheet在访问时才解析。
+    """
+    verbosity = 0
+    logfile = sys.stdout
+
+    def __init__(self, file_path: str, formatting_info: bool = True):
+        """
+        Arguments:
+            file_path {str} -- .xlsx file path
+
+        Keyword Arguments:
+            formatting_info {bool} -- 与xlrd一样，False时reader不使用边框和T型表头；
+                                      日期需要单元格格式，样式总是会被解析 (default: {True})
+        """
+        self.file_path = file_path
+        self.formatting_info = formatting_info
+        self.zip_file = zipfile.ZipFile(file_path)
+        self.datemode = 0
+        self._sheet_paths = self._parse_workbook()
+        self.shared_strings = self._parse_shared_strings()
+        self.xf_list, self._date_xf = self._parse_styles()
+        self._sheets = {}
+        # release_resources之后sheet不能再从文件中解析
+        self.closed = False
+
+    def _parse_workbook(self) -> dict:
+        rels = {}
+        with self.zip_file.open("xl/_rels/workbook.xml.rels") as f:
+            for _, elem in iterparse(f):
+                if _local_name(elem.tag) == "Relationship":
+                    target = elem.get("Target")
+                    if target.startswith("/"):
+                        target = target[1:]
+                    else:
+                        target = posixpath.normpath(posixpath.join("xl", target))
+                    rels[elem.get("Id")] = target
+
+        sheet_paths = {}
+        with self.zip_file.open("xl/workbook.xml") as f:
+            for _, elem in iterparse(f):
+                name = _local_name(elem.tag)
+                if name == "workbookPr":
+                    self.datemode = 1 if elem.get("date1904") in ["1", "true"] else 0
+                elif name == "sheet":
+                    rel_id = next(value for key, value in elem.attrib.items()
+                                  if _local_name(key) == "id")
+                    sheet_paths[elem.get("name")] = rels[rel_id]
+        return sheet_paths
+
+    def _parse_shared_strings(self) -> list:
+        shared_strings = []
+        if "xl/sharedStrings.xml" not in self.zip_file.namelist():
+            return shared_strings
+        with self.zip_file.open("xl/sharedStrings.xml") as f:
+            for _, elem in iterparse(f):
+                if _local_name(elem.tag) == "si":
+                    shared_strings.append(_element_text(elem))
+                    elem.clear()
+        return shared_strings
+
+    def _parse_styles(self) -> tuple:
+        """解析边框和单元格格式
+
+        Returns:
+            tuple -- (xf_list, 每个xf是否为日期格式)
+        """
+        if "xl/styles.xml" not in self.zip_file.namelist():
+            return [XlsxXF(EMPTY_BORDER, 0)], [False]
+
+        num_formats = {}
+        borders = []
+        cell_xfs = []
+        with self.zip_file.open("xl/styles.xml") as f:
+            for _, elem in iterparse(f):
+                name = _local_name(elem.tag)
+                if name == "numFmt":
+                    num_formats[int(elem.get("numFmtId"))] = elem.get("formatCode")
+                elif name == "border":
+                    line_styles = {}
+                    for side in elem:
+                        line_styles[_local_name(side.tag)] = LINE_STYLES.get(
+                            side.get("style"), 0)
+                    borders.append(XlsxBorder(
+                        line_styles.get("top", 0), line_styles.get("bottom", 0),
+                        line_styles.get("left", 0), line_styles.get("right", 0)))
+                elif name == "cellXfs":
+                    cell_xfs = [(int(xf.get("borderId", 0)), int(xf.get("numFmtId", 0)))
+                                for xf in elem if _local_name(xf.tag) == "xf"]
+
+        xf_list = []
+        date_xf = []
+        for border_id, num_format_id in cell_xfs or [(0, 0)]:
+            border = borders[border_id] if border_id < len(borders) else EMPTY_BORDER
+            xf_list.append(XlsxXF(border, num_format_id))
+            if num_format_id in num_formats:
+                date_xf.append(is_date_format_string(self, num_formats[num_format_id]))
+            else:
+                date_xf.append(std_format_code_types.get(num_format_id) == FDT)
+        return xf_list, date_xf
+
+    @property
+    def nsheets(self) -> int:
+        return len(self._sheet_paths)
+
+    def sheet_names(self) -> list:
+        return list(self._sheet_paths)
+
+    def sheet_by_name(self, sheet_name: str) -> "XlsxSheet":
+        if sheet_name not in self._sheet_paths:
+            raise xlrd.XLRDError(f"No sheet named <{sheet_name!r}>")
+        if sheet_name not in self._sheets:
+            self._sheets[sheet_name] = XlsxSheet(
+                self, sheet_name, self._sheet_paths[sheet_name])
+        return self._sheets[sheet_name]
+
+    def sheet_by_index(self, sheet_index: int) -> "XlsxSheet":
+        return self.sheet_by_name(self.sheet_names()[sheet_index])
+
+    def is_date_xf(self, xf_index: int) -> bool:
+        return 0 <= xf_index < len(self._date_xf) and self._date_xf[xf_index]
+
+    def unload_sheet(self, sheet_name_or_index):
+        if isinstance(sheet_name_or_index, int):
+            sheet_name_or_index = self.sheet_names()[sheet_name_or_index]
+        sheet = self._sheets.pop(sheet_name_or_index, None)
+        if sheet is not None:
+            sheet.close_stream()
+
+    def release_resources(self):
+        # 正在解析的sheet xml也持有zip文件
+        for sheet in self._sheets.values():
+            sheet.close_stream()
+        self._sheets = {}
+        self.zip_file.close()
+        self.closed = True
+
+
+class _XFInfo:
+    """行列的默认格式，与xlrd的Rowinfo/Colinfo一样提供xf_index
+    """
+
+    def __init__(self, xf_index: int):
+        self.xf_index = xf_index
+
+
+class XlsxSheet:
+    """与xlrd.sheet.Sheet接口一致的xlsx sheet。
+    打开时流式扫描一遍xml，只记录行列数、最后有值的行、合并单元格和行列格式，
+    并保留最前和最后ROW_BLOCK行：表头检测和从后往前查找数据结束的位置都不需要重新解析；
+    其余单元格按行块向前加载，内存中只保留最近访问的一段连续行。
+    """
+
+    def __init__(self, book: XlsxBook, name: str, path: str):
+        self.book = book
+        self.name = name
+        self.path = path
+        self.nrows = 0
+        self.ncols = 0
+        self.last_value_row = 0
+        self.merged_cells = []
+        self.rowinfo_map = {}
+        self.colinfo_map = {}
+        # 扫描时保留的行 [0, head_end)和[tail_start, nrows)
+        self._kept_rows = {}
+        self._head_end = 0
+        self._tail_start = 0
+        self._scan_sheet()
+
+        # 已加载的行 [buffer_start, buffer_end)
+        self._rows = {}
+        self._buffer_start = 0
+        self._buffer_end = 0
+        self._stream = None
+        self._pending = None
+
+    def close_stream(self):
+        """结束正在进行的增量解析，释放打开的sheet xml
+        """
+        if self._stream is not None:
+            self._stream.close()
+        self._stream = None
+        self._pending = None
+
+    def _iter_elements(self, kept_rows: deque = None):
+        """增量解析sheet xml，逐个返回已经结束的<row>以及其余的元素
+
+        Keyword Arguments:
+            kept_rows {deque} -- 设置时最近的<row>不被清除，保存在这个有界的deque中 (default: {None})
+        """
+        if self.book.closed:
+            raise RuntimeError(f"the workbook of sheet {self.name!r} has been closed")
+        with self.book.zip_file.open(self.path) as f:
+            sheet_data = None
+            for event, elem in iterparse(f, events=("start", "end")):
+                name = _local_name(elem.tag)
+                if event == "start":
+                    if name == "sheetData":
+                        sheet_data = elem
+                    continue
+                yield name, elem
+                if name == "row" and sheet_data is not None:
+                    # 释放已经处理的行
+                    if kept_rows is None:
+                        elem.clear()
+                    else:
+                        if len(kept_rows) == kept_rows.maxlen:
+                            kept_rows[0].clear()
+                        kept_rows.append(elem)
+                    sheet_data.clear()
+
+    def _iter_rows(self):
+        """逐行返回(行号, 单元格类型, 单元格值, xf index)
+        """
+        row_index = -1
+        for name, elem in self._iter_elements():
+            if name != "row":
+                continue
+            row_index = int(elem.get("r")) - 1 if elem.get("r") else row_index + 1
+            yield (row_index,) + self._parse_row(elem)
+
+    def _parse_row(self, row_elem) -> tuple:
+        types, values, xf_indexes = [], [], []
+        col = -1
+        for cell_elem in row_elem:
+            if _local_name(cell_elem.tag) != "c":
+                continue
+            ref = cell_elem.get("r")
+            col = _parse_cell_ref(ref)[1] if ref else col + 1
+            if col > len(types):
+                padding = col - len(types)
+                types.extend([xlrd.XL_CELL_EMPTY] * padding)
+                values.extend([""] * padding)
+                xf_indexes.extend([-1] * padding)
+            xf_index = int(cell_elem.get("s", 0))
+            cell_type, value = self._parse_cell(cell_elem, xf_index)
+            types.append(cell_type)
+            values.append(value)
+            xf_indexes.append(xf_index)
+        return types, values, xf_indexes
+
+    def _parse_cell(self, cell_elem, xf_index: int) -> tuple:
+        data_type = cell_elem.get("t", "n")
+        raw_value = None
+        for child in cell_elem:
+            name = _local_name(child.tag)
+            if name == "v":
+                raw_value = child.text
+            elif name == "is":
+                return xlrd.XL_CELL_TEXT, _element_text(child)
+
+        if raw_value is None:
+            return xlrd.XL_CELL_BLANK, ""
+        if data_type == "s":
+            return xlrd.XL_CELL_TEXT, self.book.shared_strings[int(raw_value)]
+        if data_type in ["str", "inlineStr"]:
+            return xlrd.XL_CELL_TEXT, raw_value
+        if data_type == "b":
+            return xlrd.XL_CELL_BOOLEAN, int(raw_value)
+        if data_type == "e":
+            return xlrd.XL_CELL_ERROR, ERROR_CODES.get(raw_value, raw_value)
+        if data_type == "d":
+            try:
+                return xlrd.XL_CELL_DATE, _iso_to_xldate(raw_value, self.book.datemode)
+            except ValueError:
+                # excel的日期序号不能表示的日期保留原文
+                return xlrd.XL_CELL_TEXT, raw_value
+        if self.book.is_date_xf(xf_index):
+            return xlrd.XL_CELL_DATE, float(raw_value)
+        return xlrd.XL_CELL_NUMBER, float(raw_value)
+
+    def _scan_sheet(self):
+        """扫描整个sheet，获取行列数、最后有值的行、合并单元格以及行列的默认格式，
+        并解析最前和最后ROW_BLOCK行
+        """
+        kept_rows = deque(maxlen=ROW_BLOCK)
+        row_indexes = deque(maxlen=ROW_BLOCK)
+        row_index = -1
+        for name, elem in self._iter_elements(kept_rows):
+            if name == "row":
+                row_index = int(elem.get("r")) - 1 if elem.get("r") else row_index + 1
+                row_indexes.append(row_index)
+                if row_index < ROW_BLOCK:
+                    self._kept_rows[row_index] = self._parse_row(elem)
+                if elem.get("s") is not None and elem.get("customFormat") in ["1", "true"]:
+                    self.rowinfo_map[row_index] = _XFInfo(int(elem.get("s")))
+                col = -1
+                for cell_elem in elem:
+                    if _local_name(cell_elem.tag) != "c":
+                        continue
+                    ref = cell_elem.get("r")
+                    col = _parse_cell_ref(ref)[1] if ref else col + 1
+                    self.ncols = max(self.ncols, col + 1)
+                    self.nrows = row_index + 1
+                    # 与xlrd一致，只有样式没有值的单元格为XL_CELL_BLANK
+                    if any(_local_name(child.tag) in ["v", "is"] for child in cell_elem):
+                        self.last_value_row = row_index + 1
+            elif name == "col" and elem.get("style") is not None:
+                for col in range(int(elem.get("min")) - 1, int(elem.get("max"))):
+                    self.colinfo_map[col] = _XFInfo(int(elem.get("style")))
+            elif name == "mergeCell":
+                first, _, last = elem.get("ref").partition(":")
+                r_start, c_start = _parse_cell_ref(first)
+                r_end, c_end = _parse_cell_ref(last or first)
+                self.merged_cells.append((r_start, r_end + 1, c_start, c_end + 1))
+
+        self._head_end = min(self.nrows, ROW_BLOCK)
+        self._tail_start = max(self.nrows - ROW_BLOCK, self._head_end)
+        for row_index, row_elem in zip(row_indexes, kept_rows):
+            if row_index >= self._tail_start:
+                self._kept_rows[row_index] = self._parse_row(row_elem)
+            row_elem.clear()
+
+    def _load_rows(self, start: int, end: int):
+        """加载[start, end)行，替换已加载的行。
+        扫描时保留的最前和最后几行不再加载。
+        需要的行在当前解析位置之前且不在已加载的行中时，从头重新解析。
+        """
+        start = max(start, self._head_end)
+        end = min(end, self._tail_start)
+        if start >= end or self._buffer_start <= start and end <= self._buffer_end:
+            return
+        consumed = self._pending[0] if self._pending else self.nrows
+        if self._stream is None or (start < consumed and not (
+                self._buffer_start <= start and min(end, consumed) <= self._buffer_end)):
+            self._stream = self._iter_rows()
+            self._pending = next(self._stream, None)
+
+        rows = {row: self._rows[row] for row in range(start, end) if row in self._rows}
+        while self._pending is not None and self._pending[0] < end:
+            row_index, types, values, xf_indexes = self._pending
+            if row_index >= start:
+                rows[row_index] = (types, values, xf_indexes)
+            self._pending = next(self._stream, None)
+        self._rows = rows
+        self._buffer_start, self._buffer_end = start, end
+
+    def _get_row(self, rowx: int) -> tuple:
+        if not 0 <= rowx < self.nrows:
+            raise IndexError(f"row index {rowx} out of range")
+        if rowx < self._head_end or rowx >= self._tail_start:
+            return self._kept_rows.get(rowx, ([], [], []))
+        if not self._buffer_start <= rowx < self._buffer_end:
+            if rowx < self._buffer_start:
+                self._load_rows(max(0, rowx - ROW_BLOCK + 1), rowx + 1)
+            else:
+                self._load_rows(rowx, rowx + ROW_BLOCK)
+        return self._rows.get(rowx, ([], [], []))
+
+    def _row_slice(self, row: list, start: int, end, fill) -> list:
+        end = self.ncols if end is None else end
+        values = row[start:end]
+        return values + [fill] * (end - start - len(values))
+
+    def cell_type(self, rowx: int, colx: int) -> int:
+        types = self._get_row(rowx)[0]
+        return types[colx] if colx < len(types) else xlrd.XL_CELL_EMPTY
+
+    def cell_value(self, rowx: int, colx: int):
+        values = self._get_row(rowx)[1]
+        return values[colx] if colx < len(values) else ""
+
+    def cell_xf_index(self, rowx: int, colx: int) -> int:
+        xf_indexes = self._get_row(rowx)[2]
+        xf_index = xf_indexes[colx] if colx < len(xf_indexes) else -1
+        if xf_index > -1:
+            return xf_index
+        if rowx in self.rowinfo_map:
+            return self.rowinfo_map[rowx].xf_index
+        if colx in self.colinfo_map:
+            return self.colinfo_map[colx].xf_index
+        return 0
+
+    def cell(self, rowx: int, colx: int) -> Cell:
+        return Cell(self.cell_type(rowx, colx), self.cell_value(rowx, colx),
+                    self.cell_xf_index(rowx, colx))
+
+    def row_types(self, rowx: int, start_colx: int = 0, end_colx: int = None) -> list:
+        return self._row_slice(self._get_row(rowx)[0], start_colx, end_colx, xlrd.XL_CELL_EMPTY)
+
+    def row_values(self, rowx: int, start_colx: int = 0, end_colx: int = None) -> list:
+        return self._row_slice(self._get_row(rowx)[1], start_colx, end_colx, "")
+
+    def col_types(self, colx: int, start_rowx: int = 0, end_rowx: int = None) -> list:
+        end_rowx = self.nrows if end_rowx is None else end_rowx
+        self._load_rows(start_rowx, end_rowx)
+        return [self.cell_type(row, colx) for row in range(start_rowx, end_rowx)]
+
+    def col_values(self, colx: int, start_rowx: int = 0, end_rowx: int = None) -> list:
+        end_rowx = self.nrows if end_rowx is None else end_rowx
+        self._load_rows(start_rowx, end_rowx)
+        return [self.cell_value(row, colx) for row in range(start_rowx, end_rowx)]
+
+    def xf_index_matrix(self, nrows: int) -> list:
+        """前nrows行每个单元格的xf index，与cell_xf_index一致
+        """
+        self._load_rows(0, nrows)
+        return [[self.cell_xf_index(row, col) for col in range(self.ncols)]
+                for row in range(nrows)]
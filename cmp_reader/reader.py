@@ -2,53 +2,427 @@ import xlrd
 from xlrd.sheet import Cell
 from xlrd import sheet
 from collections import Counter
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from functools import reduce
+import bisect
 import math
+import os
+import signal
+import threading
+import time
+import warnings
+import weakref
 
-__all__ = ["ExcelCompxReader", "read_excel"]
+import numpy as np
+
+from .cache import ResultCache
+from .columns import build_typed_column, get_cell_kind, get_dominant_type
+from .engines import (LAST_VALUE_ROW, MERGED_CELLS, ROW_BLOCK, XF_INDEX_MATRIX, get_engine,
+                      sheet_has_capability)
+from .stats import NULL_STATS, ReadStats
+from .template import LayoutTemplate, ReadCheckpoint, TemplateRegistry
+
+__all__ = ["ExcelCompxReader", "RowIndex", "LazyColumns", "read_excel", "read_all_sheets", "read_many"]
 
 MAX_SEARCH_ROW = 100
 
+# 读取模式
+#   accurate: 带格式打开workbook，合并、边框、类型三种检测投票。
+#   fast: 不解析格式，只用合并(可用时)和类型检测，不解析T型表头。
+#   auto: 先按fast划分，置信度不够或者表头可能存在合并单元格时带格式重新打开。
+READ_MODES = ["accurate", "fast", "auto"]
+# auto模式下接受fast划分结果的最低类型一致度
+AUTO_MIN_CONFIDENCE = 0.8
+# usecols为列号时，表头与数据的划分只使用选中的列和均匀抽取的DETECT_SAMPLE_COLS列
+DETECT_SAMPLE_COLS = 16
+
+# xlrd在没有单元格、行、列格式时使用的默认XF
+DEFAULT_XF_INDEX = 15
+
+# 每个workbook的XF边框查找表
+_XF_BORDER_TABLES = weakref.WeakKeyDictionary()
+
+# 每个sheet的合并单元格索引
+_MERGED_INDEXES = weakref.WeakKeyDictionary()
+
+
+class XFBorderTable:
+    """XF边框查找表。
+    按XF index保存上、下、左、右四条边框的线型，以及有边框的边数。
+    """
+    TOP, BOTTOM, LEFT, RIGHT = range(4)
+
+    def __init__(self, workbook: "xlrd.Workbook"):
+        line_styles = [
+            (xf.border.top_line_style, xf.border.bottom_line_style,
+             xf.border.left_line_style, xf.border.right_line_style)
+            for xf in workbook.xf_list
+        ]
+        self.line_styles = np.array(line_styles, dtype=np.int8).reshape(-1, 4)
+        self.side_counts = (self.line_styles > 0).sum(axis=1)
+
+
+def get_xf_border_table(workbook: "xlrd.Workbook") -> XFBorderTable:
+    """获取workbook的XF边框查找表，每个workbook只构建一次。
+
+    Arguments:
+        workbook {xlrd.Workbook} -- 打开的workbook(formatting_info=True)
+
+    Returns:
+        XFBorderTable -- XF边框查找表
+    """
+    table = _XF_BORDER_TABLES.get(workbook)
+    if table is None:
+        table = XFBorderTable(workbook)
+        _XF_BORDER_TABLES[workbook] = table
+    return table
+
+
+def get_sheet_xf_indexes(sheet: xlrd.sheet, nrows: int = None) -> "np.ndarray":
+    """从sheet保存的原始xf index构建(nrows, ncols)的矩阵。
+    没有单元格格式时，与sheet.cell_xf_index一样依次使用行格式、列格式和默认格式。
+
+    Arguments:
+        sheet {xlrd.sheet} -- excel sheet
+
+    Keyword Arguments:
+        nrows {int} -- 只取前nrows行，None表示整张sheet (default: {None})
+
+    Returns:
+        np.ndarray -- 每个单元格的xf index
+    """
+    nrows = sheet.nrows if nrows is None else min(nrows, sheet.nrows)
+    if sheet_has_capability(sheet, XF_INDEX_MATRIX):
+        # 非xlrd的engine自行提供xf index
+        return np.array(sheet.xf_index_matrix(nrows), dtype=np.int32).reshape(nrows, sheet.ncols)
+    ncols = sheet.ncols
+    xf_indexes = np.full((nrows, ncols), -1, dtype=np.int32)
+    for row in range(nrows):
+        row_xf_indexes = sheet._cell_xf_indexes[row][:ncols]
+        xf_indexes[row, :len(row_xf_indexes)] = row_xf_indexes
+
+    missing = xf_indexes == -1
+    if missing.any():
+        row_default = np.full(nrows, -1, dtype=np.int32)
+        for row, info in sheet.rowinfo_map.items():
+            if row < nrows:
+                row_default[row] = info.xf_index
+        col_default = np.full(ncols, DEFAULT_XF_INDEX, dtype=np.int32)
+        for col, info in sheet.colinfo_map.items():
+            if col < ncols and info.xf_index > -1:
+                col_default[col] = info.xf_index
+        fallback = np.where(row_default[:, None] > -1,
+                            row_default[:, None], col_default[None, :])
+        xf_indexes[missing] = fallback[missing]
+    return xf_indexes
+
+
+class MergedIndex:
+    """sheet合并单元格的索引。
+    合并单元格按在sheet.merged_cells中的序号编号，提供：
+        1、每一行被合并单元格覆盖的列区间。
+        2、有合并单元格的行。
+        3、表头区域中每个单元格所属合并单元格序号的稠密矩阵。
+    """
+
+    def __init__(self, sheet: xlrd.sheet):
+        self.ncols = sheet.ncols
+        self.merged_cells = [tuple(merge_cell) for merge_cell in sheet.merged_cells]
+        merged_cells = np.array(self.merged_cells, dtype=np.int64).reshape(-1, 4)
+        self.r_starts = merged_cells[:, 0]
+        self.r_ends = merged_cells[:, 1]
+        self.c_starts = merged_cells[:, 2]
+        self.c_ends = merged_cells[:, 3]
+
+        # 行号 -> [(c_start, c_end, 合并单元格序号)]
+        self.row_intervals = {}
+        for merge_id, (r_start, r_end, c_start, c_end) in enumerate(self.merged_cells):
+            for row in range(r_start, r_end):
+                self.row_intervals.setdefault(row, []).append((c_start, c_end, merge_id))
+        for intervals in self.row_intervals.values():
+            intervals.sort()
+
+        self._owner_grids = {}
+
+    def __len__(self) -> int:
+        return len(self.merged_cells)
+
+    def get_merge_row_mask(self, nrows: int, ignored: "np.ndarray" = None) -> "np.ndarray":
+        """前nrows行中每一行是否有合并单元格。
+        通过差分数组计算，不展开每个合并单元格覆盖的行。
+
+        Arguments:
+            nrows {int} -- 行数
+
+        Keyword Arguments:
+            ignored {np.ndarray} -- 每个合并单元格是否忽略的bool数组，None为不忽略 (default: {None})
+
+        Returns:
+            np.ndarray -- bool数组
+        """
+        r_starts, r_ends = self.r_starts, self.r_ends
+        if ignored is not None:
+            r_starts, r_ends = r_starts[~ignored], r_ends[~ignored]
+        diff = np.zeros(nrows + 1, dtype=np.int64)
+        np.add.at(diff, np.minimum(r_starts, nrows), 1)
+        np.add.at(diff, np.minimum(r_ends, nrows), -1)
+        return np.cumsum(diff[:nrows]) > 0
+
+    def get_index_merge_mask(self, max_cols: int = None) -> "np.ndarray":
+        """左侧index列中的纵向合并单元格。
+        从第一列开始连续的、带有只占一列的纵向合并单元格的列为index列，
+        其中覆盖的行没有其他合并单元格的纵向合并是index的值；
+        表头中纵向合并的单元格所在的行还有横向合并的上层表头，不会被当作index。
+
+        Keyword Arguments:
+            max_cols {int} -- index列最多的列数，None为不限制 (default: {None})
+
+        Returns:
+            np.ndarray -- 每个合并单元格是否为index值的bool数组
+        """
+        vertical = (self.c_ends - self.c_starts == 1) & (self.r_ends - self.r_starts > 1)
+        index_cols = 0
+        while ((max_cols is None or index_cols < max_cols) and
+               (vertical & (self.c_starts == index_cols)).any()):
+            index_cols += 1
+        mask = vertical & (self.c_starts < index_cols)
+        if not mask.any():
+            return mask
+        other_rows = self.get_merge_row_mask(int(self.r_ends.max()), mask)
+        for merge_id in np.flatnonzero(mask):
+            if other_rows[self.r_starts[merge_id]:self.r_ends[merge_id]].any():
+                mask[merge_id] = False
+        return mask
+
+    def find(self, row: int, col: int) -> int:
+        """查找单元格所属的合并单元格
+
+        Returns:
+            int -- 合并单元格序号，不在合并单元格中时返回-1
+        """
+        for c_start, c_end, merge_id in self.row_intervals.get(row, []):
+            if c_start <= col < c_end:
+                return merge_id
+            if c_start > col:
+                break
+        return -1
+
+    def get_owner_grid(self, nrows: int) -> "np.ndarray":
+        """前nrows行中每个单元格所属的合并单元格序号，不在合并单元格中为-1。
+
+        Arguments:
+            nrows {int} -- 行数，一般为表头的行数
+
+        Returns:
+            np.ndarray -- (nrows, ncols)的矩阵
+        """
+        if nrows not in self._owner_grids:
+            grid = np.full((nrows, self.ncols), -1, dtype=np.int64)
+            for merge_id in np.flatnonzero(self.r_starts < nrows):
+                grid[self.r_starts[merge_id]:min(self.r_ends[merge_id], nrows),
+                     self.c_starts[merge_id]:self.c_ends[merge_id]] = merge_id
+            self._owner_grids[nrows] = grid
+        return self._owner_grids[nrows]
+
+
+def get_merged_index(sheet: xlrd.sheet) -> MergedIndex:
+    """获取sheet的合并单元格索引，每个sheet只构建一次。
+
+    Arguments:
+        sheet {xlrd.sheet} -- excel sheet
+
+    Returns:
+        MergedIndex -- 合并单元格索引
+    """
+    merged_index = _MERGED_INDEXES.get(sheet)
+    if merged_index is None:
+        merged_index = MergedIndex(sheet)
+        _MERGED_INDEXES[sheet] = merged_index
+    return merged_index
+
+
+def _is_full_col(sheet: xlrd.sheet, index: int, start_row: int, end_row: int) -> bool:
+    """列在[start_row, end_row)中是否没有空值。
+    按ROW_BLOCK行分块读取，遇到空值立即停止，不会一次加载整列。
+    """
+    if start_row >= end_row:
+        return False
+    for block_start in range(start_row, end_row, ROW_BLOCK):
+        if not all(sheet.col_values(index, block_start, min(block_start + ROW_BLOCK, end_row))):
+            return False
+    return True
+
+
+def get_merged_col_values(sheet: xlrd.sheet, col: int, start_row: int, end_row: int) -> list:
+    """一列在[start_row, end_row)中的值，被合并单元格覆盖的单元格使用合并单元格左上角的值。
+
+    Arguments:
+        sheet {xlrd.sheet} -- excel sheet
+        col {int} -- 列号
+        start_row {int} -- 开始行号
+        end_row {int} -- 结束行号(不含)
+
+    Returns:
+        list -- 每一行的值
+    """
+    values = sheet.col_values(col, start_row, end_row)
+    merged = get_merged_index(sheet)
+    mask = ((merged.c_starts <= col) & (merged.c_ends > col) &
+            (merged.r_starts < end_row) & (merged.r_ends > start_row))
+    for merge_id in np.flatnonzero(mask).tolist():
+        r_start, r_end = int(merged.r_starts[merge_id]), int(merged.r_ends[merge_id])
+        value = sheet.cell_value(r_start, int(merged.c_starts[merge_id]))
+        fill_start = max(r_start, start_row) - start_row
+        fill_end = min(r_end, end_row) - start_row
+        values[fill_start:fill_end] = [value] * (fill_end - fill_start)
+    return values
+
 
 class SheetIndex:
     """sheet Index查找
-    假定每个excel都是有index的。
     index的在表格中的定义是：
         1、在列中合并单元格，其合并的单元格值都一样。
         2、index列在excel列的最开始的地方。
-        3、
-    Returns:
-        [type] -- [description]
+        3、index列在数据行中至少有一个纵向的合并单元格。
     """
 
-    def __init__(self, sheet: xlrd.sheet, workbook: "xlrd.workbook"):
+    def __init__(self, sheet: xlrd.sheet, workbook: "xlrd.workbook", data_rows: list):
         self.sheet = sheet
         self.workbook = workbook
         self.nrows = sheet.nrows
         self.ncols = sheet.ncols
+        self.start_row, self.end_row = (data_rows[0], data_rows[-1] + 1) if data_rows else (0, 0)
+        self.merged_index = get_merged_index(sheet)
+
+    def _get_col_merge_ids(self, col: int) -> "np.ndarray":
+        """数据行中只占col这一列的纵向合并单元格
+        """
+        merged = self.merged_index
+        mask = ((merged.c_starts == col) & (merged.c_ends == col + 1) &
+                (merged.r_ends - merged.r_starts > 1) &
+                (merged.r_starts < self.end_row) & (merged.r_ends > self.start_row))
+        return np.flatnonzero(mask)
+
+    def get_index_cols(self) -> list:
+        """从第一列开始，连续的带有纵向合并单元格的列为index列
+
+        Returns:
+            list -- index的列号
+        """
+        index_cols = []
+        for col in range(self.ncols):
+            if not len(self._get_col_merge_ids(col)):
+                break
+            index_cols.append(col)
+        return index_cols
+
+    def get_index_values(self, col: int) -> list:
+        """index列在数据行中的值，合并单元格覆盖的行使用合并单元格的值
+
+        Arguments:
+            col {int} -- 列号
+
+        Returns:
+            list -- 每个数据行的index值
+        """
+        return get_merged_col_values(self.sheet, col, self.start_row, self.end_row)
+
+
+class RowIndex:
+    """index key到数据行位置的哈希索引。
+    key为index列的值组成的tuple，只有一个index列时也可以直接使用值。
+    返回的行数据中，index列为合并单元格填充后的值。
+    """
+
+    def __init__(self, names: list, index_values: list, data: dict):
+        """
+        Arguments:
+            names {list} -- index列的表头
+            index_values {list} -- 每个index列在数据行中的值
+            data {dict} -- {"col_name": col_value_list}
+        """
+        self.names = list(names)
+        self.data = data
+        self.positions = {}
+        for position, key in enumerate(zip(*index_values)):
+            self.positions.setdefault(key, []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, key) -> bool:
+        return self._to_key(key) in self.positions
+
+    def __repr__(self) -> str:
+        return f"RowIndex(names={self.names}, keys={len(self)})"
+
+    def _to_key(self, key) -> tuple:
+        if not isinstance(key, tuple):
+            key = (key, )
+        return key
+
+    def keys(self) -> list:
+        return list(self.positions)
+
+    def get_loc(self, key) -> list:
+        """key对应的数据行位置
+
+        Returns:
+            list -- 在列数据中的位置
+        """
+        return self.positions[self._to_key(key)]
+
+    def get_row(self, key) -> dict:
+        """key对应的第一行数据，key不存在时抛出KeyError
+
+        Returns:
+            dict -- {"col_name": value}
+        """
+        key = self._to_key(key)
+        return self._get_row_at(self.positions[key][0], key)
+
+    def get_rows(self, key) -> list:
+        """key对应的所有行数据
+
+        Returns:
+            list -- [{"col_name": value}]
+        """
+        key = self._to_key(key)
+        return [self._get_row_at(position, key) for position in self.positions[key]]
+
+    def _get_row_at(self, position: int, key: tuple) -> dict:
+        if isinstance(self.data, LazyColumns):
+            # 没有读取的列只读取这一行的单元格
+            row = {col_header: self.data.get_value(col_header, position) for col_header in self.data}
+        else:
+            row = {col_header: col_data[position] for col_header, col_data in self.data.items()}
+        row.update(zip(self.names, key))
+        return row
 
 
 class SheetMerged:
     """sheet中的合并单元格
     """
 
-    def __init__(self, sheet):
+    def __init__(self, sheet, nrows: int = None, ignored: "np.ndarray" = None):
         self.sheet = sheet
+        # 只在前nrows行中搜索，None表示整张sheet
+        self.nrows = sheet.nrows if nrows is None else min(nrows, sheet.nrows)
+        self.merged_index = get_merged_index(sheet)
+        # 不参与检测的合并单元格，例如index列中的纵向合并
+        self.ignored = ignored
 
     def get_merge_rows(self) -> list:
         """获取有合并的行号列表
 
-        Arguments:
-            sheet {xrld.sheet} -- 
-
         Returns:
             list -- 有合并单元格行号的list
         """
-        merge_cells = self.sheet.merged_cells
-        merge_rows = [each for merge_cell in merge_cells for each in range(
-            merge_cell[0], merge_cell[1])]
-        merge_rows = list(set(merge_rows))
-        return merge_rows
+        merge_row_mask = self.merged_index.get_merge_row_mask(self.nrows, self.ignored)
+        return np.flatnonzero(merge_row_mask).tolist()
 
     def get_no_merge_rows(self) -> list:
         """获取没有合并单元格的行号z
@@ -56,21 +430,22 @@ class SheetMerged:
         Returns:
             list -- 没有合并单元格的行号
         """
-        rows = [row for row in range(self.sheet.nrows)]
-        merge_rows = self.get_merge_rows()
-        no_merge_row = set(rows) - set(merge_rows)
-        return list(no_merge_row)
+        merge_row_mask = self.merged_index.get_merge_row_mask(self.nrows, self.ignored)
+        return np.flatnonzero(~merge_row_mask).tolist()
 
 
 class SheetBorder:
     """sheet边框相关类
     """
 
-    def __init__(self, sheet: xlrd.sheet, workbook: "xlrd.Workbook"):
+    def __init__(self, sheet: xlrd.sheet, workbook: "xlrd.Workbook", nrows: int = None,
+                 cols: list = None):
         self.sheet = sheet
         self.workbook = workbook
-        self.nrows = sheet.nrows
-        self.ncols = sheet.ncols
+        self.nrows = sheet.nrows if nrows is None else min(nrows, sheet.nrows)
+        # 只检测cols中的列，None表示所有列
+        self.cols = cols
+        self.ncols = sheet.ncols if cols is None else len(cols)
 
     def get_cell_XF(self, cell) -> "XF":
         """获取单元格的XF
@@ -86,27 +461,18 @@ class SheetBorder:
         return self.workbook.xf_list[xf_index]
 
     def get_sheet_border(self) -> "Matrix":
-        """获取所有单元格都有内边框的最开始的行号.
+        """获取每个单元格有边框的边数.
             当数据量比较大的时候，检测到有连续5行
             由于存在单元格只有3边有单元格。
 
-        Arguments:
-            sheet {xlrd.sheet} -- [description]
-        """
-
-        sheet_border_info = []
-        for row in range(self.nrows):
-            row_border = []
-            for col in range(self.ncols):
-                xf = self.get_cell_XF(self.sheet.cell(row, col))
-                line_style = []
-                line_style.append(1 if xf.border.top_line_style else 0)
-                line_style.append(1 if xf.border.bottom_line_style else 0)
-                line_style.append(1 if xf.border.left_line_style else 0)
-                line_style.append(1 if xf.border.right_line_style else 0)
-                row_border.append(sum(line_style))
-            sheet_border_info.append(row_border)
-        return sheet_border_info
+        Returns:
+            np.ndarray -- (nrows, ncols)的边框边数矩阵
+        """
+        border_table = get_xf_border_table(self.workbook)
+        xf_indexes = get_sheet_xf_indexes(self.sheet, self.nrows)
+        if self.cols is not None:
+            xf_indexes = xf_indexes[:, self.cols]
+        return border_table.side_counts[xf_indexes]
 
     def get_each_cell_has_border_rows(self) -> list:
         """获取每个单元格均有边框的行号。
@@ -118,14 +484,10 @@ class SheetBorder:
         """
         sheet_border_info = self.get_sheet_border()
 
-        border_rows = []
         per_75_row_num = math.ceil(self.ncols * 0.8)
-        for row in range(self.nrows):
-            has_border_cells = [
-                each for each in sheet_border_info[row] if each >= 3]
-            if len(has_border_cells) >= per_75_row_num:
-                border_rows.append(row)
-        return border_rows
+        has_border_cells = (sheet_border_info >= 3).sum(axis=1)
+        border_rows = np.flatnonzero(has_border_cells >= per_75_row_num)
+        return border_rows.tolist()
 
 
 class SheetType:
@@ -133,62 +495,62 @@ class SheetType:
     缺： 单元格为空的时候。
     """
 
-    def __init__(self, sheet: xlrd.sheet):
+    def __init__(self, sheet: xlrd.sheet, nrows: int = None, cols: list = None):
         self.sheet = sheet
-        self.nrow = sheet.nrows
+        self.nrow = sheet.nrows if nrows is None else min(nrows, sheet.nrows)
         self.ncol = sheet.ncols
+        # 只检测cols中的列，None表示所有列
+        self.cols = list(range(self.ncol)) if cols is None else list(cols)
+        # 选中的连续相同类型行在所有列中的一致度 (0~1)
+        self.confidence = 0.0
 
     def get_same_value_type_count(self, col_types: list, col: "sheet_col"):
         """扫描一列的数据了下，获取每一行开始，其相同的数据类型数量
-        回溯统计前面行中出现相同类型的次数。
+        从最后一行倒序单次遍历，累计后面行中各类型出现的次数，不再逐行回溯。
         相同类型的定义是： 
             数值和字符串数值是相同的。
             空白符匹配所有的类型。
             字符串和空字符串是相同的。
-        现在存在的问题是：
-            1、空白的Unicode string应该与任何类型匹配。
-            2、空字符串应该与任何类型匹配。
-            3、空白的单元格应该任何类型匹配。
+        统计规则(后面的行 -> 当前行)：
+            1、空字符串、空白、空单元格匹配所有的行。
+            2、当前行是空白类型时，字符串、数值、日期、boolean也与其匹配。
+            3、当前行是数值时，数值和数字字符串与其匹配。
+            4、其余类型只匹配相同类型。
 
         Arguments:
             col_types {list} -- 一列的数据类型
             col {int}   --- sheet 的列号
         """
+        col_values = self.sheet.col_values(col, 0, len(col_types))
+        # 后面行中各类型(不含空白)出现的次数。
+        type_counts = Counter()
+        blank_count = 0
+        digit_str_count = 0
         row_map_same_value_count = {}
-        for col_index, current_type in enumerate(col_types):
-            row_map_same_value_count[col_index] = [current_type, 0]
-            index = 0
-            current_cell_value = self.sheet.cell(col_index, col).value
-            while index < col_index:
-                is_match = False
-                # 空白的unicode 与任何类型匹配。
-                temp_col_type_count = row_map_same_value_count[index]
-                if current_type == 1 and not current_cell_value:
-                    is_match = True
-                # 空白和空字符串与任何类型匹配。
-                elif current_type in [0, 6]:
-                    is_match = True
-                # 数字字符串和数字匹配
-                elif current_type == 1 and temp_col_type_count[0] == 2:
-                    if current_cell_value.isdigit():
-                        is_match = True
-                # 相等的时候
-                elif temp_col_type_count[0] == current_type:
-                    is_match = True
-                # 如果当前值是字符串或者数值或者日期或者是boolean，匹配以前的空字符.
-                elif current_type in [1, 2, 3, 4]:
-                    if temp_col_type_count[0] in [0, 6]:
-                        is_match = True
-                    elif temp_col_type_count[0] == 1:
-                        temp_col_value = self.sheet.cell(index, col).value
-                        if not temp_col_value:
-                            is_match = True
-
-                if is_match:
-                    temp_col_type_count[1] += 1
-                index += 1
-
-        return row_map_same_value_count
+        for col_index in range(len(col_types) - 1, -1, -1):
+            current_type = col_types[col_index]
+            current_cell_value = col_values[col_index]
+            # 空白的unicode、空白和空字符串与任何类型匹配。
+            is_blank = current_type in [0, 6] or (
+                current_type == 1 and not current_cell_value)
+
+            count = blank_count
+            if is_blank:
+                count += sum(type_counts[each] for each in [1, 2, 3, 4])
+            elif current_type == 2:
+                count += type_counts[2] + digit_str_count
+            else:
+                count += type_counts[current_type]
+            row_map_same_value_count[col_index] = [current_type, count]
+
+            if is_blank:
+                blank_count += 1
+            else:
+                type_counts[current_type] += 1
+                if current_type == 1 and current_cell_value.isdigit():
+                    digit_str_count += 1
+
+        return dict(sorted(row_map_same_value_count.items()))
 
     def get_same_value_type_row(self):
         """获取行号，从那一行开始，所有列的数据都一致。
@@ -196,18 +558,15 @@ class SheetType:
         Arguments:
             sheet {xlrd.sheet} -- excel sheet
         """
-        # nrows = self.sheet.nrows
-        ncols = self.sheet.ncols
-
         # 列方向的类型数据。
         sheet_col_types = [
-            list(self.sheet.col_types(col)) for col in range(ncols)
+            list(self.sheet.col_types(col, 0, self.nrow)) for col in self.cols
         ]
 
         row_map_same_value_count_list = []
-        for col in range(ncols):
+        for col_types, col in zip(sheet_col_types, self.cols):
             row_map_same_value_count_list.append(
-                self.get_same_value_type_count(sheet_col_types[col], col))
+                self.get_same_value_type_count(col_types, col))
         return row_map_same_value_count_list
 
     def general_same_value_type_matrix(self):
@@ -284,20 +643,115 @@ class SheetType:
                              for index in col_max_sub_con_row_indexs]
             if len(set(col_index_sum)) == 1:
                 most_same_type_rows = col_max_sub_con_rows[col_max_sub_con_row_indexs[0]]
+                self.confidence = len(col_max_sub_con_row_indexs) / len(sub_con_lens)
                 break
         return most_same_type_rows
 
 
+class LazyColumns(Mapping):
+    """read_excel(lazy=True)的结果。
+    key与read_excel返回的一致，每一列在第一次访问时才从sheet中读取，之后缓存。
+    没有表头的列只有在数据中没有空值时才是结果的一列，在第一次列出key时才检测。
+    读取依赖内存中的sheet，xlsx engine在访问完之前不能关闭workbook。
+    """
+
+    def __init__(self, data_cols: list, load_col, probe_cols: list = None, is_full_col=None,
+                 load_value=None):
+        """
+        Arguments:
+            data_cols {list} -- [(列号, 表头)]
+            load_col {callable} -- load_col(列号)返回一列的数据
+
+        Keyword Arguments:
+            probe_cols {list} -- 需要检测的没有表头的列[(列号, key)] (default: {None})
+            is_full_col {callable} -- is_full_col(列号)检测列中是否没有空值 (default: {None})
+            load_value {callable} -- load_value(列号, 位置)只读取一个单元格，None时读取整列 (default: {None})
+        """
+        self._col_order = sorted(list(data_cols) + list(probe_cols or []))
+        self._cols = {col_key: index for index, col_key in data_cols}
+        self._probe_cols = {col_key: index for index, col_key in probe_cols or []}
+        self._is_full_col = is_full_col
+        self._load_col = load_col
+        self._load_value = load_value
+        self._loaded = {}
+
+    def _probe(self, col_key) -> bool:
+        """检测没有表头的列，返回是否为结果中的一列
+        """
+        index = self._probe_cols.pop(col_key)
+        if self._is_full_col(index):
+            self._cols[col_key] = index
+            return True
+        self._col_order.remove((index, col_key))
+        return False
+
+    def _probe_all(self):
+        for col_key in list(self._probe_cols):
+            self._probe(col_key)
+
+    def _get_index(self, col_key) -> int:
+        if col_key in self._probe_cols and not self._probe(col_key):
+            raise KeyError(col_key)
+        return self._cols[col_key]
+
+    def __getitem__(self, col_key):
+        if col_key not in self._loaded:
+            self._loaded[col_key] = self._load_col(self._get_index(col_key))
+        return self._loaded[col_key]
+
+    def get_value(self, col_key, position: int):
+        """一列中第position个值，列没有读取时只读取这一个单元格
+
+        Returns:
+            object -- 单元格的值
+        """
+        if col_key in self._loaded or self._load_value is None:
+            return self[col_key][position]
+        return self._load_value(self._get_index(col_key), position)
+
+    def __contains__(self, col_key) -> bool:
+        if col_key in self._probe_cols:
+            return self._probe(col_key)
+        return col_key in self._cols
+
+    def __iter__(self):
+        self._probe_all()
+        return iter([col_key for _, col_key in self._col_order])
+
+    def __len__(self) -> int:
+        self._probe_all()
+        return len(self._cols)
+
+    def __repr__(self) -> str:
+        return f"LazyColumns(cols={len(self)}, loaded={len(self._loaded)})"
+
+    def to_dict(self) -> dict:
+        """读取所有的列
+
+        Returns:
+            dict -- {"col_name": col_value_list}
+        """
+        return {col_key: self[col_key] for col_key in self}
+
+
 class ColHeader:
 
-    def __init__(self, sheet: xlrd.sheet, workbook: "xlrd.workbook", col_header_rows: list):
+    def __init__(self, sheet: xlrd.sheet, workbook: "xlrd.workbook", col_header_rows: list,
+                 t_header: bool = True, strip: bool = True, separator: str = ""):
         self.sheet = sheet
         self.workbook = workbook
         self.nrow = sheet.nrows
         self.ncol = sheet.ncols
         self.col_header_rows = col_header_rows
         self.header_row = []  # 可能是大标题的行
-        self.strip = True
+        self.merged_index = get_merged_index(sheet)
+        self.strip = strip
+        # 是否解析T型表头，需要单元格的边框格式
+        self.t_header = t_header
+        # 拼接多层表头时的分隔符
+        self.separator = separator
+        # search_col_header之后，每一列表头中每一层的值
+        self.col_header_paths = []
 
     def get_cell_XF(self, cell) -> "XF":
         """获取单元格的XF
@@ -319,85 +773,86 @@ class ColHeader:
             合并单元格长度等于数据列长度。
 
         Returns:
-            list -- [description]
+            list -- 合并单元格在MergedIndex中的序号
         """
-        merge_cells = self.sheet.merged_cells
-        no_header_merge_cells = []
-        for r_start, r_end, c_start, c_end in merge_cells:
-            if c_end - c_start == self.ncol:
-                self.header_row.append(r_start)
-            else:
-                no_header_merge_cells.append(
-                    (r_start, r_end, c_start, c_end)
-                )
-        return no_header_merge_cells
+        merged_index = self.merged_index
+        is_header = (merged_index.c_ends - merged_index.c_starts) == self.ncol
+        self.header_row.extend(merged_index.r_starts[is_header].tolist())
+        return np.flatnonzero(~is_header).tolist()
 
-    def get_merge_col_header(self, merge_cell: tuple, T_col_header: dict) -> dict:
-        """获取一个合并单元格中，其顶行的所有单元格的值.
+    def get_merge_col_value(self, merge_id: int, t_col_values: dict) -> str:
+        """获取一个合并单元格的值，其顶行的所有单元格都使用这个值.
         并且根据t型合并的数据，赋予其横向的字段值。
 
         Arguments:
-            merge_cell {tuple} -- 一个合并单元格的信息
-            T_col_header {dict} -- t型横向字段值
+            merge_id {int} -- 合并单元格序号
+            t_col_values {dict} -- t型横向字段值 {(row, col): value}
 
         Returns:
-            dict -- {"row_col": value}
+            str -- 合并单元格的值
         """
-        value = self.sheet.cell(merge_cell[0], merge_cell[2]).value
-        row_col_values = {}
-        start_row = merge_cell[0]
-        t_col_key = f"{start_row}_{merge_cell[2]}"
-        if t_col_key in T_col_header:
-            value = T_col_header[t_col_key] + value
-        for col in range(merge_cell[2], merge_cell[3]):
-            row_col_values[f"{start_row}_{col}"] = str(value)
-        return row_col_values
+        start_row, _, start_col, _ = self.merged_index.merged_cells[merge_id]
+        value = self.sheet.cell_value(start_row, start_col)
+        if (start_row, start_col) in t_col_values:
+            value = t_col_values[(start_row, start_col)] + value
+        return str(value)
 
-    def parse_T_col_header(self, merge_cells: list):
+    def parse_T_col_header(self, merge_ids: list) -> dict:
         """解析T型的合并单元格表头。
 
         Arguments:
-            merge_cells {list} -- 合并的单元格信息
+            merge_ids {list} -- 合并单元格序号
+
+        Returns:
+            dict -- {(row, col): t型横向字段值}
         """
         t_col_header_value = {}
-        for r_start, _, c_start, c_end in merge_cells:
-            if r_start in self.col_header_rows and c_end < self.ncol:
-                left_cell_xf = self.get_cell_XF(
-                    self.sheet.cell(r_start, c_start))
-                right_cell_xf = self.get_cell_XF(
-                    self.sheet.cell(r_start, c_end))
-                if left_cell_xf.border.right_line_style == right_cell_xf.border.left_line_style == 0:
-                    t_col_key = f"{r_start}_{c_end}"
-                    t_col_header_value[t_col_key] = self.sheet.cell(
-                        r_start, c_start).value
+        col_header_rows = set(self.col_header_rows)
+        line_styles = get_xf_border_table(self.workbook).line_styles
+        for merge_id in merge_ids:
+            r_start, _, c_start, c_end = self.merged_index.merged_cells[merge_id]
+            if r_start in col_header_rows and c_end < self.ncol:
+                left_cell_xf = self.sheet.cell_xf_index(r_start, c_start)
+                right_cell_xf = self.sheet.cell_xf_index(r_start, c_end)
+                left_cell_right = line_styles[left_cell_xf, XFBorderTable.RIGHT]
+                right_cell_left = line_styles[right_cell_xf, XFBorderTable.LEFT]
+                if left_cell_right == right_cell_left == 0:
+                    t_col_header_value[(r_start, c_end)] = self.sheet.cell_value(
+                        r_start, c_start)
         return t_col_header_value
 
     def search_col_header(self):
-        merge_cell_col_values = {}
-        merge_cells = self.get_merged_info()
+        merge_ids = self.get_merged_info()
 
-        t_col_headers = self.parse_T_col_header(merge_cells)
+        t_col_headers = self.parse_T_col_header(merge_ids) if self.t_header else {}
 
-        for merge_cell in merge_cells:
-            merge_cell_col_values.update(
-                self.get_merge_col_header(merge_cell, t_col_headers))
+        # 合并单元格序号 -> 合并单元格的值，大标题的合并单元格为None
+        merge_col_values = [None] * len(self.merged_index)
+        for merge_id in merge_ids:
+            merge_col_values[merge_id] = self.get_merge_col_value(merge_id, t_col_headers)
 
         col_header_row = list(set(self.col_header_rows) - set(self.header_row))
+        header_nrows = max(col_header_row) + 1 if col_header_row else 0
+        owner_grid = self.merged_index.get_owner_grid(header_nrows).tolist()
+        merge_start_rows = self.merged_index.r_starts.tolist()
         col_headers = []
+        col_header_paths = []
+        seen_headers = set()
+        seen_paths = set()
 
         for col in range(self.ncol):
-            col_header = ""
+            segments = []
             # 每一列的值等于其表头行中所有值的拼接。
             for row in col_header_row:
-                merge_key = f"{row}_{col}"
-                t_col_value = ""
+                t_col_value = t_col_headers.get((row, col), "")
                 merge_col_value = ""
-                cell_value = self.sheet.cell(row, col).value
-                if merge_key in t_col_headers:
-                    t_col_value = t_col_headers[merge_key]
-
-                if merge_key in merge_cell_col_values and cell_value != merge_cell_col_values[merge_key]:
-                    merge_col_value = merge_cell_col_values[merge_key]
+                cell_value = self.sheet.cell_value(row, col)
+                # 只有合并单元格的顶行使用合并单元格的值
+                merge_id = owner_grid[row][col]
+                if merge_id >= 0 and merge_start_rows[merge_id] == row:
+                    merge_value = merge_col_values[merge_id]
+                    if merge_value is not None and cell_value != merge_value:
+                        merge_col_value = merge_value
                 # 一个字段的值是由： 单元格自身的值、合并单元格中空缺的值、t型对齐的值三个决定。
                 # 如果合并单元格中存在值，那么这行的值就是合并单元格的值，且合并单元格的值和单元格的值以及t的值一致的时候。
                 # 如果合并单元格存在值，其值也不等于单元格自身的值和t型对齐，则当前行的值为单元格的值加上合并单元格的值。
@@ -407,33 +862,283 @@ class ColHeader:
                 else:
                     cell_value = str(t_col_value) + str(cell_value)
 
-                col_header += cell_value
-            # 如果跟之前的col header重名，自动加上序号
-            if col_header in col_headers:
-                col_header += str(col)
-            if self.strip:
-                col_header = col_header.strip()
-                col_header = col_header.replace('\n', "")
-                col_header = col_header.replace(" ", "")
+                if self.strip:
+                    cell_value = cell_value.strip().replace('\n', "").replace(" ", "")
+                segments.append(cell_value)
+
+            # 先去除空白再去重，如果跟之前的col header重名，自动加上列号
+            col_header = self.separator.join(segment for segment in segments if segment)
+            col_header_path = tuple(segments)
+            while col_header in seen_headers:
+                col_header = self._add_col_suffix(col_header, col)
+            while col_header_path in seen_paths:
+                last_segment = col_header_path[-1] if col_header_path else ""
+                col_header_path = col_header_path[:-1] + (self._add_col_suffix(last_segment, col), )
+            seen_headers.add(col_header)
+            seen_paths.add(col_header_path)
             col_headers.append(col_header)
+            col_header_paths.append(col_header_path)
+        self.col_header_paths = col_header_paths
         return col_headers
 
+    def _add_col_suffix(self, name: str, col: int) -> str:
+        """重名的表头加上列号
+        """
+        return f"{name}{self.separator}{col}" if name else str(col)
+
 
 class ExcelCompxReader:
     """读取带有复杂表头的Excel的数据。
     """
 
-    def __init__(self, file_path: str, strip: bool = True):
+    def __init__(self, file_path: str, strip: bool = True,
+                 window_search: bool = False,
+                 max_search_row: int = MAX_SEARCH_ROW,
+                 cache: ResultCache = None,
+                 templates: TemplateRegistry = None,
+                 engine: str = None,
+                 stats: bool = False,
+                 hooks: list = None,
+                 mode: str = "accurate",
+                 index_col=None,
+                 usecols=None,
+                 incremental: bool = False,
+                 checkpoint: ReadCheckpoint = None,
+                 separator: str = "",
+                 tuple_headers: bool = False):
+        """
+        Arguments:
+            file_path {str} -- excel file path
+
+        Keyword Arguments:
+            strip {bool} -- 是否去除表头中的空白 (default: {True})
+            window_search {bool} -- 只在前max_search_row行中做表头与数据的划分，
+                                    置信度不够时窗口加倍 (default: {False})
+            max_search_row {int} -- 初始的搜索窗口行数 (default: {MAX_SEARCH_ROW})
+            cache {ResultCache} -- 结果的磁盘缓存，None表示不使用缓存 (default: {None})
+            templates {TemplateRegistry} -- 表头模板，指纹匹配时跳过表头与数据的划分 (default: {None})
+            engine {str} -- 读取文件的engine，"xlrd"或"xlsx"，None时根据文件后缀选择 (default: {None})
+            stats {bool} -- 统计每个阶段的耗时，结果保存在reader.stats中 (default: {False})
+            hooks {list} -- 统计信息的回调函数hook(event, data)，设置时自动开启统计 (default: {None})
+            mode {str} -- "accurate"带格式读取；"fast"不解析格式，只用合并和类型划分；
+                          "auto"先按fast划分，不可信时带格式重新读取 (default: {"accurate"})
+            index_col {int|str|list} -- index列，列号或者表头，"auto"时检测左侧纵向合并的列，
+                                        读取后在reader.index中构建RowIndex，不使用缓存；
+                                        左侧index列中的纵向合并不参与表头与数据的划分 (default: {None})
+            usecols {int|str|range|list} -- 读取的列，列号、列号range、表头、按表头层级拼接的前缀
+                                            或者表头层级的tuple前缀，None表示所有列 (default: {None})
+            incremental {bool} -- 增量读取，表头区域不变时read_excel和流式读取只返回上一次读取之后追加的行，
+                                  进度保存在reader.checkpoint中，不使用缓存 (default: {False})
+            checkpoint {ReadCheckpoint} -- 之前保存的增量读取进度，设置时自动开启增量读取 (default: {None})
+            separator {str} -- 拼接多层表头时的分隔符 (default: {""})
+            tuple_headers {bool} -- 返回的列名为每一层表头组成的tuple，而不是拼接后的字符串，
+                                    usecols等参数仍然使用拼接后的表头 (default: {False})
+        """
+        if mode not in READ_MODES:
+            raise ValueError(f"mode must be one of {READ_MODES}, got {mode!r}")
         self.file_path = file_path
         self.strip = strip
+        self.window_search = window_search
+        self.max_search_row = max_search_row
+        self.cache = cache
+        self.templates = templates
+        self.engine = engine
+        self.mode = mode
+        self.index_col = index_col
+        self.usecols = usecols
+        self.incremental = incremental or checkpoint is not None
+        self.checkpoint = checkpoint
+        self.separator = separator
+        self.tuple_headers = tuple_headers
+        # 最近一次读取是否从checkpoint继续，以及继续的行号
+        self.resumed = False
+        self._resume_row = None
+        self.hooks = list(hooks or [])
+        self.collect_stats = stats or bool(self.hooks)
+        # 最近一次读取的统计信息，不统计时为None
+        self.stats = None
+        self._stats = NULL_STATS
+        self.workbook = None
+        self.sheet = None
+        self._type_confidence = 0.0
+        # 当前sheet中类型检测的结果 {nrows: (same_type_rows, confidence)}，
+        # auto模式带格式重新打开时单元格的值不变，不再重复检测
+        self._type_votes = {}
+        # (sheet, 不参与合并检测的合并单元格)，同一个sheet只计算一次
+        self._ignored_merges = (None, None)
+        # 为True时workbook保持打开，由open/close或with语句管理
+        self._keep_open = False
+        # 最近一次读取的表头与数据划分
+        self.header_rows = []
+        self.data_rows = []
+        self.col_header_record = []
+        # 每一列表头中每一层的值
+        self.col_header_paths = []
+        self.template = None
+        # 最近一次读取的index，没有设置index_col时为None
+        self.index = None
+
+    def _get_options(self) -> dict:
+        """reader的参数，用于在子进程中重建同样的reader。
+
+        Returns:
+            dict -- 除file_path以外的__init__参数
+        """
+        return {
+            "strip": self.strip,
+            "window_search": self.window_search,
+            "max_search_row": self.max_search_row,
+            "cache": self.cache,
+            "templates": self.templates,
+            "engine": self.engine,
+            "stats": self.collect_stats,
+            "mode": self.mode,
+            "index_col": self.index_col,
+            "usecols": self.usecols,
+            "separator": self.separator,
+            "tuple_headers": self.tuple_headers,
+        }
+
+    def _get_cache_options(self) -> dict:
+        """影响读取结果的参数，作为缓存key的一部分。
+        """
+        options = self._get_options()
+        options.pop("cache")
+        options.pop("templates")
+        options.pop("stats")
+        return options
+
+    def _reset_stats(self):
+        """每次读取开始时重置统计信息
+        """
+        if self.collect_stats:
+            self.stats = ReadStats(self.hooks)
+            self._stats = self.stats
+
+    def _reset_layout(self):
+        """每次读取开始时清除上一次的表头与数据划分，缓存命中时不会重新划分
+        """
+        self.sheet = None
+        self.header_rows = []
+        self.data_rows = []
+        self.col_header_record = []
+        self.col_header_paths = []
+        self._ignored_merges = (None, None)
+
+    def __enter__(self) -> "ExcelCompxReader":
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self) -> "ExcelCompxReader":
+        """以按需加载sheet的方式打开workbook并保持打开。
+        之后的read_excel不再重新解析文件，只加载读取的sheet。
+
+        Returns:
+            ExcelCompxReader -- self
+        """
+        if not self._keep_open:
+            self.workbook = get_engine(self.file_path, self.engine).open_workbook(
+                self.file_path, formatting_info=self.mode == "accurate", on_demand=True)
+            self._keep_open = True
+        return self
+
+    def close(self):
+        """释放workbook
+        """
+        if self.workbook is not None:
+            self.workbook.release_resources()
+        self.workbook = None
+        self.sheet = None
+        self._keep_open = False
+
+    def unload_sheet(self, sheet_name):
+        """释放已经加载的sheet，只在workbook保持打开时有效。
+
+        Arguments:
+            sheet_name {str|int} -- sheet name或者sheet序号
+        """
+        if self._keep_open:
+            self.workbook.unload_sheet(sheet_name)
 
     def _open_workbook(self):
+        # 保持打开时复用已经打开的workbook
+        if self._keep_open:
+            return
         try:
-            self.workbook = xlrd.open_workbook(
-                self.file_path, formatting_info=True)
+            with self._stats.stage("open"):
+                self.workbook = get_engine(self.file_path, self.engine).open_workbook(
+                    self.file_path, formatting_info=self.mode == "accurate")
         except Exception:
             raise
 
+    def _release_workbook(self):
+        """没有保持打开时，读取完成后释放workbook，例如.xlsx的zip文件。
+        已经解析的sheet保留在reader.sheet中，可以继续用于save_template
+        """
+        if not self._keep_open and self.workbook is not None:
+            self.workbook.release_resources()
+
+    def _reopen_with_formatting(self):
+        """auto模式下fast划分不可信时，带格式重新打开workbook并重新加载当前sheet
+        """
+        sheet_name = self.sheet.name
+        with self._stats.stage("reopen"):
+            workbook = get_engine(self.file_path, self.engine).open_workbook(
+                self.file_path, formatting_info=True, on_demand=self._keep_open)
+        # 释放不带格式的workbook，以及由它构建的边框表和合并单元格索引
+        _XF_BORDER_TABLES.pop(self.workbook, None)
+        _MERGED_INDEXES.pop(self.sheet, None)
+        self._ignored_merges = (None, None)
+        self.workbook.release_resources()
+        self.workbook = workbook
+        self.sheet = self.workbook.sheet_by_name(sheet_name)
+
+    def _has_formatting(self) -> bool:
+        return bool(getattr(self.workbook, "formatting_info", True))
+
+    def _is_fast_split_reliable(self, header_rows: list) -> bool:
+        """fast模式的划分是否可信。
+            1、类型检测的一致度足够高，数据行的划分没有歧义。
+            2、engine能读取合并单元格，或者表头区域中没有可能被合并单元格覆盖的空单元格。
+
+        Arguments:
+            header_rows {list} -- 表头行
+
+        Returns:
+            bool -- 是否可信
+        """
+        if self._type_confidence < AUTO_MIN_CONFIDENCE:
+            return False
+        return self._has_formatting() or not self._may_hide_merges(header_rows)
+
+    def _may_hide_merges(self, header_rows: list) -> bool:
+        """不解析格式时xlrd读取不到合并单元格，判断表头区域中是否可能有合并单元格。
+        合并单元格的值在左上角，被覆盖的单元格是空的，并且左边或者上面的单元格有值或者也被覆盖；
+        左侧和上方都是空白的单元格(例如左上角的空白)不会被合并单元格覆盖。
+
+        Arguments:
+            header_rows {list} -- 表头行
+
+        Returns:
+            bool -- 是否有可能被合并单元格覆盖的空单元格
+        """
+        if sheet_has_capability(self.sheet, MERGED_CELLS):
+            return False
+        above = [False] * self.sheet.ncols
+        for row in header_rows:
+            row_types = self.sheet.row_types(row)
+            row_values = self.sheet.row_values(row)
+            left = False
+            for col, (col_type, value) in enumerate(zip(row_types, row_values)):
+                empty = col_type in [xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK] or value == ""
+                if empty and (left or above[col]):
+                    return True
+                # 有值的单元格可能是合并单元格的左上角
+                left = above[col] = not empty
+        return False
+
     def _get_continue_sub_list(self, data_list: list) -> list:
         """获取数组中值连续的子数组。
 
@@ -444,27 +1149,11 @@ class ExcelCompxReader:
             list -- 连续值的子数组。
         """
         sub_lists = []
-        index = 0
-        while index < len(data_list):
-            start_index = index
-            for sec_index in range(start_index+1, len(data_list)):
-                pre = data_list[sec_index]
-                bef = data_list[sec_index - 1]
-                # print(f"{pre} - {bef} = {pre - bef}")
-                if pre - bef == 1:
-                    continue
-                else:
-                    break
-            if sec_index == len(data_list) - 1:
-                sub_lists.append(data_list[start_index:])
-            else:
-                sub_lists.append(data_list[start_index: sec_index])
-            if index == sec_index:
-                index += 1
+        for value in data_list:
+            if sub_lists and value - sub_lists[-1][-1] == 1:
+                sub_lists[-1].append(value)
             else:
-                index = sec_index
-            if index == len(data_list) - 1:
-                break
+                sub_lists.append([value])
         return sub_lists
 
     def _get_continue_data_rows(self, data_rows: list) -> list:
@@ -501,58 +1190,1072 @@ class ExcelCompxReader:
         header_rows = [row for row in range(data_rows[0])]
         return data_rows, header_rows
 
-    def _get_col_data(self, col_header_record: list, data_rows: list) -> dict:
+    def _search_data_rows(self, nrows: int = None) -> tuple:
+        """在前nrows行中做表头与数据的划分。
+
+        Keyword Arguments:
+            nrows {int} -- 搜索的行数，None表示整张sheet (default: {None})
+
+        Returns:
+            tuple -- (data_rows, header_rows)
+        """
+        detect_cols = self._get_detect_cols()
+        sheet_merger = SheetMerged(self.sheet, nrows, self._get_ignored_merges())
+        sheet_typer = SheetType(self.sheet, nrows, detect_cols)
+        cells = sheet_merger.nrows * len(sheet_typer.cols)
+
+        with self._stats.stage("SheetMerged", sheet_merger.nrows * self.sheet.ncols):
+            no_merge_rows = sheet_merger.get_no_merge_rows()
+        # 没有格式时不使用边框检测
+        containe_border_rows = []
+        if self._has_formatting():
+            sheet_border = SheetBorder(self.sheet, self.workbook, nrows, detect_cols)
+            with self._stats.stage("SheetBorder", cells):
+                containe_border_rows = sheet_border.get_each_cell_has_border_rows()
+        type_votes = self._type_votes.get(nrows)
+        if type_votes is None:
+            with self._stats.stage("SheetType", cells):
+                same_type_rows = sheet_typer.search_max_same_type_rows()
+            type_votes = self._type_votes[nrows] = (same_type_rows, sheet_typer.confidence)
+        same_type_rows, self._type_confidence = type_votes
+
+        with self._stats.stage("split"):
+            data_rows, header_rows = self._split_col_header_and_data_row(
+                no_merge_rows, containe_border_rows, same_type_rows)
+        self._stats.record_split(
+            {"merge": len(no_merge_rows), "border": len(containe_border_rows),
+             "type": len(same_type_rows)},
+            (data_rows[0], data_rows[-1] + 1))
+        return data_rows, header_rows
+
+    def _get_ignored_merges(self) -> "np.ndarray":
+        """设置了index_col时，index列中的纵向合并单元格不参与合并检测，
+        否则有index的数据行都会被当作表头。
+
+        Returns:
+            np.ndarray -- 每个合并单元格是否忽略的bool数组，不忽略时为None
+        """
+        if self.index_col is None:
+            return None
+        sheet, ignored = self._ignored_merges
+        if sheet is not self.sheet:
+            index_cols = self.index_col if isinstance(self.index_col, (list, tuple)) else [self.index_col]
+            # 表头还没有解析，只有列号可以限制index列的范围
+            max_cols = None
+            if all(isinstance(col, int) for col in index_cols):
+                max_cols = max(index_cols) + 1
+            ignored = get_merged_index(self.sheet).get_index_merge_mask(max_cols)
+            self._ignored_merges = (self.sheet, ignored)
+        return ignored
+
+    def _get_data_range(self, data_rows: list) -> tuple:
+        """数据行的范围，数据行是连续的行号。没有数据行时(表头之后没有数据)，开始和结束都为数据开始的行号
+
+        Arguments:
+            data_rows {list} -- 数据行
+
+        Returns:
+            tuple -- (start_row, end_row)
+        """
+        if data_rows:
+            return data_rows[0], data_rows[-1] + 1
+        # 表头为数据开始之前的所有行
+        return len(self.header_rows), len(self.header_rows)
+
+    def _get_last_data_row(self) -> int:
+        """获取sheet中最后一个非空行的行号(不含)。
+
+        Returns:
+            int -- 最后的非空行号 + 1
+        """
+        if sheet_has_capability(self.sheet, LAST_VALUE_ROW):
+            return self.sheet.last_value_row
+        last_row = self.sheet.nrows
+        while last_row > 0:
+            row_types = self.sheet.row_types(last_row - 1)
+            if any(each not in [0, 6] for each in row_types):
+                break
+            last_row -= 1
+        return last_row
+
+    def _get_data_col_types(self, start_row: int, end_row: int, cols: list) -> list:
+        """数据块中每一列的主要单元格类型，与SheetType一致，数字字符串看作数值，空白不计。
+
+        Returns:
+            list -- 每一列的单元格类型，全为空时为None
+        """
+        col_types = []
+        for col in cols:
+            col_type = get_dominant_type(self.sheet.col_types(col, start_row, end_row),
+                                         self.sheet.col_values(col, start_row, end_row))
+            col_types.append(None if col_type == xlrd.XL_CELL_EMPTY else col_type)
+        return col_types
+
+    def _is_data_row(self, row: int, cols: list, col_types: list) -> bool:
+        """与表头与数据的划分一样，合并、边框、类型三种检测中至少两种认为是数据的行。
+            合并: 行中没有合并单元格。
+            边框: 超过80%的单元格有3条以上的边框，没有格式时不检测。
+            类型: 超过一半的列与数据块中该列的类型一致，空白与任何类型一致。
+
+        Arguments:
+            row {int} -- 行号
+            cols {list} -- 检测的列
+            col_types {list} -- _get_data_col_types的结果
+
+        Returns:
+            bool -- 是否为数据行
+        """
+        votes = 0
+        ignored = self._get_ignored_merges()
+        intervals = get_merged_index(self.sheet).row_intervals.get(row, [])
+        if all(ignored is not None and ignored[merge_id] for _, _, merge_id in intervals):
+            votes += 1
+        if self._has_formatting():
+            side_counts = get_xf_border_table(self.workbook).side_counts
+            has_border_cells = sum(side_counts[self.sheet.cell_xf_index(row, col)] >= 3
+                                   for col in cols)
+            if has_border_cells >= math.ceil(len(cols) * 0.8):
+                votes += 1
+        types = self.sheet.row_types(row)
+        values = self.sheet.row_values(row)
+        same_type_cols = 0
+        for col, col_type in zip(cols, col_types):
+            cell_type = types[col]
+            cell_kind = get_cell_kind(cell_type, values[col])
+            if col_type is None or cell_kind in [xlrd.XL_CELL_EMPTY, col_type] or cell_type == col_type:
+                same_type_cols += 1
+        if same_type_cols * 2 > len(cols):
+            votes += 1
+        return votes >= 2
+
+    def _get_data_end_row(self, data_start_row: int, known_end_row: int = None) -> int:
+        """数据块在sheet中的结束行号(不含)，不需要重新划分整张sheet。
+        从最后的非空行往前，去掉不是数据行的表尾(合计、备注等)，
+        known_end_row之前的行已经确认是数据行，不再检测。
+
+        Arguments:
+            data_start_row {int} -- 数据开始的行号
+
+        Keyword Arguments:
+            known_end_row {int} -- 已经确认的数据行结束行号 (default: {None})
+
+        Returns:
+            int -- 数据的结束行号，没有数据行时等于data_start_row
+        """
+        end_row = self._get_last_data_row()
+        floor_row = min(max(data_start_row, known_end_row or 0), end_row)
+        if end_row <= floor_row:
+            return max(end_row, data_start_row)
+        cols = self._get_detect_cols() or list(range(self.sheet.ncols))
+        col_types = self._get_data_col_types(
+            data_start_row, min(data_start_row + self.max_search_row, end_row), cols)
+        while end_row > floor_row and not self._is_data_row(end_row - 1, cols, col_types):
+            end_row -= 1
+        return end_row
+
+    def _window_search_data_rows(self) -> tuple:
+        """在有限的窗口中做表头与数据的划分。
+        如果窗口内的数据行一直延续到窗口末尾，认为划分可信，
+        数据行延伸到窗口之后最后一个通过数据行检测的行；否则窗口加倍重新划分，
+        直到窗口覆盖整张sheet。
+
+        Returns:
+            tuple -- (data_rows, header_rows)
+        """
+        search_row = self.max_search_row
+        while search_row < self.sheet.nrows:
+            try:
+                data_rows, header_rows = self._search_data_rows(search_row)
+            except ValueError:
+                # 窗口中找不到数据行
+                data_rows = []
+            if data_rows and data_rows[-1] == search_row - 1:
+                data_rows = list(range(data_rows[0], self._get_data_end_row(data_rows[0], search_row)))
+                return data_rows, header_rows
+            search_row *= 2
+        return self._search_data_rows()
+
+    def _get_usecols_items(self) -> list:
+        if isinstance(self.usecols, (int, str, range)):
+            return [self.usecols]
+        return list(self.usecols)
+
+    def _get_detect_cols(self) -> list:
+        """表头与数据划分时检测的列。
+        只有usecols全部为列号时才能在划分之前确定读取的列，此时使用选中的列
+        加上在整张sheet中均匀抽取的列，保证检测的列仍然有代表性。
+
+        Returns:
+            list -- 列号，None表示所有列
+        """
+        ncols = self.sheet.ncols
+        if self.usecols is None or ncols <= DETECT_SAMPLE_COLS * 2:
+            return None
+        items = self._get_usecols_items()
+        if not all(isinstance(item, (int, range)) for item in items):
+            return None
+        cols = set()
+        for item in items:
+            cols.update(col for col in (item if isinstance(item, range) else [item])
+                        if 0 <= col < ncols)
+        step = ncols / DETECT_SAMPLE_COLS
+        cols.update(int(index * step) for index in range(DETECT_SAMPLE_COLS))
+        return sorted(cols)
+
+    def _get_header_prefixes(self, index: int, col_header: str) -> set:
+        """列的表头和按完整的表头层级拼接的所有前缀，例如"grpA"、"grpAa1"，
+        不会出现"grpAa"这样截断表头单元格的前缀。
+        """
+        segments = [segment for segment in self.col_header_paths[index] if segment] \
+            if index < len(self.col_header_paths) else []
+        prefixes = {self.separator.join(segments[:end]) for end in range(1, len(segments) + 1)}
+        prefixes.add(col_header)
+        return prefixes
+
+    def _get_selected_cols(self, col_header_record: list) -> set:
+        """把usecols转换为列号。
+        列号和range直接使用；字符串匹配完整的表头或者按表头层级拼接的前缀(上层表头的拼接)；
+        tuple匹配col_header_paths中开头的几层表头。
+
+        Returns:
+            set -- 列号，None表示所有列
+        """
+        if self.usecols is None:
+            return None
+        ncols = len(col_header_record)
+        selected = set()
+        for item in self._get_usecols_items():
+            if isinstance(item, (str, tuple)):
+                if isinstance(item, tuple):
+                    matched = [index for index, path in enumerate(self.col_header_paths)
+                               if path[:len(item)] == item]
+                else:
+                    matched = [index for index, col_header in enumerate(col_header_record)
+                               if item in self._get_header_prefixes(index, col_header)]
+                if not matched:
+                    raise ValueError(f"usecols {item!r} does not match any column header")
+                selected.update(matched)
+                continue
+            for col in (item if isinstance(item, range) else [item]):
+                if not 0 <= col < ncols:
+                    raise ValueError(f"usecols {col} out of range")
+                selected.add(col)
+        return selected
+
+    def _get_data_cols(self, col_header_record: list, data_rows: list, probe: bool = True) -> list:
+        """获取需要读取的列。
+        只保留usecols选中的列，没有表头且存在空值的列会被去除。
+
+        Keyword Arguments:
+            probe {bool} -- 检测没有表头的列，False时返回([(列号, 表头)], 需要检测的[(列号, 表头)]) (default: {True})
+
+        Returns:
+            list -- [(列号, 表头)]，tuple_headers时表头为tuple
+        """
+        data_cols = []
+        probe_cols = []
+        start_row, end_row = self._get_data_range(data_rows)
+        selected_cols = self._get_selected_cols(col_header_record)
+        for index, col_header in enumerate(col_header_record):
+            if selected_cols is not None and index not in selected_cols:
+                continue
+            col_key = self.col_header_paths[index] if self.tuple_headers else col_header
+            if col_header:
+                data_cols.append((index, col_key))
+            elif not probe:
+                probe_cols.append((index, col_key))
+            # 去除空的列，没有数据行时没有表头的列都去除
+            elif _is_full_col(self.sheet, index, start_row, end_row):
+                data_cols.append((index, col_key))
+        if not probe:
+            return data_cols, probe_cols
+        return data_cols
+
+    def _get_col_key(self, col: int):
+        """返回结果中列的key
+        """
+        if self.tuple_headers:
+            return self.col_header_paths[col]
+        return self.col_header_record[col]
+
+    def _get_col_number(self, col, name: str) -> int:
+        """把表头或者列号转换为列号
+
+        Arguments:
+            col {int|str} -- 表头或者列号
+            name {str} -- 参数名，用于错误信息
+
+        Returns:
+            int -- 列号
+        """
+        if isinstance(col, str):
+            if col not in self.col_header_record:
+                raise ValueError(f"{name} {col!r} is not a column header")
+            return self.col_header_record.index(col)
+        if not 0 <= col < len(self.col_header_record):
+            raise ValueError(f"{name} {col} out of range")
+        return col
+
+    def _get_row_runs(self, data_rows: list, nrows: int = None, skip_data_rows: int = 0,
+                      row_filter: dict = None) -> list:
+        """需要读取的数据行，合并为连续的行号区间。
+        先跳过skip_data_rows行，再用row_filter过滤，最多保留nrows行。
+        row_filter只读取条件列的值，其余列只读取保留的行。
+
+        Arguments:
+            data_rows {list} -- 数据行
+
+        Keyword Arguments:
+            nrows {int} -- 最多读取的行数，None表示不限制 (default: {None})
+            skip_data_rows {int} -- 跳过的数据行数 (default: {0})
+            row_filter {dict} -- {表头或列号: predicate(value) -> bool}，所有条件都满足的行被保留 (default: {None})
+
+        Returns:
+            list -- [(start_row, end_row)]
+        """
+        if nrows is not None and nrows < 0:
+            raise ValueError(f"nrows must not be negative, got {nrows}")
+        if skip_data_rows < 0:
+            raise ValueError(f"skip_data_rows must not be negative, got {skip_data_rows}")
+        start_row, end_row = self._get_data_range(data_rows)
+        start_row += skip_data_rows
+        if not row_filter:
+            if nrows is not None:
+                end_row = min(end_row, start_row + nrows)
+            return [(start_row, end_row)] if start_row < end_row else []
+
+        keep = [True] * max(end_row - start_row, 0)
+        for col, predicate in row_filter.items():
+            col = self._get_col_number(col, "row_filter")
+            # 合并单元格覆盖的行(例如index列的纵向合并)使用合并单元格的值
+            col_values = get_merged_col_values(self.sheet, col, start_row, end_row)
+            keep = [kept and bool(predicate(value)) for kept, value in zip(keep, col_values)]
+
+        row_runs = []
+        count = 0
+        for offset, kept in enumerate(keep):
+            if not kept:
+                continue
+            if nrows is not None and count >= nrows:
+                break
+            row = start_row + offset
+            if row_runs and row_runs[-1][1] == row:
+                row_runs[-1][1] = row + 1
+            else:
+                row_runs.append([row, row + 1])
+            count += 1
+        return [tuple(row_run) for row_run in row_runs]
+
+    def _get_col_data(self, col_header_record: list, data_rows: list, row_runs: list = None) -> dict:
         """获取excel中的每一列数据
+        数据行是连续的行号，按列整块读取。
+
+        Keyword Arguments:
+            row_runs {list} -- 读取的行号区间[(start_row, end_row)]，None表示所有数据行 (default: {None})
 
         Returns:
             [dict] -- {"col_name": col_value_list}
         """
         res = {}
-        for index, col_header in enumerate(col_header_record):
+        if row_runs is None:
+            row_runs = [self._get_data_range(data_rows)]
+        row_count = sum(end_row - start_row for start_row, end_row in row_runs)
+        data_cols = self._get_data_cols(col_header_record, data_rows)
+        load_col = self._make_col_loader(row_runs)
+        with self._stats.stage("extract", row_count * len(data_cols)):
+            for index, col_header in data_cols:
+                res[col_header] = load_col(index)
+        return res
 
-            col_value = [self.sheet.cell(
-                row, index).value for row in data_rows]
+    def _get_typed_col_data(self, col_header_record: list, data_rows: list,
+                            row_runs: list = None) -> dict:
+        """获取excel中的每一列数据，按列的主要单元格类型构建连续存储的列。
 
-            # 去除空的列
-            if not col_header:
-                if not all(col_value):
-                    continue
-            res[col_header] = col_value
+        Keyword Arguments:
+            row_runs {list} -- 读取的行号区间[(start_row, end_row)]，None表示所有数据行 (default: {None})
+
+        Returns:
+            [dict] -- {"col_name": typed_column}
+        """
+        res = {}
+        if row_runs is None:
+            row_runs = [self._get_data_range(data_rows)]
+        row_count = sum(end_row - start_row for start_row, end_row in row_runs)
+        data_cols = self._get_data_cols(col_header_record, data_rows)
+        load_col = self._make_col_loader(row_runs, typed=True)
+        with self._stats.stage("extract", row_count * len(data_cols)):
+            for index, col_header in data_cols:
+                res[col_header] = load_col(index)
         return res
 
-    def read_excel(self, sheet_name=None) -> dict:
+    def _get_lazy_col_data(self, col_header_record: list, data_rows: list,
+                           row_runs: list = None, typed: bool = False) -> LazyColumns:
+        """获取每一列数据的LazyColumns，列在第一次访问时才读取
+
+        Keyword Arguments:
+            row_runs {list} -- 读取的行号区间[(start_row, end_row)]，None表示所有数据行 (default: {None})
+            typed {bool} -- 按列的主要单元格类型构建连续存储的列 (default: {False})
+
+        Returns:
+            LazyColumns -- {"col_name": col_value_list}
+        """
+        if row_runs is None:
+            row_runs = [self._get_data_range(data_rows)]
+        data_cols, probe_cols = self._get_data_cols(col_header_record, data_rows, probe=False)
+        sheet = self.sheet
+        start_row, end_row = self._get_data_range(data_rows)
+        check_open = self._make_open_check()
+
+        def is_full_col(index: int) -> bool:
+            check_open()
+            return _is_full_col(sheet, index, start_row, end_row)
+
+        # 类型化的列由整列的类型决定，不能只读取一个单元格
+        load_value = None if typed else self._make_value_loader(row_runs)
+        return LazyColumns(data_cols, self._make_col_loader(row_runs, typed), probe_cols,
+                           is_full_col, load_value)
+
+    def _make_open_check(self):
+        """检查workbook是否已经关闭的函数。
+        xlsx的sheet按需要从文件中解析，关闭之后不能再读取；xls的sheet在内存中，关闭后仍然可以读取。
+        """
+        workbook = self.workbook
+        sheet_name = self.sheet.name
+
+        def check_open():
+            if getattr(workbook, "closed", False):
+                raise RuntimeError(
+                    f"the workbook of sheet {sheet_name!r} has been closed, "
+                    f"read the lazy columns before closing the reader")
+        return check_open
+
+    def _make_value_loader(self, row_runs: list):
+        """读取一列中第position个单元格的函数，position为在读取的行中的位置
+
+        Arguments:
+            row_runs {list} -- 读取的行号区间[(start_row, end_row)]
+
+        Returns:
+            callable -- load_value(列号, 位置)
+        """
+        sheet = self.sheet
+        check_open = self._make_open_check()
+        run_offsets = []
+        offset = 0
+        for start_row, end_row in row_runs:
+            run_offsets.append(offset)
+            offset += end_row - start_row
+
+        def load_value(index: int, position: int):
+            check_open()
+            run = bisect.bisect_right(run_offsets, position) - 1
+            if not 0 <= position < offset:
+                raise IndexError(f"position {position} out of range")
+            return sheet.cell_value(row_runs[run][0] + position - run_offsets[run], index)
+        return load_value
+
+    def _make_col_loader(self, row_runs: list, typed: bool = False):
+        """读取一列数据的函数，绑定当前的sheet，之后切换sheet也不受影响
+
+        Arguments:
+            row_runs {list} -- 读取的行号区间[(start_row, end_row)]
+
+        Keyword Arguments:
+            typed {bool} -- 按列的主要单元格类型构建连续存储的列 (default: {False})
+
+        Returns:
+            callable -- load_col(列号)
+        """
+        sheet = self.sheet
+        datemode = self.workbook.datemode
+        check_open = self._make_open_check()
+
+        def load_col(index: int):
+            check_open()
+            col_values = self._get_run_values(sheet.col_values, index, row_runs)
+            if not typed:
+                return col_values
+            col_types = self._get_run_values(sheet.col_types, index, row_runs)
+            return build_typed_column(col_types, col_values, datemode)
+        return load_col
+
+    def _get_run_values(self, get_col, index: int, row_runs: list) -> list:
+        """按行号区间读取一列，只有一个区间时直接返回切片
+        """
+        if len(row_runs) == 1:
+            return get_col(index, *row_runs[0])
+        values = []
+        for start_row, end_row in row_runs:
+            values.extend(get_col(index, start_row, end_row))
+        return values
+
+    def read_excel(self, sheet_name=None, typed: bool = False, nrows: int = None,
+                   skip_data_rows: int = 0, row_filter: dict = None, lazy: bool = False) -> dict:
         """读取excel中的数据
 
         Keyword Arguments:
             sheet_name {str} -- sheet name (default: {None})
+            typed {bool} -- 按列的主要单元格类型返回numpy列，不使用缓存 (default: {False})
+            nrows {int} -- 最多读取的数据行数，None表示不限制 (default: {None})
+            skip_data_rows {int} -- 跳过开头的数据行数 (default: {0})
+            row_filter {dict} -- {表头或列号: predicate(value) -> bool}，
+                                 只读取所有条件都满足的行，合并单元格覆盖的行传入合并单元格的值，
+                                 不使用缓存 (default: {None})
+            lazy {bool} -- 返回LazyColumns，每一列在第一次访问时才读取，不使用缓存 (default: {False})
 
         Returns:
             dict -- {"col_name": col_value_list}
         """
+        self._reset_stats()
+        self._reset_layout()
+        row_options = {"nrows": nrows, "skip_data_rows": skip_data_rows, "row_filter": row_filter}
+        if (self.cache is None or typed or self.index_col is not None or row_filter or
+                self.incremental or lazy):
+            self._open_workbook()
+            try:
+                return self._read_sheet(sheet_name, typed, lazy=lazy, **row_options)
+            finally:
+                # lazy的列在访问时才从workbook中读取
+                if not lazy:
+                    self._release_workbook()
+
+        cache_options = self._get_cache_options()
+        # 行数限制不同的结果分开缓存
+        if nrows is not None or skip_data_rows:
+            cache_options.update(nrows=nrows, skip_data_rows=skip_data_rows)
+        with self._stats.stage("cache"):
+            data = self.cache.get(self.file_path, sheet_name, cache_options)
+        if self.stats is not None:
+            self.stats.cache_hit = data is not None
+        if data is None:
+            self._open_workbook()
+            try:
+                data = self._read_sheet(sheet_name, **row_options)
+            finally:
+                self._release_workbook()
+            self.cache.put(self.file_path, sheet_name, cache_options, data)
+        else:
+            # 缓存命中时没有表头与数据的划分，done事件中cache_hit为True
+            self._stats.record_done([], None)
+        return data
+
+    def _read_sheet(self, sheet_name=None, typed: bool = False, nrows: int = None,
+                    skip_data_rows: int = 0, row_filter: dict = None, lazy: bool = False) -> dict:
+        """从已经打开的workbook中读取一张sheet的数据
+
+        Keyword Arguments:
+            sheet_name {str} -- sheet name (default: {None})
+            typed {bool} -- 按列的主要单元格类型返回numpy列 (default: {False})
+            nrows {int} -- 最多读取的数据行数 (default: {None})
+            skip_data_rows {int} -- 跳过开头的数据行数 (default: {0})
+            row_filter {dict} -- {表头或列号: predicate(value) -> bool} (default: {None})
+            lazy {bool} -- 返回LazyColumns (default: {False})
+
+        Returns:
+            dict -- {"col_name": col_value_list}
+        """
+        if sheet_name:
+            self.sheet = self.workbook.sheet_by_name(sheet_name)
+        else:
+            self.sheet = self.workbook.sheet_by_index(0)
+
+        self._detect_sheet()
+        if self._resume_row is not None:
+            # 跳过上一次已经读取的行
+            skip_data_rows += self._resume_row - self._get_data_range(self.data_rows)[0]
+        row_runs = None
+        if nrows is not None or skip_data_rows or row_filter:
+            with self._stats.stage("filter", len(self.data_rows)):
+                row_runs = self._get_row_runs(self.data_rows, nrows, skip_data_rows, row_filter)
+        if lazy:
+            data = self._get_lazy_col_data(self.col_header_record, self.data_rows, row_runs, typed)
+        elif typed:
+            data = self._get_typed_col_data(self.col_header_record, self.data_rows, row_runs)
+        else:
+            data = self._get_col_data(self.col_header_record, self.data_rows, row_runs)
+        self.index = None
+        if self.index_col is not None:
+            with self._stats.stage("index", len(self.data_rows)):
+                self.index = self._build_index(data, row_runs)
+        if self.incremental:
+            self._update_checkpoint(row_runs, nrows)
+        self._record_done()
+        return data
+
+    def _update_checkpoint(self, row_runs: list, nrows: int = None):
+        """记录增量读取的进度。
+        nrows限制了读取的行数时，进度停在最后一个读取的行之后，其余情况为数据的最后一行。
+        """
+        start_row, end_row = self._get_data_range(self.data_rows)
+        data_end_row = end_row
+        if nrows is not None:
+            if row_runs:
+                end_row = row_runs[-1][1]
+            elif nrows == 0:
+                end_row = self._resume_row or start_row
+        if self.resumed:
+            template = self.checkpoint.template
+        else:
+            template = LayoutTemplate.from_sheet(
+                self.sheet.name, self.sheet, self.header_rows, start_row,
+                self.col_header_record, self.col_header_paths)
+        self.checkpoint = ReadCheckpoint(self.sheet.name, template, end_row, data_end_row)
+
+    def _get_index_cols(self, sheet_index: SheetIndex) -> list:
+        """把index_col转换为列号
+        """
+        if self.index_col == "auto":
+            return sheet_index.get_index_cols()
+        index_cols = self.index_col if isinstance(self.index_col, (list, tuple)) else [self.index_col]
+        return [self._get_col_number(index_col, "index_col") for index_col in index_cols]
+
+    def _build_index(self, data: dict, row_runs: list = None) -> RowIndex:
+        """根据index列构建数据行的哈希索引
+
+        Arguments:
+            data {dict} -- {"col_name": col_value_list}
+
+        Keyword Arguments:
+            row_runs {list} -- 读取的行号区间，None表示所有数据行 (default: {None})
+
+        Returns:
+            RowIndex -- 没有检测到index列时为None
+        """
+        sheet_index = SheetIndex(self.sheet, self.workbook, self.data_rows)
+        index_cols = self._get_index_cols(sheet_index)
+        if not index_cols:
+            return None
+        names = [self._get_col_key(col) for col in index_cols]
+        index_values = [sheet_index.get_index_values(col) for col in index_cols]
+        if row_runs is not None:
+            # 只保留读取的行，合并单元格的值在过滤之前已经填充
+            offset = self._get_data_range(self.data_rows)[0]
+            index_values = [[value for start_row, end_row in row_runs
+                             for value in values[start_row - offset:end_row - offset]]
+                            for values in index_values]
+        return RowIndex(names, index_values, data)
+
+    def _search_split(self) -> tuple:
+        if self.window_search:
+            return self._window_search_data_rows()
+        return self._search_data_rows()
+
+    def _detect_sheet(self):
+        """对当前sheet做表头与数据的划分，并解析表头。
+        结果保存在header_rows、data_rows、col_header_record中。
+        """
+        self.template = None
+        self.resumed = False
+        self._resume_row = None
+        self._type_votes = {}
+        if self.incremental and self.checkpoint is not None:
+            with self._stats.stage("checkpoint"):
+                last_data_row = self._get_last_data_row()
+                self.resumed = (self.checkpoint.matches(self.sheet) and
+                                self.checkpoint.end_row <= last_data_row)
+        if self.resumed:
+            # 表头与上一次读取一致，从上一次读取的位置继续，
+            # 上一次的数据结束行之后只有通过数据行检测的行才是追加的数据(表尾不是)
+            template = self.checkpoint.template
+            self.header_rows = template.header_rows
+            with self._stats.stage("checkpoint"):
+                data_end_row = self._get_data_end_row(
+                    template.data_start_row, known_end_row=self.checkpoint.data_end_row)
+            self.data_rows = list(range(template.data_start_row, data_end_row))
+            self.col_header_record = template.col_headers
+            self.col_header_paths = template.col_header_paths
+            self._resume_row = self.checkpoint.end_row
+            return
+        if self.templates:
+            with self._stats.stage("template"):
+                self.template = self.templates.match(self.sheet)
+        if self.stats is not None and self.template is not None:
+            self.stats.template = self.template.name
+        if self.template is not None:
+            # 与模板的表头一致，直接读取数据
+            header_rows = self.template.header_rows
+            data_start_row = self.template.data_start_row
+            # 表尾不是数据行
+            data_rows = list(range(data_start_row, self._get_data_end_row(data_start_row)))
+            col_header_record = self.template.col_headers
+            col_header_paths = self.template.col_header_paths
+        else:
+            data_rows, header_rows = self._search_split()
+            if (self.mode == "auto" and not self._has_formatting() and
+                    not self._is_fast_split_reliable(header_rows)):
+                # 类型检测的结果被复用，只重新检测合并单元格和边框
+                self._reopen_with_formatting()
+                data_rows, header_rows = self._search_split()
+            elif (self.mode == "fast" and not self._has_formatting() and
+                    self._may_hide_merges(header_rows)):
+                warnings.warn(
+                    f"sheet {self.sheet.name!r}: merged cells can not be read without formatting, "
+                    f"the header may be merged and parsed wrongly, use mode='auto' or 'accurate'",
+                    UserWarning, stacklevel=4)
+
+            col_header = ColHeader(self.sheet, self.workbook, header_rows,
+                                   t_header=self._has_formatting(), strip=self.strip,
+                                   separator=self.separator)
+            with self._stats.stage("ColHeader", len(header_rows) * self.sheet.ncols):
+                col_header_record = col_header.search_col_header()
+            col_header_paths = col_header.col_header_paths
+
+        self.header_rows = header_rows
+        self.data_rows = data_rows
+        self.col_header_record = col_header_record
+        self.col_header_paths = col_header_paths
+
+    def _record_done(self):
+        self._stats.record_done(self.header_rows, self._get_data_range(self.data_rows))
+
+    def open_sheet(self, sheet_name=None) -> list:
+        """打开workbook并完成sheet的表头与数据划分，供流式读取使用，之后用read_chunks读取数据。
+
+        Keyword Arguments:
+            sheet_name {str} -- sheet name (default: {None})
+
+        Returns:
+            list -- 读取的列[(列号, 表头)]，tuple_headers时表头为tuple
+        """
+        self._reset_stats()
+        self._reset_layout()
         self._open_workbook()
         if sheet_name:
             self.sheet = self.workbook.sheet_by_name(sheet_name)
         else:
             self.sheet = self.workbook.sheet_by_index(0)
+        self._detect_sheet()
+        self._record_done()
+        return self._get_data_cols(self.col_header_record, self.data_rows)
+
+    def _get_stream_range(self) -> tuple:
+        """流式读取的行范围，增量读取时从上一次读取的位置开始
+
+        Returns:
+            tuple -- (start_row, end_row)
+        """
+        start_row, end_row = self._get_data_range(self.data_rows)
+        if self._resume_row is not None:
+            start_row = min(max(start_row, self._resume_row), end_row)
+        return start_row, end_row
+
+    def read_chunks(self, size: int, with_types: bool = False):
+        """从open_sheet打开的sheet中按块读取数据行，每块最多size行。
+        增量读取时只读取上一次读取之后追加的行，所有块读完之后更新reader.checkpoint。
+
+        Arguments:
+            size {int} -- 每块的行数
+
+        Keyword Arguments:
+            with_types {bool} -- 同时返回单元格类型，值为(col_types, col_values) (default: {False})
+
+        Yields:
+            dict -- {"col_name": col_value_list}
+        """
+        if size < 1:
+            raise ValueError(f"chunk size must be positive, got {size}")
+        if self.sheet is None or getattr(self.workbook, "closed", False):
+            raise ValueError("no sheet has been opened, call open_sheet first")
+        data_cols = self._get_data_cols(self.col_header_record, self.data_rows)
+        data_start_row, end_row = self._get_stream_range()
+        for start_row in range(data_start_row, end_row, size):
+            stop_row = min(start_row + size, end_row)
+            if with_types:
+                yield {col_header: (self.sheet.col_types(index, start_row, stop_row),
+                                    self.sheet.col_values(index, start_row, stop_row))
+                       for index, col_header in data_cols}
+            else:
+                yield {col_header: self.sheet.col_values(index, start_row, stop_row)
+                       for index, col_header in data_cols}
+        if self.incremental:
+            self._update_checkpoint(None)
+
+    def iter_rows(self, sheet_name=None):
+        """逐行读取数据行，不会一次性生成所有列的数据。
+        增量读取时只读取上一次读取之后追加的行，所有行读完之后更新reader.checkpoint。
+
+        Keyword Arguments:
+            sheet_name {str} -- sheet name (default: {None})
+
+        Yields:
+            dict -- {"col_name": value}
+        """
+        data_cols = self.open_sheet(sheet_name)
+        for row in range(*self._get_stream_range()):
+            row_values = self.sheet.row_values(row)
+            yield {col_header: row_values[index] for index, col_header in data_cols}
+        if self.incremental:
+            self._update_checkpoint(None)
+
+    def iter_chunks(self, size: int, sheet_name=None):
+        """按块读取数据行，每块最多size行。
+
+        Arguments:
+            size {int} -- 每块的行数
+
+        Keyword Arguments:
+            sheet_name {str} -- sheet name (default: {None})
+
+        Yields:
+            dict -- {"col_name": col_value_list}
+        """
+        if size < 1:
+            raise ValueError(f"chunk size must be positive, got {size}")
+        self.open_sheet(sheet_name)
+        yield from self.read_chunks(size)
+
+    def save_template(self, name: str, registry: TemplateRegistry = None) -> LayoutTemplate:
+        """把最近一次读取的sheet的表头结构保存为模板
+
+        Arguments:
+            name {str} -- 模板名
+
+        Keyword Arguments:
+            registry {TemplateRegistry} -- 保存到的模板集合，默认为reader的templates (default: {None})
+
+        Returns:
+            LayoutTemplate -- 模板
+        """
+        if self.sheet is None or not self.col_header_record:
+            raise ValueError("no header layout has been detected, read a sheet before saving a template "
+                             "(a result taken from the cache is not detected again)")
+        data_start_row, data_end_row = self._get_data_range(self.data_rows)
+        template = LayoutTemplate.from_sheet(
+            name, self.sheet, self.header_rows, data_start_row,
+            self.col_header_record, self.col_header_paths, data_end_row)
+        if registry is None:
+            if self.templates is None:
+                self.templates = TemplateRegistry()
+            registry = self.templates
+        registry.register(template)
+        return template
+
+    def read_all_sheets(self, workers: int = None, return_errors: bool = False):
+        """读取excel中所有sheet的数据
+        每张sheet单独做表头与数据的划分，sheet之间在进程池中并行处理。
+        每个子进程只打开一次workbook，子进程按sheet序号读取，
+        当前进程不会为了获取sheet name再打开一次workbook。
+
+        Keyword Arguments:
+            workers {int} -- 进程数，None为cpu核数，1表示在当前进程中用同一个workbook顺序读取 (default: {None})
+            return_errors {bool} -- 为True时，读取失败的sheet不会中断整个workbook，
+                                    返回(数据, {sheet_name: 异常}) (default: {False})
+
+        Returns:
+            dict -- {"sheet_name": {"col_name": col_value_list}}
+        """
+        if workers == 1:
+            keep_open = self._keep_open
+            self.open()
+            try:
+                results = [_read_sheet_safely(self, sheet_name, return_errors)
+                           for sheet_name in self.workbook.sheet_names()]
+            finally:
+                if not keep_open:
+                    self.close()
+        else:
+            with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_sheet_worker,
+                    initargs=(self.file_path, self._get_options())) as executor:
+                if self._keep_open:
+                    nsheets = self.workbook.nsheets
+                else:
+                    nsheets = executor.submit(_count_sheets_in_worker).result()
+                results = list(executor.map(
+                    _read_sheet_in_worker, range(nsheets), [return_errors] * nsheets))
+
+        sheets_data = {}
+        sheets_error = {}
+        for sheet_name, data, error in results:
+            if error is not None:
+                sheets_error[sheet_name] = error
+            else:
+                sheets_data[sheet_name] = data
+        if return_errors:
+            return sheets_data, sheets_error
+        return sheets_data
+
+
+# 子进程中已经打开workbook的reader
+_worker_reader = None
+
+
+def _init_sheet_worker(file_path: str, options: dict):
+    """进程池的initializer，每个子进程打开一次workbook。
+    """
+    global _worker_reader
+    _worker_reader = ExcelCompxReader(file_path, **options)
+    _worker_reader.open()
+
+
+def _count_sheets_in_worker() -> int:
+    return _worker_reader.workbook.nsheets
+
+
+def _read_sheet_in_worker(sheet_index: int, return_errors: bool) -> tuple:
+    sheet_name = _worker_reader.workbook.sheet_names()[sheet_index]
+    return _read_sheet_safely(_worker_reader, sheet_name, return_errors)
+
+
+def _read_sheet_safely(reader: ExcelCompxReader, sheet_name: str, return_errors: bool) -> tuple:
+    """读取一张sheet，return_errors为True时捕获异常。
+
+    Returns:
+        tuple -- (sheet_name, data, error)
+    """
+    try:
+        return sheet_name, reader._read_sheet(sheet_name), None
+    except Exception as e:
+        if not return_errors:
+            raise
+        return sheet_name, None, e
+    finally:
+        reader.unload_sheet(sheet_name)
+
+
+@contextmanager
+def _time_limit(timeout: float = None):
+    """限制代码块的运行时间，超时抛出TimeoutError。
+    依赖SIGALRM，只在posix系统的主线程中生效，其余情况不限制。
+    调用方已有的SIGALRM处理函数和计时器在结束时恢复，调用方的计时器先到期时不再设置。
+    """
+    if (not timeout or not hasattr(signal, "setitimer") or
+            threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+    old_delay, old_interval = signal.getitimer(signal.ITIMER_REAL)
+    if old_delay and old_delay <= timeout:
+        yield
+        return
+
+    def on_timeout(signum, frame):
+        raise TimeoutError(f"read excel timeout after {timeout}s")
+
+    old_handler = signal.signal(signal.SIGALRM, on_timeout)
+    start = time.monotonic()
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        # 不是由python设置的处理函数返回None，只能恢复为默认处理
+        signal.signal(signal.SIGALRM, signal.SIG_DFL if old_handler is None else old_handler)
+        if old_delay:
+            remaining = old_delay - (time.monotonic() - start)
+            signal.setitimer(signal.ITIMER_REAL, max(remaining, 1e-6), old_interval)
+
+
+def _read_file_safely(file_path: str, sheet_name, options: dict, timeout: float) -> tuple:
+    """读取一个文件，捕获所有的异常(包括超时)。
+
+    Returns:
+        tuple -- (file_path, data, error, cache_counts)，
+                 cache_counts为子进程中缓存的(hits, misses)，在当前进程中读取时为None
+    """
+    try:
+        with _time_limit(timeout):
+            data = ExcelCompxReader(file_path, **options).read_excel(sheet_name)
+        result = file_path, data, None
+    except Exception as e:
+        result = file_path, None, e
+    cache = options.get("cache")
+    return result + (cache.take_counts() if cache is not None else None,)
+
+
+def _add_cache_counts(result: tuple, options: dict) -> tuple:
+    """把_read_file_safely在子进程中记录的缓存命中统计累加到当前进程的ResultCache
+
+    Returns:
+        tuple -- (file_path, data, error)
+    """
+    file_path, data, error, cache_counts = result
+    if options.get("cache") is not None:
+        options["cache"].add_counts(cache_counts)
+    return file_path, data, error
+
 
-        sheet_merger = SheetMerged(self.sheet)
-        sheet_border = SheetBorder(self.sheet, self.workbook)
-        sheet_typer = SheetType(self.sheet)
+def read_many(paths, sheet_name=None, workers: int = None, timeout: float = None, **options):
+    """在进程池中批量读取excel文件，按完成的顺序逐个返回结果。
+    同时提交的文件数不超过进程数的两倍，内存占用与文件总数无关。
 
-        no_merge_rows = sheet_merger.get_no_merge_rows()
-        containe_border_rows = sheet_border.get_each_cell_has_border_rows()
-        same_type_rows = sheet_typer.search_max_same_type_rows()
+    Arguments:
+        paths {iterable} -- excel file path列表
 
-        data_rows, header_rows = self._split_col_header_and_data_row(
-            no_merge_rows, containe_border_rows, same_type_rows)
+    Keyword Arguments:
+        sheet_name {str} -- 每个文件读取的sheet name (default: {None})
+        workers {int} -- 进程数，None为cpu核数，1表示在当前进程中顺序读取 (default: {None})
+        timeout {float} -- 单个文件的超时时间(秒)，超时的文件返回TimeoutError (default: {None})
+        options -- ExcelCompxReader的其余参数
 
-        col_header = ColHeader(self.sheet, self.workbook, header_rows)
-        col_header_record = col_header.search_col_header()
+    Yields:
+        tuple -- (file_path, {"col_header": value_list}, error)，读取成功时error为None
+    """
+    if workers == 1:
+        for file_path in paths:
+            yield _add_cache_counts(_read_file_safely(file_path, sheet_name, options, timeout), options)
+        return
+
+    max_pending = (workers or os.cpu_count() or 1) * 2
+    paths = iter(paths)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = {}
+        while True:
+            for file_path in paths:
+                pending[executor.submit(
+                    _read_file_safely, file_path, sheet_name, options, timeout)] = file_path
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            broken = []
+            for future in done:
+                file_path = pending.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    broken.append(file_path)
+                    continue
+                yield _add_cache_counts(result, options)
+            if not broken:
+                continue
+            # 有子进程异常退出(崩溃、被kill)，池中所有未完成的文件都会失败。
+            # 这些文件逐个在单独的进程中重新读取，再次退出的文件记为该文件的错误
+            for future in wait(pending).done:
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    broken.append(pending[future])
+                    continue
+                yield _add_cache_counts(result, options)
+            pending = {}
+            executor.shutdown(cancel_futures=True)
+            for file_path in broken:
+                yield _add_cache_counts(
+                    _read_file_in_new_process(file_path, sheet_name, options, timeout), options)
+            executor = ProcessPoolExecutor(max_workers=workers)
+    finally:
+        executor.shutdown(cancel_futures=True)
 
-        return self._get_col_data(col_header_record, data_rows)
 
+def _read_file_in_new_process(file_path: str, sheet_name, options: dict, timeout: float) -> tuple:
+    """在只有一个子进程的进程池中读取一个文件，子进程异常退出时返回BrokenProcessPool
 
-def read_excel(filename, sheet_name=None) -> dict:
+    Returns:
+        tuple -- (file_path, data, error, cache_counts)
+    """
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        try:
+            return executor.submit(_read_file_safely, file_path, sheet_name, options, timeout).result()
+        except BrokenProcessPool as e:
+            return file_path, None, e, None
+
+
+def read_excel(filename, sheet_name=None, cache: ResultCache = None, typed: bool = False,
+               nrows: int = None, skip_data_rows: int = 0, row_filter: dict = None,
+               lazy: bool = False, index_col=None, usecols=None) -> dict:
     """从文件中读取一张带有复杂表头的sheet
 
     Arguments:
@@ -560,12 +2263,38 @@ def read_excel(filename, sheet_name=None) -> dict:
 
     Keyword Arguments:
         sheet_name {str} -- sheet name (default: {None})
+        cache {ResultCache} -- 结果的磁盘缓存 (default: {None})
+        typed {bool} -- 按列的主要单元格类型返回numpy列 (default: {False})
+        nrows {int} -- 最多读取的数据行数 (default: {None})
+        skip_data_rows {int} -- 跳过开头的数据行数 (default: {0})
+        row_filter {dict} -- {表头或列号: predicate(value) -> bool} (default: {None})
+        lazy {bool} -- 返回LazyColumns，每一列在第一次访问时才读取 (default: {False})
+        index_col {int|str|list} -- index列，"auto"时检测左侧纵向合并的列，
+                                    index列中的纵向合并不影响表头与数据的划分 (default: {None})
+        usecols {int|str|range|list} -- 读取的列 (default: {None})
 
     Returns:
         dict -- {"col_header": value_list}
     """
+    reader = ExcelCompxReader(filename, cache=cache, index_col=index_col, usecols=usecols)
+    return reader.read_excel(sheet_name, typed, nrows, skip_data_rows, row_filter, lazy)
+
+
+def read_all_sheets(filename, workers: int = None, return_errors: bool = False) -> dict:
+    """从文件中读取所有带有复杂表头的sheet
+
+    Arguments:
+        filename {str} -- excel file path
+
+    Keyword Arguments:
+        workers {int} -- 进程数，None为cpu核数 (default: {None})
+        return_errors {bool} -- 返回(数据, {sheet_name: 异常})，而不是在第一个错误时失败 (default: {False})
+
+    Returns:
+        dict -- {"sheet_name": {"col_header": value_list}}
+    """
     reader = ExcelCompxReader(filename)
-    return reader.read_excel(sheet_name)
+    return reader.read_all_sheets(workers, return_errors)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+import time
+
+__all__ = ["ReadStats"]
+
+
+class _StageTimer:
+    def __init__(self, stats: "ReadStats", name: str, cells: int):
+        self.stats = stats
+        self.name = name
+        self.cells = cells
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats.record_stage(self.name, time.perf_counter() - self.start, self.cells)
+
+
+class _NullStageTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class ReadStats:
+    """一次读取的统计信息。
+        stages: 每个阶段的耗时(秒)、处理的单元格数以及执行次数。
+        votes: 表头与数据划分时，合并、边框、类型三种检测各自认为是数据的行数。
+        data_range: 最终的数据行范围 (start_row, end_row)。
+
+    hooks中的每个函数在阶段结束和读取结束时被调用: hook(event, data)，
+    event为"stage"、"split"或"done"。
+    """
+
+    def __init__(self, hooks: list = None):
+        self.hooks = list(hooks or [])
+        self.stages = {}
+        self.votes = {}
+        self.header_rows = []
+        self.data_range = None
+        self.cache_hit = None
+        self.template = None
+
+    def stage(self, name: str, cells: int = 0) -> _StageTimer:
+        """统计一个阶段的耗时
+
+        Arguments:
+            name {str} -- 阶段名
+
+        Keyword Arguments:
+            cells {int} -- 这个阶段处理的单元格数 (default: {0})
+        """
+        return _StageTimer(self, name, cells)
+
+    def record_stage(self, name: str, wall_time: float, cells: int = 0):
+        stage = self.stages.setdefault(name, {"wall_time": 0.0, "cells": 0, "calls": 0})
+        stage["wall_time"] += wall_time
+        stage["cells"] += cells
+        stage["calls"] += 1
+        self._emit("stage", {"stage": name, "wall_time": wall_time, "cells": cells})
+
+    def record_split(self, votes: dict, data_range: tuple):
+        self.votes = votes
+        self._emit("split", {"votes": votes, "data_range": data_range})
+
+    def record_done(self, header_rows: list, data_range: tuple):
+        self.header_rows = list(header_rows)
+        self.data_range = data_range
+        self._emit("done", self.to_dict())
+
+    @property
+    def total_time(self) -> float:
+        return sum(stage["wall_time"] for stage in self.stages.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "stages": self.stages,
+            "votes": self.votes,
+            "header_rows": self.header_rows,
+            "data_range": self.data_range,
+            "cache_hit": self.cache_hit,
+            "template": self.template,
+            "total_time": self.total_time,
+        }
+
+    def _emit(self, event: str, data: dict):
+        for hook in self.hooks:
+            hook(event, data)
+
+    def __repr__(self) -> str:
+        stages = ", ".join(f"{name}={stage['wall_time'] * 1000:.1f}ms"
+                           for name, stage in self.stages.items())
+        return f"ReadStats({stages}, data_range={self.data_range})"
+
+
+class NullStats:
+    """不统计时使用，所有的方法都不做任何事情。
+    """
+    _timer = _NullStageTimer()
+
+    def stage(self, name: str, cells: int = 0) -> _NullStageTimer:
+        return self._timer
+
+    def record_stage(self, name: str, wall_time: float, cells: int = 0):
+        pass
+
+    def record_split(self, votes: dict, data_range: tuple):
+        pass
+
+    def record_done(self, header_rows: list, data_range: tuple):
+        pass
+
+
+NULL_STATS = NullStats()
@@ -0,0 +1,215 @@
+import hashlib
+import json
+
+import xlrd
+
+__all__ = ["LayoutTemplate", "TemplateRegistry", "ReadCheckpoint"]
+
+
+def sheet_fingerprint(sheet: xlrd.sheet, data_start_row: int) -> str:
+    """计算sheet表头区域的指纹。
+    指纹由列数、表头区域的合并单元格以及表头单元格的文本组成。
+
+    Arguments:
+        sheet {xlrd.sheet} -- excel sheet
+        data_start_row {int} -- 数据开始的行号
+
+    Returns:
+        str -- 指纹
+    """
+    header_merged_cells = sorted(
+        list(merge_cell) for merge_cell in sheet.merged_cells
+        if merge_cell[0] < data_start_row)
+    header_texts = [
+        [str(value) for value in sheet.row_values(row)]
+        for row in range(min(data_start_row, sheet.nrows))
+    ]
+    fingerprint = json.dumps(
+        [sheet.ncols, header_merged_cells, header_texts], ensure_ascii=False)
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+
+class LayoutTemplate:
+    """一类报表的表头结构。
+    保存表头行、数据开始的行号、表头区域的合并单元格以及ColHeader解析出来的表头
+    (拼接后的表头和每一层的值)，指纹一致的sheet可以跳过表头与数据的划分，直接读取数据。
+    data_end_row为生成模板的sheet中数据的结束行号，匹配的sheet中数据的结束行号重新检测，
+    表尾(合计、备注等)不会被当作数据。
+    """
+
+    def __init__(self, name: str, header_rows: list, data_start_row: int,
+                 col_headers: list, merged_cells: list, fingerprint: str,
+                 col_header_paths: list = None, data_end_row: int = None):
+        self.name = name
+        self.header_rows = list(header_rows)
+        self.data_start_row = data_start_row
+        self.data_end_row = data_end_row
+        self.col_headers = list(col_headers)
+        self.merged_cells = [tuple(merge_cell) for merge_cell in merged_cells]
+        self.fingerprint = fingerprint
+        # 旧的模板没有每一层的值，使用拼接后的表头作为只有一层的路径
+        if col_header_paths is None:
+            col_header_paths = [(col_header, ) for col_header in self.col_headers]
+        self.col_header_paths = [tuple(path) for path in col_header_paths]
+
+    @classmethod
+    def from_sheet(cls, name: str, sheet: xlrd.sheet, header_rows: list,
+                   data_start_row: int, col_headers: list,
+                   col_header_paths: list = None, data_end_row: int = None) -> "LayoutTemplate":
+        """根据一张已经划分好表头和数据的sheet生成模板
+
+        Arguments:
+            name {str} -- 模板名
+            sheet {xlrd.sheet} -- excel sheet
+            header_rows {list} -- 表头行
+            data_start_row {int} -- 数据开始的行号
+            col_headers {list} -- ColHeader.search_col_header的结果
+
+        Keyword Arguments:
+            col_header_paths {list} -- ColHeader.col_header_paths (default: {None})
+            data_end_row {int} -- 数据的结束行号(不含) (default: {None})
+
+        Returns:
+            LayoutTemplate -- 模板
+        """
+        merged_cells = [merge_cell for merge_cell in sheet.merged_cells
+                        if merge_cell[0] < data_start_row]
+        return cls(name, header_rows, data_start_row, col_headers, merged_cells,
+                   sheet_fingerprint(sheet, data_start_row), col_header_paths, data_end_row)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "header_rows": self.header_rows,
+            "data_start_row": self.data_start_row,
+            "col_headers": self.col_headers,
+            "merged_cells": [list(merge_cell) for merge_cell in self.merged_cells],
+            "fingerprint": self.fingerprint,
+            "col_header_paths": [list(path) for path in self.col_header_paths],
+            "data_end_row": self.data_end_row,
+        }
+
+    @classmethod
+    def from_dict(cls, template: dict) -> "LayoutTemplate":
+        return cls(**template)
+
+
+class TemplateRegistry:
+    """按名字保存的表头模板。
+    """
+
+    def __init__(self, templates: list = None):
+        self.templates = {}
+        for template in templates or []:
+            self.register(template)
+
+    def register(self, template: LayoutTemplate):
+        """注册模板，同名的模板会被覆盖
+        """
+        self.templates[template.name] = template
+
+    def unregister(self, name: str):
+        self.templates.pop(name, None)
+
+    def __getitem__(self, name: str) -> LayoutTemplate:
+        return self.templates[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.templates
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def match(self, sheet: xlrd.sheet) -> LayoutTemplate:
+        """查找与sheet指纹一致的模板。
+        每个数据开始行号只计算一次指纹。
+
+        Arguments:
+            sheet {xlrd.sheet} -- excel sheet
+
+        Returns:
+            LayoutTemplate -- 匹配的模板，没有时返回None
+        """
+        fingerprints = {}
+        for template in self.templates.values():
+            if len(template.col_headers) != sheet.ncols or template.data_start_row > sheet.nrows:
+                continue
+            data_start_row = template.data_start_row
+            if data_start_row not in fingerprints:
+                fingerprints[data_start_row] = sheet_fingerprint(sheet, data_start_row)
+            if fingerprints[data_start_row] == template.fingerprint:
+                return template
+        return None
+
+    def save(self, file_path: str):
+        """把所有模板保存为json文件
+        """
+        templates = [template.to_dict() for template in self.templates.values()]
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(templates, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, file_path: str) -> "TemplateRegistry":
+        """从json文件中加载模板
+        """
+        with open(file_path, "r", encoding="utf-8") as f:
+            templates = json.load(f)
+        return cls([LayoutTemplate.from_dict(template) for template in templates])
+
+
+class ReadCheckpoint:
+    """增量读取的进度。
+    保存sheet的表头结构以及已经读取到的行号，表头区域不变时，
+    下一次读取只返回end_row之后追加的数据行。
+    data_end_row为保存时检测到的数据结束行号，之后的行(表尾)只有通过数据行检测才算作追加的行。
+    """
+
+    def __init__(self, sheet_name: str, template: LayoutTemplate, end_row: int,
+                 data_end_row: int = None):
+        self.sheet_name = sheet_name
+        self.template = template
+        self.end_row = end_row
+        # 没有记录时(旧版本保存的进度)与end_row一致
+        self.data_end_row = end_row if data_end_row is None else data_end_row
+
+    def matches(self, sheet: xlrd.sheet) -> bool:
+        """sheet的表头区域是否与保存时一致，并且已经读取的行都还在
+
+        Arguments:
+            sheet {xlrd.sheet} -- excel sheet
+
+        Returns:
+            bool -- 是否可以增量读取
+        """
+        template = self.template
+        if sheet.name != self.sheet_name or len(template.col_headers) != sheet.ncols:
+            return False
+        if self.end_row > sheet.nrows:
+            return False
+        return sheet_fingerprint(sheet, template.data_start_row) == template.fingerprint
+
+    def to_dict(self) -> dict:
+        return {
+            "sheet_name": self.sheet_name,
+            "template": self.template.to_dict(),
+            "end_row": self.end_row,
+            "data_end_row": self.data_end_row,
+        }
+
+    @classmethod
+    def from_dict(cls, checkpoint: dict) -> "ReadCheckpoint":
+        return cls(checkpoint["sheet_name"], LayoutTemplate.from_dict(checkpoint["template"]),
+                   checkpoint["end_row"], checkpoint.get("data_end_row"))
+
+    def save(self, file_path: str):
+        """把进度保存为json文件
+        """
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, file_path: str) -> "ReadCheckpoint":
+        """从json文件中加载进度
+        """
+        with open(file_path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
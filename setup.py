@@ -11,6 +11,13 @@ setup(
         author_email='helehappy@126.com',  # 作者邮箱
         packages=['cmp_reader'],                 # 包
         install_requires = [
-            "xlrd"
-        ]
+            "xlrd",
+            "numpy"
+        ],
+        extras_require = {
+            "arrow": ["pyarrow"],   # cmp-reader convert写parquet和feather
+        },
+        entry_points = {
+            "console_scripts": ["cmp-reader=cmp_reader.cli:main"],
+        }
 )
\ No newline at end of file
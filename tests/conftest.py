@@ -0,0 +1,119 @@
+import openpyxl
+import pytest
+import xlwt
+from openpyxl.styles import Border, Side
+
+
+def _bordered_style() -> "xlwt.XFStyle":
+    borders = xlwt.Borders()
+    borders.top = borders.bottom = borders.left = borders.right = 1
+    style = xlwt.XFStyle()
+    style.borders = borders
+    return style
+
+
+def write_xls(file_path: str, sheets: dict, border: bool = True):
+    """写入.xls测试文件
+
+    Arguments:
+        file_path {str} -- 输出的文件
+        sheets {dict} -- {sheet_name: (rows, merges)}，rows中None为空单元格，
+                         merges为[(r1, r2, c1, c2)]闭区间，值为rows中左上角的值
+
+    Keyword Arguments:
+        border {bool} -- 所有写入的单元格都带边框 (default: {True})
+    """
+    style = _bordered_style() if border else xlwt.XFStyle()
+    workbook = xlwt.Workbook()
+    for sheet_name, (rows, merges) in sheets.items():
+        sheet = workbook.add_sheet(sheet_name)
+        covered = set()
+        for r1, r2, c1, c2 in merges:
+            sheet.write_merge(r1, r2, c1, c2, rows[r1][c1], style)
+            covered.update((row, col) for row in range(r1, r2 + 1) for col in range(c1, c2 + 1))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                if (row, col) not in covered:
+                    sheet.write(row, col, value, style)
+    workbook.save(file_path)
+    return file_path
+
+
+def write_xlsx(file_path: str, sheets: dict, border: bool = True):
+    """写入.xlsx测试文件，参数与write_xls一致
+    """
+    side = Side(style="thin")
+    cell_border = Border(top=side, bottom=side, left=side, right=side)
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for sheet_name, (rows, merges) in sheets.items():
+        sheet = workbook.create_sheet(sheet_name)
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                cell = sheet.cell(row + 1, col + 1, value)
+                if border:
+                    cell.border = cell_border
+        for r1, r2, c1, c2 in merges:
+            sheet.merge_cells(start_row=r1 + 1, end_row=r2 + 1, start_column=c1 + 1, end_column=c2 + 1)
+    workbook.save(file_path)
+    return file_path
+
+
+def report_sheet(nrows: int = 30, footer: bool = False, index_block: int = 0) -> tuple:
+    """带有大标题、两层合并表头和数据块的sheet
+
+        row 0: Report (合并所有列)
+        row 1: region(纵向合并两行) | grpA(合并两列) | grpB(合并两列)
+        row 2:                     | a1 | a2        | b1 | b2
+
+    Keyword Arguments:
+        nrows {int} -- 数据行数 (default: {30})
+        footer {bool} -- 数据之后加上备注行，前两列合并，数值列中为文本 (default: {False})
+        index_block {int} -- region列每index_block行纵向合并为一个值，0表示不合并 (default: {0})
+
+    Returns:
+        tuple -- (rows, merges)
+    """
+    rows = [
+        ["Report", None, None, None, None],
+        ["region", "grpA", None, "grpB", None],
+        [None, "a1", "a2", "b1", "b2"],
+    ]
+    merges = [(0, 0, 0, 4), (1, 2, 0, 0), (1, 1, 1, 2), (1, 1, 3, 4)]
+    for row in range(nrows):
+        region = f"k{row}"
+        if index_block:
+            region = f"r{row // index_block}" if row % index_block == 0 else None
+        rows.append([region, row * 1.5, row, row * 2.0, row + 0.25])
+    if index_block:
+        for start in range(0, nrows, index_block):
+            end = min(start + index_block, nrows) - 1
+            if end > start:
+                merges.append((start + 3, end + 3, 0, 0))
+    if footer:
+        rows.append(["note: generated", None, "by", "cmp_reader", "v1"])
+        merges.append((len(rows) - 1, len(rows) - 1, 0, 1))
+    return rows, merges
+
+
+REPORT_HEADERS = ["region", "grpAa1", "grpAa2", "grpBb1", "grpBb2"]
+
+
+@pytest.fixture
+def make_xls(tmp_path):
+    """在临时目录中写入.xls，make_xls(name, sheets, border=True)返回文件路径，
+    name以.xlsx结尾时写入.xlsx
+    """
+    def make(name: str, sheets: dict, border: bool = True) -> str:
+        write = write_xlsx if name.endswith(".xlsx") else write_xls
+        return write(str(tmp_path / name), sheets, border)
+    return make
+
+
+@pytest.fixture
+def report_xls(make_xls):
+    """report_xls(name="report.xls", **report_sheet的参数)返回只有一张报表sheet的文件路径
+    """
+    def make(name: str = "report.xls", **options) -> str:
+        return make_xls(name, {"Sheet1": report_sheet(**options)})
+    return make
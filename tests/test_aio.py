@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import cmp_reader.aio
+from cmp_reader import AsyncExcelReader, ExcelCompxReader, aiter_chunks
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """记录提交的任务数
+    """
+
+    def __init__(self, max_workers: int):
+        super().__init__(max_workers=max_workers)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+@pytest.fixture
+def slow_reads(monkeypatch):
+    """读取阻塞到release被设置，记录同时执行的读取数
+    """
+    state = {"running": 0, "peak": 0, "release": threading.Event()}
+    lock = threading.Lock()
+
+    def read_file(file_path, *args):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        state["release"].wait(5)
+        time.sleep(0.01)
+        with lock:
+            state["running"] -= 1
+        return file_path, {}, None, None
+
+    def read_excel_job(file_path, *args):
+        return read_file(file_path)[1], None
+
+    monkeypatch.setattr(cmp_reader.aio, "_read_file_safely", read_file)
+    monkeypatch.setattr(cmp_reader.aio, "_read_excel_job", read_excel_job)
+    return state
+
+
+def test_read_many_shares_the_concurrency_limit(slow_reads):
+    async def main():
+        async with AsyncExcelReader("thread", max_workers=8, max_concurrency=2) as reader:
+            async def read_all():
+                return [result async for result in reader.read_many([f"{index}.xls" for index in range(6)])]
+            task = asyncio.ensure_future(read_all())
+            single = asyncio.ensure_future(reader.read_excel("single.xls"))
+            await asyncio.sleep(0.1)
+            assert slow_reads["running"] == 2
+            slow_reads["release"].set()
+            assert await single == {}
+            return await task
+
+    results = asyncio.run(main())
+    assert sorted(path for path, _, _ in results) == [f"{index}.xls" for index in range(6)]
+    assert slow_reads["peak"] == 2
+
+
+def test_read_many_bounds_the_submitted_files(slow_reads):
+    async def main():
+        executor = CountingExecutor(max_workers=1)
+        reader = AsyncExcelReader(executor, max_workers=1)
+        iterator = reader.read_many([f"{index}.xls" for index in range(20)])
+        task = asyncio.ensure_future(iterator.__anext__())
+        await asyncio.sleep(0.1)
+        submitted = executor.submitted
+        slow_reads["release"].set()
+        await task
+        await iterator.aclose()
+        executor.shutdown()
+        return submitted
+
+    assert asyncio.run(main()) == 2
+
+
+def test_read_many_rejects_a_timeout_in_threads():
+    async def main():
+        async with AsyncExcelReader("thread") as reader:
+            async for _ in reader.read_many(["report.xls"], timeout=1):
+                pass
+
+    with pytest.raises(ValueError, match="process executor"):
+        asyncio.run(main())
+
+
+def test_aiter_chunks_closes_after_the_running_chunk(report_xls, monkeypatch):
+    file_path = report_xls(nrows=20)
+    started, release = threading.Event(), threading.Event()
+    closed = []
+
+    def iter_chunks(self, size, sheet_name=None):
+        try:
+            yield {"region": []}
+            started.set()
+            release.wait(5)
+            yield {"region": []}
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(ExcelCompxReader, "iter_chunks", iter_chunks)
+
+    async def consume():
+        async for _ in aiter_chunks(file_path, 5):
+            pass
+
+    async def main():
+        task = asyncio.ensure_future(consume())
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        asyncio.get_running_loop().call_later(0.05, release.set)
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert closed == [True]
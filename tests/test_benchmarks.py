@@ -0,0 +1,47 @@
+import json
+import sys
+
+import pytest
+
+from benchmarks import bench_reader
+from benchmarks.generate import BORDER_STYLES, make_workbook
+from cmp_reader import ExcelCompxReader
+
+
+@pytest.mark.parametrize("border", BORDER_STYLES)
+@pytest.mark.parametrize("header_depth", [2, 3])
+def test_generated_workbook_splits_at_the_data_start(tmp_path, border, header_depth):
+    file_path = str(tmp_path / "bench.xls")
+    params = make_workbook(file_path, rows=60, cols=8, header_depth=header_depth,
+                           t_headers=1, border=border)
+    reader = ExcelCompxReader(file_path)
+    data = reader.read_excel()
+    assert reader.data_rows[0] == params["data_start_row"]
+    assert len(data) == 8
+    assert all(len(col_value) == 60 for col_value in data.values())
+
+
+def test_bench_case_times_every_stage(tmp_path):
+    result = bench_reader.bench_case(str(tmp_path), 1, rows=50, cols=6, header_depth=2,
+                                     merge_density=0.5, t_headers=1, border="full")
+    assert set(result["timings"]) == set(bench_reader.STAGES)
+    assert result["total"] == pytest.approx(sum(result["timings"].values()))
+    assert result["peak_memory"] > 0
+
+
+def test_compare_exits_on_regression(tmp_path, monkeypatch):
+    out_path = str(tmp_path / "bench.json")
+    argv = ["bench_reader", "--rows", "50", "--cols", "6", "--repeat", "1"]
+    monkeypatch.setattr(sys, "argv", argv + ["--out", out_path])
+    bench_reader.main()
+    with open(out_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    for result in baseline["results"]:
+        result["total"] /= 100
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f)
+
+    monkeypatch.setattr(sys, "argv", argv + ["--compare", out_path])
+    with pytest.raises(SystemExit) as exit_info:
+        bench_reader.main()
+    assert exit_info.value.code == 1
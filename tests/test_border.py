@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+import xlrd
+
+from benchmarks.generate import make_workbook
+from cmp_reader.reader import SheetBorder, get_xf_border_table
+
+
+def per_cell_border(sheet, workbook) -> "np.ndarray":
+    """原来的实现：逐个单元格查找XF，累加四条边框"""
+    border = np.zeros((sheet.nrows, sheet.ncols), dtype=np.int64)
+    for row in range(sheet.nrows):
+        for col in range(sheet.ncols):
+            xf = workbook.xf_list[sheet.cell(row, col).xf_index]
+            border[row, col] = sum(style > 0 for style in [
+                xf.border.top_line_style, xf.border.bottom_line_style,
+                xf.border.left_line_style, xf.border.right_line_style])
+    return border
+
+
+@pytest.mark.parametrize("border", ["full", "data", "none"])
+def test_border_matrix_matches_per_cell_lookup(tmp_path, border):
+    file_path = str(tmp_path / "border.xls")
+    make_workbook(file_path, rows=40, cols=8, header_depth=3, t_headers=1, border=border)
+    workbook = xlrd.open_workbook(file_path, formatting_info=True)
+    sheet = workbook.sheet_by_index(0)
+
+    expected = per_cell_border(sheet, workbook)
+    sheet_border = SheetBorder(sheet, workbook)
+    np.testing.assert_array_equal(sheet_border.get_sheet_border(), expected)
+    np.testing.assert_array_equal(SheetBorder(sheet, workbook, nrows=10).get_sheet_border(),
+                                  expected[:10])
+
+    min_cells = np.ceil(sheet.ncols * 0.8)
+    expected_rows = [row for row in range(sheet.nrows) if (expected[row] >= 3).sum() >= min_cells]
+    assert sheet_border.get_each_cell_has_border_rows() == expected_rows
+
+
+def test_xf_border_table_is_built_once_per_workbook(tmp_path):
+    file_path = str(tmp_path / "border.xls")
+    make_workbook(file_path, rows=5, cols=4)
+    workbook = xlrd.open_workbook(file_path, formatting_info=True)
+    assert get_xf_border_table(workbook) is get_xf_border_table(workbook)
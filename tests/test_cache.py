@@ -0,0 +1,109 @@
+import json
+import os
+
+from cmp_reader import ExcelCompxReader, ResultCache, read_excel, read_many
+from cmp_reader.cache import FILE_RECORD_DIR, HEADER_STRUCT
+
+from conftest import report_sheet
+
+
+def test_cache_hit_returns_the_same_data(report_xls, tmp_path):
+    file_path = report_xls(nrows=40)
+    cache = ResultCache(str(tmp_path / "cache"))
+    data = read_excel(file_path, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+    cached = read_excel(file_path, cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cached == data
+    assert all(type(col_value) is list for col_value in cached.values())
+
+
+def test_cache_keeps_tuple_headers_and_mixed_columns(report_xls, tmp_path):
+    file_path = report_xls(nrows=10, footer=True)
+    cache = ResultCache(str(tmp_path / "cache"))
+    data = ExcelCompxReader(file_path, cache=cache, tuple_headers=True).read_excel()
+    cache.put(file_path, "mixed", {}, {("a", "b"): ["x", 1, 2.5, ""]})
+    assert cache.get(file_path, "mixed", {}) == {("a", "b"): ["x", 1, 2.5, ""]}
+    assert ExcelCompxReader(file_path, cache=cache, tuple_headers=True).read_excel() == data
+
+
+def test_cache_entries_are_json_and_float64(report_xls, tmp_path):
+    file_path = report_xls(nrows=10)
+    cache_dir = tmp_path / "cache"
+    cache = ResultCache(str(cache_dir))
+    read_excel(file_path, cache=cache)
+    entry_path, = cache_dir.glob("*.cmpc")
+    buffer = entry_path.read_bytes()
+    _, header_size = HEADER_STRUCT.unpack_from(buffer, 0)
+    columns = json.loads(buffer[HEADER_STRUCT.size:HEADER_STRUCT.size + header_size])
+    assert {col_header: kind for col_header, kind, *_ in columns} == {
+        "region": "json", "grpAa1": "f8", "grpAa2": "f8", "grpBb1": "f8", "grpBb2": "f8"}
+
+
+def test_unknown_column_kind_is_a_miss(report_xls, tmp_path):
+    file_path = report_xls(nrows=10)
+    cache = ResultCache(str(tmp_path / "cache"))
+    read_excel(file_path, cache=cache)
+    entry_path, = (tmp_path / "cache").glob("*.cmpc")
+    entry_path.write_bytes(entry_path.read_bytes().replace(b'"json"', b'"pckl"'))
+    assert read_excel(file_path, cache=cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_file_hash_records_are_one_file_per_source_and_pruned(make_xls, tmp_path):
+    paths = [make_xls(f"report{index}.xls", {"Sheet1": report_sheet(nrows=5)}) for index in range(3)]
+    cache_dir = tmp_path / "cache"
+    cache = ResultCache(str(cache_dir))
+    for file_path in paths:
+        read_excel(file_path, cache=cache)
+    assert not (cache_dir / "index.json").exists()
+    assert len(os.listdir(cache_dir / FILE_RECORD_DIR)) == 3
+
+    os.unlink(paths[0])
+    cache.evict()
+    records = [json.loads((cache_dir / FILE_RECORD_DIR / name).read_text())
+               for name in os.listdir(cache_dir / FILE_RECORD_DIR)]
+    assert sorted(record["path"] for record in records) == sorted(os.path.abspath(path) for path in paths[1:])
+
+    cache.clear()
+    assert os.listdir(cache_dir / FILE_RECORD_DIR) == []
+    assert list(cache_dir.glob("*.cmpc")) == []
+
+
+def test_read_many_counts_the_worker_hits(make_xls, tmp_path):
+    paths = [make_xls(f"report{index}.xls", {"Sheet1": report_sheet(nrows=5 + index)}) for index in range(4)]
+    cache = ResultCache(str(tmp_path / "cache"))
+    for workers in [2, 1]:
+        assert all(error is None for _, _, error in read_many(paths, workers=workers, cache=cache))
+    assert (cache.hits, cache.misses) == (4, 4)
+    assert all(error is None for _, _, error in read_many(paths, workers=2, cache=cache))
+    assert (cache.hits, cache.misses) == (8, 4)
+
+
+def test_put_prunes_only_over_max_size(make_xls, tmp_path, monkeypatch):
+    paths = [make_xls(f"report{index}.xls", {"Sheet1": report_sheet(nrows=5 + index)}) for index in range(3)]
+    pruned = []
+    monkeypatch.setattr(ResultCache, "_prune_records", lambda cache: pruned.append(cache))
+    cache = ResultCache(str(tmp_path / "cache"))
+    for file_path in paths:
+        read_excel(file_path, cache=cache)
+    assert pruned == []
+
+    entry_size = max(path.stat().st_size for path in (tmp_path / "cache").glob("*.cmpc"))
+    small = ResultCache(str(tmp_path / "cache"), max_size=entry_size * 2)
+    read_excel(paths[0], sheet_name="Sheet1", cache=small, nrows=2)
+    assert len(pruned) == 1
+    assert len(list((tmp_path / "cache").glob("*.cmpc"))) <= 2
+
+
+def test_read_only_cache_hit_ignores_the_access_time(report_xls, tmp_path, monkeypatch):
+    file_path = report_xls(nrows=10)
+    cache = ResultCache(str(tmp_path / "cache"))
+    data = read_excel(file_path, cache=cache)
+
+    def read_only(*args, **kwargs):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(os, "utime", read_only)
+    assert read_excel(file_path, cache=cache) == data
+    assert cache.hits == 1
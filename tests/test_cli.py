@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from cmp_reader import ExcelCompxReader
+from cmp_reader.cli import convert_file, get_out_paths, main
+
+from conftest import report_sheet
+
+
+def test_text_columns_use_the_shared_type_rule(make_xls, tmp_path):
+    pyarrow = pytest.importorskip("pyarrow.parquet")
+    rows, merges = report_sheet(nrows=4)
+    for row in rows[3:]:
+        row[2] = str(row[2])
+    rows[4][2] = "  "
+    file_path = make_xls("report.xls", {"Sheet1": (rows, merges)})
+    out_path = str(tmp_path / "report.parquet")
+    assert convert_file(file_path, out_path, file_format="parquet", chunk_size=3) == 4
+    table = pyarrow.read_table(out_path)
+    # 数字字符串按数值写入，只有空白的单元格为null
+    assert table.column("grpAa2").to_pylist() == [0, None, 2, 3]
+    assert table.column("region").to_pylist() == ["k0", "k1", "k2", "k3"]
+
+
+def test_out_paths_keep_the_relative_directories(tmp_path):
+    in_paths = [str(tmp_path / "north" / "report.xls"), str(tmp_path / "south" / "report.xls")]
+    out = str(tmp_path / "out")
+    assert get_out_paths(in_paths, out, "csv") == [
+        os.path.join(out, "north", "report.csv"), os.path.join(out, "south", "report.csv")]
+    assert get_out_paths(in_paths[:1], out, "csv") == [os.path.join(out, "report.csv")]
+
+
+def test_out_paths_reject_collisions(make_xls, tmp_path, capsys):
+    in_paths = [make_xls("report.xls", {"Sheet1": report_sheet(nrows=3)}),
+                make_xls("report.xlsx", {"Sheet1": report_sheet(nrows=3)})]
+    with pytest.raises(ValueError, match="would both be written"):
+        get_out_paths(in_paths, None, "csv")
+    with pytest.raises(SystemExit) as exit_info:
+        main(["convert", *in_paths, "--out", str(tmp_path / "out")])
+    assert exit_info.value.code == 2
+    assert "would both be written" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("file_format", ["csv", "parquet"])
+def test_convert_reads_the_chunks_once(make_xls, tmp_path, monkeypatch, file_format):
+    if file_format != "csv":
+        pytest.importorskip("pyarrow")
+    file_path = make_xls("report.xls", {"Sheet1": report_sheet(nrows=7)})
+    passes = []
+    read_chunks = ExcelCompxReader.read_chunks
+
+    def counting_read_chunks(reader, *args, **kwargs):
+        passes.append(args)
+        return read_chunks(reader, *args, **kwargs)
+
+    monkeypatch.setattr(ExcelCompxReader, "read_chunks", counting_read_chunks)
+    out_path = str(tmp_path / f"report.{file_format}")
+    assert convert_file(file_path, out_path, file_format=file_format, chunk_size=3) == 7
+    assert len(passes) == 1
@@ -0,0 +1,29 @@
+from cmp_reader import ExcelCompxReader
+
+from conftest import REPORT_HEADERS, report_sheet
+
+
+def test_separator_joins_the_header_levels(report_xls):
+    data = ExcelCompxReader(report_xls(nrows=5), separator="/").read_excel()
+    assert list(data) == ["region", "grpA/a1", "grpA/a2", "grpB/b1", "grpB/b2"]
+    assert data["grpA/a2"] == [0, 1, 2, 3, 4]
+
+
+def test_tuple_headers_keep_each_level(report_xls):
+    reader = ExcelCompxReader(report_xls(nrows=5), tuple_headers=True)
+    data = reader.read_excel()
+    assert list(data) == [("region", ""), ("grpA", "a1"), ("grpA", "a2"), ("grpB", "b1"), ("grpB", "b2")]
+    # 其余参数仍然使用拼接后的表头
+    assert reader.col_header_record == REPORT_HEADERS
+
+
+def test_duplicate_headers_get_the_column_number(make_xls):
+    rows, merges = report_sheet(nrows=5)
+    # 只有空格不同的表头在去除空白之后重名
+    rows[2][2] = " a 1"
+    file_path = make_xls("dup.xls", {"Sheet1": (rows, merges)})
+    assert list(ExcelCompxReader(file_path).read_excel()) == [
+        "region", "grpAa1", "grpAa12", "grpBb1", "grpBb2"]
+    assert list(ExcelCompxReader(file_path, separator="/").read_excel()) == [
+        "region", "grpA/a1", "grpA/a1/2", "grpB/b1", "grpB/b2"]
+    assert list(ExcelCompxReader(file_path, tuple_headers=True).read_excel())[2] == ("grpA", "a12")
@@ -0,0 +1,71 @@
+import pytest
+
+from cmp_reader import ExcelCompxReader, ReadCheckpoint
+
+from conftest import report_sheet
+
+
+def test_incremental_returns_only_appended_rows(make_xls, tmp_path):
+    file_path = make_xls("report.xls", {"Sheet1": report_sheet(nrows=10)})
+    reader = ExcelCompxReader(file_path, incremental=True)
+    assert len(reader.read_excel()["region"]) == 10
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    reader.checkpoint.save(checkpoint_path)
+
+    make_xls("report.xls", {"Sheet1": report_sheet(nrows=15)})
+    reader = ExcelCompxReader(file_path, checkpoint=ReadCheckpoint.load(checkpoint_path))
+    data = reader.read_excel()
+    assert reader.resumed
+    assert data["region"] == [f"k{row}" for row in range(10, 15)]
+    assert reader.checkpoint.end_row == reader.checkpoint.data_end_row == 18
+
+
+def test_incremental_skips_the_footer(make_xls):
+    file_path = make_xls("report.xls", {"Sheet1": report_sheet(nrows=10, footer=True)})
+    reader = ExcelCompxReader(file_path, incremental=True)
+    assert len(reader.read_excel()["region"]) == 10
+    assert reader.checkpoint.data_end_row == 13
+    # 表尾不是追加的行
+    assert reader.read_excel()["region"] == []
+    assert reader.resumed
+
+    make_xls("report.xls", {"Sheet1": report_sheet(nrows=12, footer=True)})
+    assert reader.read_excel()["region"] == ["k10", "k11"]
+    assert reader.checkpoint.data_end_row == 15
+
+
+def test_checkpoint_without_data_end_row_uses_end_row(make_xls):
+    file_path = make_xls("report.xls", {"Sheet1": report_sheet(nrows=10)})
+    reader = ExcelCompxReader(file_path, incremental=True)
+    reader.read_excel()
+    checkpoint = reader.checkpoint.to_dict()
+    del checkpoint["data_end_row"]
+    assert ReadCheckpoint.from_dict(checkpoint).data_end_row == 13
+
+
+def test_streaming_reads_resume_from_the_checkpoint(make_xls):
+    file_path = make_xls("report.xls", {"Sheet1": report_sheet(nrows=10)})
+    reader = ExcelCompxReader(file_path, incremental=True)
+    assert sum(len(chunk["region"]) for chunk in reader.iter_chunks(4)) == 10
+    assert reader.checkpoint.end_row == 13
+
+    make_xls("report.xls", {"Sheet1": report_sheet(nrows=15)})
+    assert [row["region"] for row in reader.iter_rows()] == [f"k{row}" for row in range(10, 15)]
+    assert reader.resumed
+    assert reader.checkpoint.end_row == 18
+    assert list(reader.iter_chunks(4)) == []
+
+    make_xls("report.xls", {"Sheet1": report_sheet(nrows=17)})
+    reader.open_sheet()
+    assert [chunk["region"] for chunk in reader.read_chunks(4)] == [["k15", "k16"]]
+    assert reader.checkpoint.end_row == 20
+
+
+def test_open_sheet_clears_the_previous_layout(make_xls):
+    file_path = make_xls("report.xls", {"Sheet1": report_sheet(nrows=10), "Empty": ([], [])})
+    reader = ExcelCompxReader(file_path)
+    reader.read_excel()
+    # 空白sheet不能划分表头与数据
+    with pytest.raises(ValueError):
+        reader.open_sheet("Empty")
+    assert reader.data_rows == [] and reader.col_header_record == []
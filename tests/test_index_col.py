@@ -0,0 +1,58 @@
+import numpy as np
+
+from cmp_reader import ExcelCompxReader, read_excel
+from cmp_reader.reader import get_merged_index
+
+from conftest import REPORT_HEADERS, report_sheet
+
+
+def broken_type_sheet(nrows: int = 30, index_block: int = 3) -> tuple:
+    """数值列中间有一行文本，类型检测只覆盖一半的数据行
+    """
+    rows, merges = report_sheet(nrows=nrows, index_block=index_block)
+    rows[13][1:] = ["-"] * 4
+    return rows, merges
+
+
+class MergedSheet:
+    def __init__(self, nrows: int, ncols: int, merged_cells: list):
+        self.nrows = nrows
+        self.ncols = ncols
+        self.merged_cells = merged_cells
+
+
+def test_index_merges_exclude_header_merges():
+    rows, merges = report_sheet(nrows=9, index_block=3)
+    sheet = MergedSheet(len(rows), 5, [(r1, r2 + 1, c1, c2 + 1) for r1, r2, c1, c2 in merges])
+    mask = get_merged_index(sheet).get_index_merge_mask()
+    # 标题、表头中纵向合并的region和横向合并的分组都不是index
+    assert mask.tolist() == [False] * 4 + [True] * 3
+    assert not get_merged_index(sheet).get_index_merge_mask(max_cols=0).any()
+
+
+def test_index_merges_do_not_vote_against_data_rows(make_xls):
+    file_path = make_xls("index.xls", {"Sheet1": broken_type_sheet()})
+    reader = ExcelCompxReader(file_path, index_col="auto")
+    data = reader.read_excel()
+    assert list(data) == REPORT_HEADERS
+    assert reader.header_rows == [0, 1, 2]
+    assert len(data["grpAa1"]) == 30
+    assert reader.index.get_row("r1")["grpAa2"] == 3
+
+
+def test_index_merges_keep_the_data_end(make_xls):
+    rows, merges = broken_type_sheet()
+    rows.append(["note", None, "by", "cmp_reader", "v1"])
+    merges.append((len(rows) - 1, len(rows) - 1, 0, 1))
+    file_path = make_xls("index.xls", {"Sheet1": (rows, merges)})
+    reader = ExcelCompxReader(file_path, index_col=0, window_search=True, max_search_row=8)
+    data = reader.read_excel()
+    assert len(data["grpAa1"]) == 30
+
+
+def test_module_read_excel_passes_index_col_and_usecols(make_xls):
+    file_path = make_xls("index.xls", {"Sheet1": broken_type_sheet()})
+    data = read_excel(file_path, index_col="auto", usecols=["region", "grpA"])
+    assert list(data) == ["region", "grpAa1", "grpAa2"]
+    assert len(data["region"]) == 30
+    assert np.array_equal(data["grpAa2"][:3], [0, 1, 2])
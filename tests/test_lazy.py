@@ -0,0 +1,71 @@
+import pytest
+
+import cmp_reader.reader
+from cmp_reader import ExcelCompxReader, LazyColumns
+
+from conftest import report_sheet
+
+
+def extra_col_sheet(nrows: int = 10, gap: int = None) -> tuple:
+    """report_sheet加上一列没有表头的数据，gap行为空
+    """
+    rows, merges = report_sheet(nrows=nrows)
+    for row, values in enumerate(rows):
+        values.append(None if row < 3 or row - 3 == gap else row * 10)
+    # 标题横跨所有列
+    merges[0] = (0, 0, 0, 5)
+    return rows, merges
+
+
+@pytest.fixture
+def probed(monkeypatch):
+    """记录检测没有表头的列的次数
+    """
+    probed = []
+    is_full_col = cmp_reader.reader._is_full_col
+
+    def counting_is_full_col(sheet, index, *args):
+        probed.append(index)
+        return is_full_col(sheet, index, *args)
+
+    monkeypatch.setattr(cmp_reader.reader, "_is_full_col", counting_is_full_col)
+    return probed
+
+
+def test_empty_header_cols_are_probed_on_first_listing(make_xls, probed):
+    file_path = make_xls("extra.xls", {"Sheet1": extra_col_sheet()})
+    data = ExcelCompxReader(file_path).read_excel(lazy=True)
+    assert isinstance(data, LazyColumns)
+    assert data["grpAa2"] == list(range(10))
+    assert probed == []
+    assert list(data) == ["region", "grpAa1", "grpAa2", "grpBb1", "grpBb2", ""]
+    assert probed == [5]
+    assert data.to_dict() == ExcelCompxReader(file_path).read_excel()
+
+
+def test_empty_header_col_with_gaps_is_dropped(make_xls):
+    file_path = make_xls("extra.xls", {"Sheet1": extra_col_sheet(gap=4)})
+    data = ExcelCompxReader(file_path).read_excel(lazy=True)
+    assert "" not in data
+    with pytest.raises(KeyError):
+        data[""]
+    assert len(data) == 5
+
+
+def test_index_rows_read_single_cells(make_xls):
+    file_path = make_xls("index.xls", {"Sheet1": report_sheet(nrows=9, index_block=3)})
+    reader = ExcelCompxReader(file_path, index_col="region")
+    data = reader.read_excel(lazy=True, skip_data_rows=1)
+    row = reader.index.get_row("r1")
+    assert row == {"region": "r1", "grpAa1": 4.5, "grpAa2": 3, "grpBb1": 6.0, "grpBb2": 3.25}
+    assert repr(data) == "LazyColumns(cols=5, loaded=0)"
+
+
+def test_lazy_xlsx_columns_fail_clearly_after_close(make_xls):
+    file_path = make_xls("report.xlsx", {"Sheet1": report_sheet(nrows=5)})
+    with ExcelCompxReader(file_path) as reader:
+        data = reader.read_excel(lazy=True)
+        assert data["grpAa2"] == [0, 1, 2, 3, 4]
+    assert data["grpAa2"] == [0, 1, 2, 3, 4]
+    with pytest.raises(RuntimeError, match="has been closed"):
+        data["grpBb1"]
@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+import pytest
+import xlrd
+
+from cmp_reader.reader import ColHeader, SheetMerged, get_merged_index
+
+from conftest import REPORT_HEADERS, report_sheet
+
+
+class MergedSheet:
+    """只有合并单元格的sheet，merged_cells与xlrd一致为半开区间
+    """
+
+    def __init__(self, nrows: int, ncols: int, merged_cells: list):
+        self.nrows = nrows
+        self.ncols = ncols
+        self.merged_cells = merged_cells
+
+
+def random_merged_sheet(seed: int) -> MergedSheet:
+    rng = random.Random(seed)
+    nrows, ncols = rng.randint(1, 60), rng.randint(1, 15)
+    covered = set()
+    merged_cells = []
+    for _ in range(rng.randint(0, 40)):
+        r_start, c_start = rng.randrange(nrows), rng.randrange(ncols)
+        r_end = min(nrows, r_start + rng.randint(1, 4))
+        c_end = min(ncols, c_start + rng.randint(1, 4))
+        cells = {(row, col) for row in range(r_start, r_end) for col in range(c_start, c_end)}
+        if len(cells) > 1 and not cells & covered:
+            covered |= cells
+            merged_cells.append((r_start, r_end, c_start, c_end))
+    return MergedSheet(nrows, ncols, merged_cells)
+
+
+def naive_owner(sheet: MergedSheet, row: int, col: int) -> int:
+    for merge_id, (r_start, r_end, c_start, c_end) in enumerate(sheet.merged_cells):
+        if r_start <= row < r_end and c_start <= col < c_end:
+            return merge_id
+    return -1
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_merged_index_matches_naive_lookup(seed):
+    sheet = random_merged_sheet(seed)
+    merged_index = get_merged_index(sheet)
+    owners = np.array([[naive_owner(sheet, row, col) for col in range(sheet.ncols)]
+                       for row in range(sheet.nrows)], dtype=np.int64).reshape(sheet.nrows, sheet.ncols)
+
+    assert [[merged_index.find(row, col) for col in range(sheet.ncols)]
+            for row in range(sheet.nrows)] == owners.tolist()
+    header_rows = sheet.nrows // 2
+    assert merged_index.get_owner_grid(header_rows).tolist() == owners[:header_rows].tolist()
+    assert merged_index.get_merge_row_mask(sheet.nrows).tolist() == (owners >= 0).any(axis=1).tolist()
+
+    merge_rows = [row for row in range(sheet.nrows) if (owners[row] >= 0).any()]
+    assert SheetMerged(sheet).get_merge_rows() == merge_rows
+    assert SheetMerged(sheet).get_no_merge_rows() == [
+        row for row in range(sheet.nrows) if row not in merge_rows]
+
+
+def test_merged_index_is_built_once_per_sheet():
+    sheet = random_merged_sheet(0)
+    assert get_merged_index(sheet) is get_merged_index(sheet)
+    assert get_merged_index(random_merged_sheet(0)) is not get_merged_index(sheet)
+
+
+def test_col_header_uses_merged_values(make_xls):
+    workbook = xlrd.open_workbook(make_xls("report.xls", {"Sheet1": report_sheet(nrows=5)}),
+                                  formatting_info=True)
+    sheet = workbook.sheet_by_index(0)
+    col_header = ColHeader(sheet, workbook, [0, 1, 2])
+    # 横跨所有列的标题不是表头
+    assert col_header.search_col_header() == REPORT_HEADERS
+    assert col_header.col_header_paths[:2] == [("region", ""), ("grpA", "a1")]
@@ -0,0 +1,81 @@
+import warnings
+
+import pytest
+import xlrd
+
+from cmp_reader import ExcelCompxReader
+
+from conftest import REPORT_HEADERS, report_sheet
+
+
+def simple_sheet(nrows: int = 30) -> tuple:
+    rows = [["id", "amount", "count"]]
+    rows += [[row, row * 1.5, row * 2] for row in range(nrows)]
+    return rows, []
+
+
+@pytest.fixture
+def simple_xls(make_xls):
+    return make_xls("simple.xls", {"Sheet1": simple_sheet()}, border=False)
+
+
+def test_auto_reopens_once_for_merged_headers(report_xls):
+    file_path = report_xls(nrows=40, footer=True)
+    reader = ExcelCompxReader(file_path, mode="auto", stats=True)
+    data = reader.read_excel()
+    assert data == ExcelCompxReader(file_path).read_excel()
+    assert list(data) == REPORT_HEADERS
+    assert reader.stats.stages["reopen"]["calls"] == 1
+    # 类型检测的结果在重新打开后复用
+    assert reader.stats.stages["SheetType"]["calls"] == 1
+    assert reader.stats.stages["SheetBorder"]["calls"] == 1
+
+
+def test_auto_keeps_the_fast_split_for_simple_headers(simple_xls):
+    reader = ExcelCompxReader(simple_xls, mode="auto", stats=True)
+    data = reader.read_excel()
+    assert data == ExcelCompxReader(simple_xls).read_excel()
+    assert list(data) == ["id", "amount", "count"]
+    assert "reopen" not in reader.stats.stages
+    assert "SheetBorder" not in reader.stats.stages
+
+
+def test_auto_ignores_blank_leading_header_cells(make_xls):
+    rows, _ = simple_sheet()
+    rows = [[None, None, "total"], ["id", "amount", "count"]] + rows[1:]
+    file_path = make_xls("corner.xls", {"Sheet1": (rows, [])}, border=False)
+    reader = ExcelCompxReader(file_path, mode="auto", stats=True)
+    reader.read_excel()
+    assert "reopen" not in reader.stats.stages
+
+
+def test_fast_warns_when_merges_may_be_hidden(report_xls):
+    file_path = report_xls(nrows=20)
+    with pytest.warns(UserWarning, match="merged cells"):
+        ExcelCompxReader(file_path, mode="fast").read_excel()
+
+
+def test_fast_does_not_warn_when_merges_are_visible(simple_xls, make_xls):
+    xlsx_path = make_xls("report.xlsx", {"Sheet1": report_sheet(nrows=20)})
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert list(ExcelCompxReader(simple_xls, mode="fast").read_excel()) == ["id", "amount", "count"]
+        assert list(ExcelCompxReader(xlsx_path, mode="fast").read_excel()) == REPORT_HEADERS
+
+
+def test_auto_releases_the_workbook_without_formatting(report_xls, monkeypatch):
+    released = []
+    release_resources = xlrd.book.Book.release_resources
+
+    def counting_release(book):
+        released.append(book.formatting_info)
+        return release_resources(book)
+
+    monkeypatch.setattr(xlrd.book.Book, "release_resources", counting_release)
+    file_path = report_xls(nrows=20)
+    with ExcelCompxReader(file_path, mode="auto") as reader:
+        assert list(reader.read_excel()) == REPORT_HEADERS
+        assert reader.workbook.formatting_info
+        # 不带格式打开的workbook在重新打开时释放
+        assert released == [False]
+    assert released == [False, True]
@@ -0,0 +1,55 @@
+import pytest
+
+import cmp_reader.reader
+from cmp_reader import ExcelCompxReader
+
+from conftest import report_sheet
+
+
+@pytest.fixture
+def workbook_xls(make_xls):
+    return make_xls("book.xls", {f"Sheet{index}": report_sheet(nrows=5 + index) for index in range(5)})
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """记录打开workbook的次数
+    """
+    opened = []
+    get_engine = cmp_reader.reader.get_engine
+
+    def counting_get_engine(*args, **kwargs):
+        opened.append(args[0])
+        return get_engine(*args, **kwargs)
+
+    monkeypatch.setattr(cmp_reader.reader, "get_engine", counting_get_engine)
+    return opened
+
+
+def test_open_reader_reuses_the_workbook(workbook_xls, opened):
+    expected = ExcelCompxReader(workbook_xls).read_excel("Sheet1")
+    opened.clear()
+    with ExcelCompxReader(workbook_xls) as reader:
+        for sheet_name in ["Sheet1", "Sheet3", "Sheet1"]:
+            data = reader.read_excel(sheet_name)
+            assert len(data["region"]) == 5 + int(sheet_name[-1])
+        assert data == expected
+    assert len(opened) == 1
+    assert reader.workbook is None
+
+
+def test_open_reader_loads_only_the_read_sheets(workbook_xls):
+    with ExcelCompxReader(workbook_xls) as reader:
+        assert not any(reader.workbook.sheet_loaded(index) for index in range(5))
+        reader.read_excel("Sheet2")
+        assert [reader.workbook.sheet_loaded(index) for index in range(5)] == [
+            False, False, True, False, False]
+        reader.unload_sheet("Sheet2")
+        assert not reader.workbook.sheet_loaded(2)
+
+
+def test_closed_reader_opens_the_workbook_per_read(workbook_xls, opened):
+    reader = ExcelCompxReader(workbook_xls)
+    reader.read_excel("Sheet1")
+    reader.read_excel("Sheet2")
+    assert len(opened) == 2
@@ -0,0 +1,55 @@
+import pytest
+
+import cmp_reader.reader
+from cmp_reader import ExcelCompxReader, read_all_sheets
+
+from conftest import REPORT_HEADERS, report_sheet
+
+
+@pytest.fixture
+def workbook_xls(make_xls):
+    return make_xls("book.xls", {
+        "first": report_sheet(nrows=20),
+        "second": report_sheet(nrows=35, footer=True),
+        "third": report_sheet(nrows=5),
+    })
+
+
+def test_workers_read_the_same_data(workbook_xls):
+    sequential = read_all_sheets(workbook_xls, workers=1)
+    assert list(sequential) == ["first", "second", "third"]
+    assert list(sequential["second"]) == REPORT_HEADERS
+    assert len(sequential["second"]["region"]) == 35
+    assert read_all_sheets(workbook_xls, workers=2) == sequential
+
+
+def test_workers_do_not_open_the_workbook_in_the_parent(workbook_xls, monkeypatch):
+    opened = []
+    get_engine = cmp_reader.reader.get_engine
+
+    def counting_get_engine(*args, **kwargs):
+        opened.append(args)
+        return get_engine(*args, **kwargs)
+
+    monkeypatch.setattr(cmp_reader.reader, "get_engine", counting_get_engine)
+    assert len(read_all_sheets(workbook_xls, workers=2)) == 3
+    assert opened == []
+
+
+def test_workers_reuse_the_open_workbook(workbook_xls):
+    with ExcelCompxReader(workbook_xls) as reader:
+        workbook = reader.workbook
+        assert list(reader.read_all_sheets(workers=1)) == ["first", "second", "third"]
+        assert reader.workbook is workbook
+        assert list(reader.read_all_sheets(workers=2)) == ["first", "second", "third"]
+
+
+def test_return_errors_keeps_the_other_sheets(make_xls):
+    file_path = make_xls("partial.xls", {
+        "report": report_sheet(nrows=10),
+        "empty": ([], []),
+    })
+    for workers in [1, 2]:
+        sheets_data, sheets_error = read_all_sheets(file_path, workers, return_errors=True)
+        assert list(sheets_data) == ["report"]
+        assert list(sheets_error) == ["empty"]
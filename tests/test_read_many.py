@@ -0,0 +1,99 @@
+import os
+import signal
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from cmp_reader import ExcelCompxReader, read_many
+from cmp_reader.reader import _time_limit
+
+from conftest import REPORT_HEADERS, report_sheet
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="SIGALRM is posix only")
+
+
+@pytest.fixture
+def report_files(make_xls):
+    return [make_xls(f"report{index}.xls", {"Sheet1": report_sheet(nrows=10 + index)})
+            for index in range(4)]
+
+
+def test_read_many_yields_every_file(report_files):
+    for workers in [1, 2]:
+        results = {file_path: (data, error)
+                   for file_path, data, error in read_many(report_files, workers=workers)}
+        assert sorted(results) == sorted(report_files)
+        for index, file_path in enumerate(report_files):
+            data, error = results[file_path]
+            assert error is None
+            assert list(data) == REPORT_HEADERS
+            assert len(data["region"]) == 10 + index
+
+
+def test_crashed_worker_is_the_error_of_its_file(report_files, monkeypatch):
+    read_excel = ExcelCompxReader.read_excel
+
+    def crash_on_file(self, *args, **kwargs):
+        if "report1" in self.file_path:
+            os._exit(1)
+        return read_excel(self, *args, **kwargs)
+
+    # 子进程由fork创建，继承替换后的方法
+    monkeypatch.setattr(ExcelCompxReader, "read_excel", crash_on_file)
+    results = {file_path: (data, error)
+               for file_path, data, error in read_many(report_files, workers=2)}
+    assert sorted(results) == sorted(report_files)
+    for file_path, (data, error) in results.items():
+        if "report1" in file_path:
+            assert isinstance(error, BrokenProcessPool)
+        else:
+            assert error is None and list(data) == REPORT_HEADERS
+
+
+def test_timeout_is_the_error_of_its_file(report_files, monkeypatch):
+    monkeypatch.setattr(ExcelCompxReader, "read_excel", lambda self, *args: time.sleep(5))
+    start = time.monotonic()
+    (file_path, data, error), = read_many(report_files[:1], workers=1, timeout=0.1)
+    assert isinstance(error, TimeoutError)
+    assert time.monotonic() - start < 2
+
+
+def test_time_limit_restores_the_caller_alarm():
+    fired = []
+
+    def on_alarm(signum, frame):
+        fired.append(signum)
+
+    old_handler = signal.signal(signal.SIGALRM, on_alarm)
+    try:
+        signal.setitimer(signal.ITIMER_REAL, 0.5)
+        with _time_limit(5):
+            assert signal.getsignal(signal.SIGALRM) is on_alarm
+        with _time_limit(0.2):
+            assert signal.getsignal(signal.SIGALRM) is not on_alarm
+        assert signal.getsignal(signal.SIGALRM) is on_alarm
+        delay, _ = signal.getitimer(signal.ITIMER_REAL)
+        assert 0 < delay <= 0.5
+        time.sleep(delay + 0.2)
+        assert fired == [signal.SIGALRM]
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, old_handler)
+
+
+def test_time_limit_is_skipped_outside_the_main_thread():
+    errors = []
+
+    def run():
+        try:
+            with _time_limit(0.1):
+                pass
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert errors == []
@@ -0,0 +1,26 @@
+from cmp_reader import ExcelCompxReader
+
+from conftest import report_sheet
+
+
+def test_row_filter_sees_merged_index_values(make_xls):
+    file_path = make_xls("index.xls", {"Sheet1": report_sheet(nrows=9, index_block=3)})
+    seen = []
+
+    def in_r1(value):
+        seen.append(value)
+        return value == "r1"
+
+    reader = ExcelCompxReader(file_path, index_col="region")
+    data = reader.read_excel(row_filter={"region": in_r1})
+    assert seen == ["r0"] * 3 + ["r1"] * 3 + ["r2"] * 3
+    assert data["grpAa2"] == [3, 4, 5]
+    assert reader.index.get_loc("r1") == [0, 1, 2]
+
+
+def test_row_filter_limits_and_skips(make_xls):
+    file_path = make_xls("report.xls", {"Sheet1": report_sheet(nrows=20)})
+    data = ExcelCompxReader(file_path).read_excel(
+        nrows=3, skip_data_rows=2, row_filter={"grpAa2": lambda value: value % 2 == 0})
+    assert data["grpAa2"] == [2, 4, 6]
+    assert data["region"] == ["k2", "k4", "k6"]
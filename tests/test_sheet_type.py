@@ -0,0 +1,122 @@
+"""SheetType按列统计连续相同类型的行数。
+单次倒序统计的结果要与原来逐行回溯的实现一致，耗时随行数线性增长。
+"""
+import random
+import time
+
+from xlrd.sheet import Cell
+
+from cmp_reader.reader import SheetType
+
+# (单元格类型, 值)，覆盖空白、空字符串、数字字符串等通配和近似匹配的情况
+CELLS = [
+    (0, ""), (6, ""), (1, ""), (1, "abc"), (1, "12"), (1, "12a"),
+    (2, 1.5), (2, 3.0), (3, 43000.0), (4, 1), (5, 7),
+]
+
+
+class ListSheet:
+    """按列保存单元格的sheet，只提供SheetType用到的接口
+    """
+
+    def __init__(self, columns: list):
+        self.ncols = len(columns)
+        self.nrows = len(columns[0]) if columns else 0
+        self.types = [[cell_type for cell_type, _ in column] for column in columns]
+        self.values = [[value for _, value in column] for column in columns]
+
+    def col_types(self, colx, start_rowx=0, end_rowx=None):
+        return self.types[colx][start_rowx:end_rowx]
+
+    def col_values(self, colx, start_rowx=0, end_rowx=None):
+        return self.values[colx][start_rowx:end_rowx]
+
+    def cell(self, rowx, colx):
+        return Cell(self.types[colx][rowx], self.values[colx][rowx])
+
+
+def backtracking_counts(sheet, col_types: list, col: int) -> dict:
+    """原来的实现：每一行回溯之前所有的行，统计相同类型的次数
+    """
+    row_map_same_value_count = {}
+    for col_index, current_type in enumerate(col_types):
+        row_map_same_value_count[col_index] = [current_type, 0]
+        index = 0
+        current_cell_value = sheet.cell(col_index, col).value
+        while index < col_index:
+            is_match = False
+            temp_col_type_count = row_map_same_value_count[index]
+            if current_type == 1 and not current_cell_value:
+                is_match = True
+            elif current_type in [0, 6]:
+                is_match = True
+            elif current_type == 1 and temp_col_type_count[0] == 2:
+                if current_cell_value.isdigit():
+                    is_match = True
+            elif temp_col_type_count[0] == current_type:
+                is_match = True
+            elif current_type in [1, 2, 3, 4]:
+                if temp_col_type_count[0] in [0, 6]:
+                    is_match = True
+                elif temp_col_type_count[0] == 1:
+                    temp_col_value = sheet.cell(index, col).value
+                    if not temp_col_value:
+                        is_match = True
+            if is_match:
+                temp_col_type_count[1] += 1
+            index += 1
+    return row_map_same_value_count
+
+
+def backtracking_matrix(sheet) -> list:
+    return [
+        [count for _, count in backtracking_counts(sheet, sheet.col_types(col), col).values()]
+        for col in range(sheet.ncols)
+    ]
+
+
+def random_sheet(rng: random.Random, nrows: int, ncols: int) -> ListSheet:
+    return ListSheet([[rng.choice(CELLS) for _ in range(nrows)] for _ in range(ncols)])
+
+
+def test_same_type_matrix_matches_backtracking():
+    rng = random.Random(0)
+    for _ in range(200):
+        sheet = random_sheet(rng, rng.randint(1, 60), rng.randint(1, 4))
+        assert SheetType(sheet).general_same_value_type_matrix() == backtracking_matrix(sheet)
+
+
+def test_same_type_rows_match_backtracking():
+    rng = random.Random(1)
+    for _ in range(50):
+        # 表头、数据块、表尾
+        header = [rng.choice(CELLS) for _ in range(rng.randint(1, 5))]
+        data = [(2, float(row)) for row in range(rng.randint(5, 40))]
+        footer = [rng.choice(CELLS) for _ in range(rng.randint(0, 3))]
+        sheet = ListSheet([header + data + footer, header + data + footer])
+        sheet_type = SheetType(sheet)
+        expected = backtracking_matrix(sheet)
+        assert sheet_type.general_same_value_type_matrix() == expected
+        assert sheet_type.search_max_same_type_rows() == sheet_type._get_max_sub_continue_list(expected[0])
+
+
+def _best_time(sheet, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        SheetType(sheet).search_max_same_type_rows()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def test_run_time_grows_linearly_with_rows():
+    rng = random.Random(2)
+
+    def report(nrows):
+        data = [[(1, f"k{row}"), (2, rng.random()), (1, str(row))] for row in range(nrows)]
+        return ListSheet([[(1, "h")] + [row[col] for row in data] for col in range(3)])
+
+    small, large = report(4000), report(32000)
+    ratio = _best_time(large) / _best_time(small)
+    # 行数为8倍，线性实现约为8倍，原来的平方级实现约为64倍
+    assert ratio < 24, f"8x rows took {ratio:.1f}x the time"
@@ -0,0 +1,40 @@
+from cmp_reader import ExcelCompxReader, ResultCache
+
+
+def test_stats_record_stages_votes_and_data_range(report_xls):
+    reader = ExcelCompxReader(report_xls(nrows=30, footer=True), stats=True)
+    reader.read_excel()
+    stats = reader.stats.to_dict()
+    for stage in ["open", "SheetMerged", "SheetBorder", "SheetType", "split", "ColHeader", "extract"]:
+        assert stats["stages"][stage]["calls"] == 1
+    assert stats["stages"]["SheetType"]["cells"] == reader.sheet.nrows * 5
+    assert set(stats["votes"]) == {"merge", "border", "type"}
+    assert stats["header_rows"] == [0, 1, 2]
+    assert stats["data_range"] == (3, 33)
+    assert stats["cache_hit"] is None
+
+
+def test_hooks_receive_every_event(report_xls):
+    events = []
+    ExcelCompxReader(report_xls(), hooks=[lambda event, data: events.append((event, data))]).read_excel()
+    names = [event for event, _ in events]
+    assert names[-1] == "done"
+    assert names.count("split") == 1
+    assert {data["stage"] for event, data in events if event == "stage"} >= {"open", "SheetType"}
+
+
+def test_done_hook_fires_on_cache_hits(report_xls, tmp_path):
+    file_path = report_xls()
+    cache = ResultCache(str(tmp_path / "cache"))
+    done = []
+
+    def hook(event, data):
+        if event == "done":
+            done.append(data)
+
+    for _ in range(2):
+        ExcelCompxReader(file_path, cache=cache, hooks=[hook]).read_excel()
+    assert [data["cache_hit"] for data in done] == [False, True]
+    assert done[0]["data_range"] == (3, 33)
+    assert done[1]["data_range"] is None
+    assert "cache" in done[1]["stages"]
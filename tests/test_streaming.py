@@ -0,0 +1,30 @@
+import pytest
+
+from cmp_reader import ExcelCompxReader
+
+from conftest import REPORT_HEADERS
+
+
+def test_iter_rows_matches_read_excel(report_xls):
+    file_path = report_xls(nrows=25, footer=True)
+    data = ExcelCompxReader(file_path).read_excel()
+    records = list(ExcelCompxReader(file_path).iter_rows())
+    assert len(records) == 25
+    assert list(records[0]) == REPORT_HEADERS
+    assert {header: [record[header] for record in records] for header in REPORT_HEADERS} == data
+
+
+@pytest.mark.parametrize("size", [1, 7, 25, 100])
+def test_iter_chunks_concatenate_to_read_excel(report_xls, size):
+    file_path = report_xls(nrows=25, footer=True)
+    data = ExcelCompxReader(file_path).read_excel()
+    chunks = list(ExcelCompxReader(file_path).iter_chunks(size))
+    assert len(chunks) == -(-25 // size)
+    assert all(len(chunk["region"]) <= size for chunk in chunks)
+    assert {header: [value for chunk in chunks for value in chunk[header]]
+            for header in REPORT_HEADERS} == data
+
+
+def test_iter_chunks_rejects_empty_chunks(report_xls):
+    with pytest.raises(ValueError):
+        next(ExcelCompxReader(report_xls()).iter_chunks(0))
@@ -0,0 +1,56 @@
+import pytest
+
+from cmp_reader import ExcelCompxReader, LayoutTemplate, ResultCache, TemplateRegistry
+
+from conftest import REPORT_HEADERS, report_sheet
+
+
+@pytest.fixture
+def templates(report_xls, tmp_path):
+    reader = ExcelCompxReader(report_xls("first.xls", nrows=20, footer=True))
+    reader.read_excel()
+    template = reader.save_template("report")
+    assert (template.data_start_row, template.data_end_row) == (3, 23)
+    file_path = str(tmp_path / "templates.json")
+    reader.templates.save(file_path)
+    return TemplateRegistry.load(file_path)
+
+
+def test_template_skips_detection_and_footer(templates, report_xls):
+    file_path = report_xls("second.xls", nrows=50, footer=True)
+    reader = ExcelCompxReader(file_path, templates=templates, stats=True)
+    data = reader.read_excel()
+    assert reader.stats.template == "report"
+    assert "SheetType" not in reader.stats.stages
+    assert data == ExcelCompxReader(file_path).read_excel()
+    assert len(data["region"]) == 50
+    assert data["region"][-1] == "k49"
+
+
+def test_template_without_data_rows_returns_empty_columns(templates, make_xls):
+    rows, merges = report_sheet(nrows=0)
+    file_path = make_xls("empty.xls", {"Sheet1": (rows + [[None] * 5], merges)})
+    reader = ExcelCompxReader(file_path, templates=templates, stats=True)
+    assert reader.read_excel() == {header: [] for header in REPORT_HEADERS}
+    assert reader.stats.data_range == (3, 3)
+    assert list(reader.iter_rows()) == []
+
+
+def test_template_keeps_data_end_row(templates):
+    template = templates["report"]
+    assert template.data_end_row == 23
+    assert LayoutTemplate.from_dict(template.to_dict()).data_end_row == 23
+
+
+def test_save_template_requires_a_detected_layout(report_xls, tmp_path):
+    file_path = report_xls(nrows=10)
+    with pytest.raises(ValueError, match="no header layout"):
+        ExcelCompxReader(file_path).save_template("report")
+
+    cache = ResultCache(str(tmp_path / "cache"))
+    ExcelCompxReader(file_path, cache=cache).read_excel()
+    reader = ExcelCompxReader(file_path, cache=cache)
+    reader.read_excel()
+    assert cache.hits == 1
+    with pytest.raises(ValueError, match="no header layout"):
+        reader.save_template("report")
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+import xlrd
+
+from cmp_reader import CategoricalColumn, read_excel
+from cmp_reader.columns import build_typed_column
+
+from conftest import report_sheet
+
+TEXT = xlrd.XL_CELL_TEXT
+NUMBER = xlrd.XL_CELL_NUMBER
+
+
+def test_number_column_is_int64_when_all_values_are_integers():
+    column = build_typed_column([NUMBER, NUMBER, TEXT, xlrd.XL_CELL_EMPTY], [1.0, 2.0, "3", ""])
+    assert column.dtype == np.int64
+    assert column.tolist() == [1, 2, 3, None]
+
+
+def test_superscript_digits_are_masked_not_converted():
+    # "²".isdigit()为True，但int("²")会抛出ValueError
+    column = build_typed_column([TEXT, TEXT, TEXT, NUMBER], ["12", "²", "x³", 4.5])
+    assert column.dtype == np.float64
+    assert column.tolist() == [12.0, None, None, 4.5]
+
+
+def test_superscript_digits_do_not_make_a_number_column():
+    column = build_typed_column([TEXT] * 4, ["²", "³", "²", "²"])
+    assert isinstance(column, CategoricalColumn)
+    assert column.to_list() == ["²", "³", "²", "²"]
+
+
+def test_read_excel_typed_with_superscript_text(make_xls):
+    rows, merges = report_sheet(nrows=6)
+    for row in rows[3:]:
+        row[2] = str(row[2])
+    rows[4][2] = "²"
+    file_path = make_xls("typed.xls", {"Sheet1": (rows, merges)})
+    data = read_excel(file_path, typed=True)
+    assert data["grpAa2"].tolist() == [0, None, 2, 3, 4, 5]
+    assert data["grpAa1"].dtype == np.float64
+    assert isinstance(data["region"], np.ndarray)
+
+
+def test_arrow_writer_masks_superscript_text(make_xls, tmp_path):
+    pyarrow = pytest.importorskip("pyarrow.parquet")
+    from cmp_reader.cli import convert_file
+
+    rows, merges = report_sheet(nrows=4)
+    rows[4][2] = "²"
+    file_path = make_xls("typed.xls", {"Sheet1": (rows, merges)})
+    out_path = str(tmp_path / "typed.parquet")
+    assert convert_file(file_path, out_path, file_format="parquet") == 4
+    assert pyarrow.read_table(out_path).column("grpAa2").to_pylist() == [0, None, 2, 3]
@@ -0,0 +1,47 @@
+import pytest
+
+from cmp_reader import ExcelCompxReader
+
+from conftest import report_sheet
+
+
+def level_sheet(nrows: int = 10) -> tuple:
+    """两层表头，T3t6纵向合并两行
+
+        row 0: T3(合并两列) | T3t6 | A(合并两列)
+        row 1: t6 | t7      |      | 1 | 10
+    """
+    rows = [["T3", None, "T3t6", "A", None], ["t6", "t7", None, "1", "10"]]
+    merges = [(0, 0, 0, 1), (0, 1, 2, 2), (0, 0, 3, 4)]
+    rows += [[row, row + 0.5, row * 2, row * 3, row * 4] for row in range(nrows)]
+    return rows, merges
+
+
+@pytest.fixture
+def level_xls(make_xls):
+    return make_xls("levels.xls", {"Sheet1": level_sheet()})
+
+
+def read_headers(file_path: str, usecols, **options) -> list:
+    return list(ExcelCompxReader(file_path, usecols=usecols, **options).read_excel())
+
+
+def test_prefix_matches_whole_header_levels(level_xls):
+    assert read_headers(level_xls, ["A1"]) == ["A1"]
+    assert read_headers(level_xls, "A") == ["A1", "A10"]
+    assert read_headers(level_xls, "T3") == ["T3t6", "T3t7"]
+
+
+def test_prefix_with_separator(level_xls):
+    assert read_headers(level_xls, "T3", separator="/") == ["T3/t6", "T3/t7"]
+    assert read_headers(level_xls, "T3t6", separator="/") == ["T3t6"]
+    with pytest.raises(ValueError, match="does not match"):
+        read_headers(level_xls, "T3/t", separator="/")
+
+
+def test_tuple_prefix_matches_header_paths(make_xls):
+    file_path = make_xls("report.xls", {"Sheet1": report_sheet(nrows=5)})
+    assert read_headers(file_path, [("grpA", )]) == ["grpAa1", "grpAa2"]
+    assert read_headers(file_path, [("grpB", "b2"), ("region", )]) == ["region", "grpBb2"]
+    with pytest.raises(ValueError, match="does not match"):
+        read_headers(file_path, [("grp", )])
@@ -0,0 +1,50 @@
+from cmp_reader import ExcelCompxReader
+
+from conftest import REPORT_HEADERS, report_sheet
+
+
+def test_window_search_matches_full_search(report_xls):
+    file_path = report_xls(nrows=300)
+    full = ExcelCompxReader(file_path).read_excel()
+    reader = ExcelCompxReader(file_path, window_search=True, max_search_row=50, stats=True)
+    assert reader.read_excel() == full
+    assert list(full) == REPORT_HEADERS
+    # 只在窗口中检测类型
+    assert reader.stats.stages["SheetType"]["cells"] == 50 * len(REPORT_HEADERS)
+
+
+def test_window_search_excludes_footer(report_xls):
+    file_path = report_xls(nrows=300, footer=True)
+    full_reader = ExcelCompxReader(file_path)
+    full = full_reader.read_excel()
+    reader = ExcelCompxReader(file_path, window_search=True, max_search_row=50)
+    assert reader.read_excel() == full
+    assert reader.data_rows == full_reader.data_rows
+    assert len(full["region"]) == 300
+    assert full["region"][-1] == "k299"
+
+
+def test_window_search_short_sheet_uses_full_search(report_xls):
+    file_path = report_xls(nrows=20, footer=True)
+    reader = ExcelCompxReader(file_path, window_search=True, max_search_row=100)
+    assert reader.read_excel() == ExcelCompxReader(file_path).read_excel()
+
+
+def test_continue_sub_lists_split_at_every_gap():
+    reader = ExcelCompxReader("unused.xls")
+    assert reader._get_continue_sub_list([3, 4, 5, 7]) == [[3, 4, 5], [7]]
+    assert reader._get_continue_sub_list([3, 5, 6, 7]) == [[3], [5, 6, 7]]
+    assert reader._get_continue_sub_list([4]) == [[4]]
+    assert reader._get_continue_data_rows([1, 3, 4, 5, 9]) == [3, 4, 5]
+
+
+def test_data_rows_stop_before_a_merged_note_row(make_xls):
+    rows, merges = report_sheet(nrows=6)
+    # 数据中间的合并行只有类型一票，之后的一行不属于最长的连续数据行
+    rows += [["note", "see below", None, None, None], ["k6", 6, 6, 6, 6]]
+    merges += [(9, 9, 1, 4)]
+    reader = ExcelCompxReader(make_xls("report.xls", {"Sheet1": (rows, merges)}, border=False))
+    data = reader.read_excel()
+    assert reader.data_rows == list(range(3, 9))
+    assert reader._get_data_range(reader.data_rows) == (3, 9)
+    assert data["region"] == [f"k{index}" for index in range(6)]
@@ -0,0 +1,154 @@
+import datetime
+import warnings
+
+import openpyxl
+import pytest
+import xlrd
+
+from cmp_reader import ExcelCompxReader
+from cmp_reader.engines import (LAST_VALUE_ROW, MERGED_CELLS, ROW_BLOCK, XF_INDEX_MATRIX, XlsxEngine,
+                                XlsxSheet, sheet_has_capability)
+from cmp_reader.reader import SheetBorder
+
+from conftest import REPORT_HEADERS, report_sheet
+
+
+@pytest.fixture
+def count_parses(monkeypatch):
+    """记录XlsxSheet从头解析sheet xml的次数
+    """
+    parses = []
+    iter_rows = XlsxSheet._iter_rows
+
+    def counting_iter_rows(self):
+        parses.append(self.name)
+        return iter_rows(self)
+
+    monkeypatch.setattr(XlsxSheet, "_iter_rows", counting_iter_rows)
+    return parses
+
+
+@pytest.mark.parametrize("nrows", [20, 3000])
+def test_xlsx_matches_xls(make_xls, nrows):
+    sheets = {"Sheet1": report_sheet(nrows=nrows, footer=True, index_block=4)}
+    xls_data = ExcelCompxReader(make_xls("report.xls", sheets)).read_excel()
+    xlsx_data = ExcelCompxReader(make_xls("report.xlsx", sheets)).read_excel()
+    assert list(xlsx_data) == REPORT_HEADERS
+    assert len(xlsx_data["region"]) == nrows
+    assert xlsx_data == xls_data
+
+
+@pytest.mark.parametrize("window_search", [False, True])
+def test_xlsx_read_parses_the_rows_once(make_xls, count_parses, window_search):
+    file_path = make_xls("report.xlsx", {"Sheet1": report_sheet(nrows=3000, footer=True)})
+    reader = ExcelCompxReader(file_path, window_search=window_search)
+    data = reader.read_excel()
+    assert data["region"][-1] == "k2999"
+    # 表尾在扫描时保留的最后几行中，数据按行向前读取
+    assert count_parses == ["Sheet1"]
+
+
+def test_xlsx_chunks_read_forward(make_xls, count_parses):
+    file_path = make_xls("report.xlsx", {"Sheet1": report_sheet(nrows=3000, footer=True)})
+    chunks = list(ExcelCompxReader(file_path, window_search=True).iter_chunks(500))
+    assert sum(len(chunk["region"]) for chunk in chunks) == 3000
+    assert count_parses == ["Sheet1"]
+
+
+def test_last_value_row_skips_styled_blank_rows(make_xls):
+    rows, merges = report_sheet(nrows=10)
+    sheets = {"Sheet1": (rows + [[None] * 5] * 3, merges)}
+    reader = ExcelCompxReader(make_xls("report.xlsx", sheets))
+    data = reader.read_excel()
+    assert (reader.sheet.nrows, reader.sheet.last_value_row) == (16, 13)
+    assert reader._get_last_data_row() == 13
+    assert data == ExcelCompxReader(make_xls("report.xls", sheets)).read_excel()
+
+
+def test_engine_capabilities(make_xls):
+    sheets = {"Sheet1": report_sheet(nrows=5)}
+    xlsx_reader = ExcelCompxReader(make_xls("report.xlsx", sheets))
+    xlsx_reader.read_excel()
+    xls_reader = ExcelCompxReader(make_xls("report.xls", sheets))
+    xls_reader.read_excel()
+    for capability in [XF_INDEX_MATRIX, LAST_VALUE_ROW, MERGED_CELLS]:
+        assert sheet_has_capability(xlsx_reader.sheet, capability)
+        assert not sheet_has_capability(xls_reader.sheet, capability)
+
+
+def test_empty_header_column_is_probed_by_block(make_xls):
+    nrows = ROW_BLOCK * 3
+    rows, merges = report_sheet(nrows=nrows)
+    rows = [row + [None, None] for row in rows]
+    for offset, row in enumerate(rows[3:]):
+        row[5] = None if offset == ROW_BLOCK + 10 else f"v{offset}"
+        row[6] = f"w{offset}"
+    file_path = make_xls("report.xlsx", {"Sheet1": (rows, merges)})
+    reader = ExcelCompxReader(file_path)
+    reader.read_excel()
+    loaded = []
+    load_rows = reader.sheet._load_rows
+
+    def recording_load_rows(start, end):
+        loaded.append(end - start)
+        return load_rows(start, end)
+
+    reader.sheet._load_rows = recording_load_rows
+    data_cols = reader._get_data_cols(reader.col_header_record, reader.data_rows)
+    assert [index for index, _ in data_cols] == [0, 1, 2, 3, 4, 6]
+    assert max(loaded) <= ROW_BLOCK
+
+
+def test_eager_read_releases_the_xlsx_file(make_xls):
+    file_path = make_xls("report.xlsx", {"Sheet1": report_sheet(nrows=10)})
+    reader = ExcelCompxReader(file_path)
+    reader.read_excel()
+    assert reader.workbook.closed and reader.workbook.zip_file.fp is None
+    with pytest.raises(ValueError, match="call open_sheet first"):
+        next(reader.read_chunks(5))
+
+    # lazy的列和流式读取在访问时才解析sheet，workbook保持打开
+    lazy = reader.read_excel(lazy=True)
+    assert not reader.workbook.closed
+    assert lazy["region"][-1] == "k9"
+    reader.open_sheet()
+    assert not reader.workbook.closed
+    reader.close()
+
+
+def test_iso_date_cells_are_dates(make_xls, tmp_path):
+    values = [datetime.datetime(2024, 1, 5, 10, 30), datetime.date(2023, 12, 31), datetime.time(6, 0)]
+    for iso_dates in [False, True]:
+        workbook = openpyxl.Workbook(iso_dates=iso_dates)
+        for row, value in enumerate(values, 1):
+            workbook.active.cell(row, 1, value)
+        workbook.save(tmp_path / f"dates{iso_dates}.xlsx")
+    books = [XlsxEngine().open_workbook(str(tmp_path / f"dates{iso_dates}.xlsx"))
+             for iso_dates in [False, True]]
+    assert b't="d"' in books[1].zip_file.read(books[1].sheet_by_index(0).path)
+    for book in books:
+        sheet = book.sheet_by_index(0)
+        assert sheet.col_types(0) == [xlrd.XL_CELL_DATE] * 3
+        assert sheet.col_values(0) == [45296.4375, 45291.0, 0.25]
+        book.release_resources()
+
+
+def test_fast_mode_skips_the_xlsx_borders(make_xls, monkeypatch):
+    file_path = make_xls("report.xlsx", {"Sheet1": report_sheet(nrows=10)})
+    detections = []
+    get_border_rows = SheetBorder.get_each_cell_has_border_rows
+
+    def recording_get_border_rows(self):
+        detections.append(self)
+        return get_border_rows(self)
+
+    monkeypatch.setattr(SheetBorder, "get_each_cell_has_border_rows", recording_get_border_rows)
+    data = ExcelCompxReader(file_path).read_excel()
+    assert len(detections) == 1
+    reader = ExcelCompxReader(file_path, mode="fast")
+    with warnings.catch_warnings():
+        # xlsx的合并单元格不解析格式也可以读取，不需要提示
+        warnings.simplefilter("error")
+        assert reader.read_excel() == data
+    assert not reader.workbook.formatting_info
+    assert len(detections) == 1